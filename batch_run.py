@@ -0,0 +1,310 @@
+"""
+This module runs a batch of report jobs (such as the weekly SEPTA, Compliance,
+Roche and State of Quality jobs) concurrently, sharing a pool of database
+connections and a pool of worker processes between them, so that the batch
+takes about as long as its longest job. Projects whose issue data is needed by
+several jobs are only extracted once (see db_accessor.extraction).
+"""
+
+# Built-in modules
+from argparse import ArgumentParser
+from collections import OrderedDict
+from multiprocessing import Pool
+from Queue import Queue, Empty
+from threading import Lock, Thread
+from time import time
+import sys
+import traceback
+
+# User-defined modules
+from compliance_run import run_compliance
+from constants import *
+from db_accessor import ConnectionPool, JiraGT
+from db_accessor.extraction import ExtractionPlanner, PlannedAccessor
+from report.jira_gt_report import JiraGTReport
+from roche_run import create_raw_reports
+from septa_run import run_septa
+from tracing import span, tracer, save_trace
+
+# Projects whose Roche raw data files are produced
+ROCHE_PROJECTS = ['SUN']
+
+class Job(object):
+  """
+  A single job of a batch run.
+  """
+  
+  def __init__(self, name, func, accessor_class=JiraGT, needs=()):
+    """
+    Initializes the parameters of the job.
+    
+    @param name: Unique name of the job.
+    @param func: Function running the job, which takes two parameters: a
+    connected accessor checked out from the connection pool (None if the job
+    does not use one), and the shared worker pool (None if there is none).
+    @param accessor_class: _DBAccessor sub-class of the connection used by the
+    job (None if the job does not use one).
+    @param needs: List of tuples of a project key and the issue type(s) that
+    the job gets through get_issue_data(), which are extracted once for the
+    whole batch.
+    """
+    
+    self.name = name
+    self.func = func
+    self.accessor_class = accessor_class
+    self.needs = list(needs)
+
+  def get_needs(self):
+    """
+    Gets the issue data needs of the job.
+
+    @return: List of tuples of a project key and the issue type(s) needed.
+    """
+
+    return self.needs
+
+class ReportJob(Job):
+  """
+  A job producing a State of Quality report with a shared connection and
+  worker pool. The report is created when its needs (every project of its
+  project map) are first asked for.
+  """
+  
+  def __init__(self, name, report_class, accessor_class=JiraGT, **kwargs):
+    """
+    Initializes the parameters of the job.
+
+    @param name: Unique name of the job.
+    @param report_class: Report sub-class being produced (such as JiraGTReport).
+    @param accessor_class: _DBAccessor sub-class of the connection used by the
+    report.
+    @param **kwargs: Arbitrary keyword parameters passed into the report.
+    """
+
+    super(ReportJob, self).__init__(name, self._produce_report, accessor_class)
+    self.report_class = report_class
+    self.kwargs = kwargs
+    self.report = None
+
+  def _get_report(self):
+    """
+    Gets the report of the job, creating it if needed.
+
+    @return: Report object.
+    """
+
+    if (not self.report): self.report = self.report_class(**self.kwargs)
+    return self.report
+
+  def get_needs(self):
+    # Only reports querying issue data by issue type share their extraction
+    report = self._get_report()
+    if (not hasattr(report, 'issue_types')): return []
+    return [(proj, report.issue_types) for projects in report.project_map.values()
+            for proj, _ in projects]
+
+  def _produce_report(self, db, pool):
+    """
+    Produces the report with the given connection and worker pool.
+
+    @param db: Connected accessor used by the report.
+    @param pool: Worker pool used for the calculations of the report (if any).
+    """
+
+    report = self._get_report()
+    report.db, report.pool = db, pool
+    report.produce_report()
+
+def get_default_jobs():
+  """
+  Gets the jobs of the weekly batch.
+  
+  @return: List of Job objects.
+  """
+  
+  # Roche (one row per component) and Compliance (every project at once) have
+  # their own queries, so they are not shared with the other jobs
+  return [
+    Job('SEPTA', lambda db, pool: run_septa(db), needs=[('SEPTA', [DEFECT, DEFECT_SUB])]),
+    Job('Compliance', lambda db, pool: run_compliance(db)),
+    Job('Roche', lambda db, pool: create_raw_reports(ROCHE_PROJECTS, db)),
+    ReportJob('State of Quality', JiraGTReport),
+  ]
+
+class BatchRunner(object):
+  """
+  Runs a list of jobs on a fixed number of worker threads. Every job checks out
+  a connection from the pool of its accessor class for as long as it runs, and
+  every job shares the same pool of worker processes. A failing job does not
+  stop the others. Unless disabled, the jobs get their issue data through a
+  shared extraction planner, so that each project is only extracted once.
+  """
+  
+  def __init__(self, jobs, workers=None, connections=None, processes=None,
+               share_extraction=True):
+    """
+    Initializes the parameters of the batch.
+    
+    @param jobs: List of Job objects, in the order they are started.
+    @param workers: Number of jobs run at the same time (every job by default).
+    @param connections: Maximum number of connections opened to each database
+    (one for every worker by default).
+    @param processes: Number of worker processes shared by the jobs. If left
+    blank (or set to 0), no worker processes are used.
+    @param share_extraction: True if the issue data needs of the jobs should be
+    extracted once for the whole batch, False if every job extracts its own.
+    """
+    
+    self.jobs = jobs
+    self.workers = workers if (workers) else len(jobs)
+    self.connections = connections if (connections) else self.workers
+    self.processes = processes
+    self.share_extraction = share_extraction
+    
+    # Maps job names to a tuple of their execution time and error (if any)
+    self.results = OrderedDict()
+    self.lock = Lock()
+  
+  def _get_planner(self):
+    """
+    Gets the extraction planner of the batch, with the needs of every job.
+
+    @return: ExtractionPlanner object.
+    """
+
+    planner = ExtractionPlanner()
+    for job in self.jobs:
+      try:
+        needs = job.get_needs()
+      except Exception, e:
+        # The job extracts its own data (and fails on its own if it has to)
+        print "Could not get the needs of the %s job: %s" % (job.name, str(e))
+        continue
+      for project, issuetype in needs:
+        planner.require(project, issuetype, job.name)
+
+    shared = planner.get_shared_projects()
+    if (shared):
+      print 'Sharing the extraction of %s' % ', '.join(['%s (%d jobs)' % x
+                                                       for x in shared.iteritems()])
+    return planner
+
+  def _run_job(self, job, db_pools, pool, planner):
+    """
+    Runs a single job within its own span, recording its execution time and any
+    error it raised.
+    
+    @param job: Job being run.
+    @param db_pools: Data dictionary mapping accessor classes to their
+    connection pools.
+    @param pool: Shared worker pool (None if there is none).
+    @param planner: Shared extraction planner (None if there is none).
+    """
+    
+    error = None
+    start_time = time()
+    try:
+      with span('%s job' % job.name, 'job', echo=True):
+        if (job.accessor_class):
+          with db_pools[job.accessor_class].connection() as db:
+            job.func(PlannedAccessor(planner, db, job.name) if (planner) else db, pool)
+        else:
+          job.func(None, pool)
+    except Exception, e:
+      print "%s job failed:" % job.name
+      traceback.print_exc()
+      error = e
+    finally:
+      # Releases the shared data the job did not ask for (if it failed early or
+      # only asked for part of its projects)
+      if (planner): planner.release(job.name)
+    
+    with self.lock:
+      self.results[job.name] = (time() - start_time, error)
+  
+  def _work(self, queue, parent, db_pools, pool, planner):
+    """
+    Runs jobs until none are left (on a worker thread).
+    
+    @param queue: Queue of jobs that have not started yet.
+    @param parent: Span of the batch run (which job spans are nested within).
+    @param db_pools: Data dictionary mapping accessor classes to their
+    connection pools.
+    @param pool: Shared worker pool (None if there is none).
+    @param planner: Shared extraction planner (None if there is none).
+    """
+    
+    with tracer.attach(parent):
+      while (True):
+        try:
+          job = queue.get_nowait()
+        except Empty:
+          break
+        self._run_job(job, db_pools, pool, planner)
+  
+  def run(self, trace=False):
+    """
+    Runs every job of the batch, then prints the execution time of each one.
+    
+    @param trace: True if the spans of the batch should be exported to a trace
+    file, False otherwise.
+    @return: Ordered data dictionary mapping job names to a tuple with their
+    execution time and their error (None if they succeeded), in job order.
+    """
+    
+    # Sets up the shared pools (worker processes are started before any thread)
+    # and the extraction planner
+    db_pools = dict([(job.accessor_class, ConnectionPool(job.accessor_class, self.connections))
+                     for job in self.jobs if (job.accessor_class)])
+    pool = Pool(self.processes) if (self.processes) else None
+    planner = self._get_planner() if (self.share_extraction) else None
+    
+    queue = Queue()
+    for job in self.jobs: queue.put(job)
+    
+    batch_span = tracer.start('Batch run', 'run', trace, jobs=[job.name for job in self.jobs])
+    try:
+      threads = [Thread(target=self._work, name='Job worker %d' % (i + 1),
+                        args=(queue, batch_span, db_pools, pool, planner))
+                 for i in range(self.workers)]
+      for thread in threads: thread.start()
+      for thread in threads: thread.join()
+    finally:
+      for db_pool in db_pools.values(): db_pool.close()
+      if (pool):
+        pool.close()
+        pool.join()
+      tracer.finish(batch_span, echo=True)
+      if (trace): save_trace('Batch', batch_span)
+      tracer.clear(batch_span)
+    
+    # Prints the execution time of every job (in job order)
+    results = OrderedDict([(job.name, self.results[job.name]) for job in self.jobs
+                           if (job.name in self.results)])
+    print '\n%-30s %12s  %s' % ('Job', 'Seconds', 'Result')
+    for name, (seconds, error) in results.iteritems():
+      print '%-30s %12.2f  %s' % (name, seconds, 'Failed: %s' % error if (error) else 'OK')
+    print '%-30s %12.2f' % ('Batch', batch_span.duration)
+    return results
+
+# Only runs script when it is being directly executed
+if (__name__ == '__main__'):
+  jobs = get_default_jobs()
+  parser = ArgumentParser(description='Runs the weekly report jobs concurrently.')
+  parser.add_argument('--jobs', nargs='*', choices=[job.name for job in jobs],
+                      help='Names of the jobs to run (all of them by default).')
+  parser.add_argument('--workers', type=int, default=None, help='Jobs run at the same time.')
+  parser.add_argument('--connections', type=int, default=None,
+                      help='Maximum connections to each database.')
+  parser.add_argument('--processes', type=int, default=None,
+                      help='Worker processes shared by the jobs.')
+  parser.add_argument('--no-share', action='store_true',
+                      help='Let every job extract its own issue data.')
+  parser.add_argument('--trace', action='store_true', help='Save a trace file of the batch.')
+  args = parser.parse_args()
+  
+  if (args.jobs): jobs = [job for job in jobs if (job.name in args.jobs)]
+  runner = BatchRunner(jobs, args.workers, args.connections, args.processes,
+                       share_extraction=not args.no_share)
+  results = runner.run(args.trace)
+  if (any([error for _, error in results.values()])): sys.exit(1)
@@ -0,0 +1,181 @@
+"""
+This package contains benchmarks for the calculators, along with generators of
+synthetic issue data in the same shape as the data returned by the database
+accessors (so that no database connection is needed).
+"""
+
+# Built-in modules
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import random
+
+# User-defined modules
+from constants import *
+from calculator.status_config import get_status_config
+
+def _choose(rand, choices):
+  """
+  Randomly chooses an item from the given choices.
+  
+  @param rand: Random object used to make the choice.
+  @param choices: Either a list of items (chosen uniformly), or a data
+  dictionary mapping items to their weights.
+  @return: The chosen item.
+  """
+  
+  if (not isinstance(choices, dict)): return rand.choice(choices)
+  
+  # Walks through cumulative weights until the random point is passed
+  point = rand.uniform(0, sum(choices.values()))
+  for item, weight in choices.iteritems():
+    point -= weight
+    if (point <= 0): return item
+  return item
+
+def _generate_history(rand, created, statuses, history_length, first_status=None):
+  """
+  Generates the status history of a single issue, as a random walk through the
+  given statuses with transitions spread out after the creation date.
+  
+  @param rand: Random object used to generate the history.
+  @param created: Creation date of the issue.
+  @param statuses: List (or data dictionary of weights) of possible statuses.
+  @param history_length: Maximum number of transitions of the issue.
+  @param first_status: Status that the issue starts with (as the old status of
+  its first transition). If it is left blank, the first transition has no old
+  status and takes place at the creation date.
+  @return: A tuple with the current status of the issue and its history data
+  dictionary (or None if the issue has no transitions).
+  """
+  
+  # Spreads transitions between the creation date and now
+  span = max((datetime.today() - created).total_seconds(), 1)
+  count = rand.randint(0 if (first_status) else 1, history_length)
+  dates = sorted([created + timedelta(seconds=rand.uniform(0, span)) for _ in range(count)])
+  if (not first_status and dates): dates[0] = created
+  
+  # Walks through statuses
+  hist = OrderedDict([(OLD, []), (NEW, []), (TRANS, [])])
+  status = first_status
+  for date in dates:
+    new_status = _choose(rand, statuses)
+    for field, value in [(OLD, status), (NEW, new_status), (TRANS, date)]:
+      hist[field].append(value)
+    status = new_status
+  
+  return status, hist if (dates) else None
+
+def generate_issue_data(calc_class, project='BENCH', issuetype=DEFECT, issue_count=1000,
+                        history_length=8, years=3, priority_mix=None, status_mix=None,
+                        septa=False, compliance_projects=None, seed=0):
+  """
+  Generates synthetic JIRA issue data, in the same shape as the data returned
+  by JiraGT.get_issue_data() (or JiraGT.get_compliance_data() if compliance
+  projects are given).
+  
+  @param calc_class: Calculator class whose configured priorities and statuses
+  are used for the issues.
+  @param project: Project key used for issue keys.
+  @param issuetype: Issue type of the issues.
+  @param issue_count: Number of issues generated.
+  @param history_length: Maximum number of status transitions of each issue.
+  @param years: Number of years of history that creation dates span.
+  @param priority_mix: Data dictionary mapping priorities to their weights.
+  Defaults to equal weights for every configured priority.
+  @param status_mix: Data dictionary mapping statuses to their weights.
+  Defaults to equal weights for every configured status.
+  @param septa: True if components, links and packs should be set up like SEPTA
+  issues (hardware and security components, PACK-151 links, FAT-B and PILOT
+  packs), False otherwise.
+  @param compliance_projects: List of projects that issues are spread across,
+  for Compliance data (None for regular project data).
+  @param seed: Seed of the random generator, so that data can be reproduced.
+  @return: Data dictionary mapping issue keys to field names to associated
+  parameters.
+  """
+  
+  rand = random.Random(seed)
+  config = get_status_config(calc_class, issuetype)
+  priorities = priority_mix if (priority_mix) else list(config.priority_list) + [None]
+  statuses = status_mix if (status_mix) else sorted(config.status_groups)
+  start = datetime.today() - timedelta(days=365 * years)
+  
+  data = OrderedDict()
+  for index in range(issue_count):
+    created = start + timedelta(seconds=rand.uniform(0, 365 * years * 86400))
+    status, hist = _generate_history(rand, created, statuses, history_length, 'New')
+    
+    # Sets issue fields (in the order they are queried)
+    params = OrderedDict()
+    if (compliance_projects): params[PROJECT] = rand.choice(compliance_projects)
+    params[ISSUETYPE] = issuetype
+    params[PRIORITY] = _choose(rand, priorities)
+    params[STATUS] = status
+    params[CREATED] = created
+    params[RESOLVED] = None
+    if (septa):
+      params[COMPS] = rand.choice(['', 'Software', 'Hardware', 'Software, HW', 'Security'])
+      params[LINKS] = rand.choice(['', 'PACK-151', 'PACK-151, %s-1' % project, '%s-2' % project])
+      params[PACK] = rand.choice([None, 'FAT-B', 'PILOT'])
+    else:
+      params[COMPS] = rand.choice(['', 'Software', 'Interface'])
+      params[LINKS] = ''
+      params[PACK] = None
+    if (not compliance_projects):
+      for field in [FOUND, PBI, ROOT]: params[field] = None
+    params[DEV_EST] = None
+    params[DEV_ACT] = None
+    if (hist): params[HIST] = hist
+    data['%s-%d' % (project, index + 1)] = params
+  
+  return data
+
+def generate_clearquest_data(calc_class, issuetype=DEFECT, issue_count=1000, history_length=8,
+                             years=3, priority_mix=None, status_mix=None, seed=0):
+  """
+  Generates synthetic ClearQuest data, in the same shape as the data returned by
+  ClearQuest.get_scr_data() (every issue has a status history starting with its
+  submission).
+  
+  @param calc_class: Calculator class whose configured priorities and statuses
+  are used for the issues.
+  @param issuetype: Issue type of the issues.
+  @param issue_count: Number of issues generated.
+  @param history_length: Maximum number of status transitions of each issue.
+  @param years: Number of years of history that submittal dates span.
+  @param priority_mix: Data dictionary mapping priorities to their weights.
+  Defaults to equal weights for every configured priority.
+  @param status_mix: Data dictionary mapping statuses to their weights.
+  Defaults to equal weights for every configured status.
+  @param seed: Seed of the random generator, so that data can be reproduced.
+  @return: Data dictionary mapping issue keys to field names to associated
+  parameters.
+  """
+  
+  rand = random.Random(seed)
+  config = get_status_config(calc_class, issuetype)
+  priorities = priority_mix if (priority_mix) else list(config.priority_list) + [None]
+  statuses = status_mix if (status_mix) else sorted(config.status_groups)
+  start = datetime.today() - timedelta(days=365 * years)
+  
+  data = OrderedDict()
+  for index in range(issue_count):
+    submitted = start + timedelta(seconds=rand.uniform(0, 365 * years * 86400))
+    status, hist = _generate_history(rand, submitted, statuses, history_length)
+    
+    # Sets issue fields (in the order they are queried)
+    params = OrderedDict()
+    params[HEADLINE] = 'Synthetic issue %d' % (index + 1)
+    params[ISSUETYPE] = issuetype
+    params[PRIORITY] = _choose(rand, priorities)
+    params[STATUS] = status
+    params[LINKS] = None
+    params[PROPERTY] = None
+    params[SUBMIT_DATE] = submitted
+    params[CLOSED_DATE] = None
+    params[EST_FIX_TIME] = None
+    params[ACT_FIX_TIME] = None
+    params[HIST] = hist
+    data['CQ%08d' % (index + 1)] = params
+  
+  return data
@@ -0,0 +1,230 @@
+"""
+This module benchmarks the calculators on synthetic issue data, timing every
+calculator end to end as well as each phase of its calculation (and the flow
+metrics calculated from the same status intervals), and reporting the 
+throughput in issues per second and transitions per second. The flow metrics
+are first checked against a small handmade set of issues with known lead and
+cycle times.
+
+Usage (from the top level directory):
+  python -m benchmark.calculator_benchmark [--issues 5000] [--repeat 3] ...
+"""
+
+# Built-in modules
+from argparse import ArgumentParser
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from time import time
+
+# User-defined modules
+from constants import *
+from benchmark import generate_issue_data, generate_clearquest_data
+from calculator import JiraGTCalculator, SEPTACalculator, ComplianceCalculator
+from calculator import DCRCalculator, RRCalculator, SCRCalculator, FlowCalculator
+
+# Projects that synthetic Compliance issues are spread across
+COMPLIANCE_PROJECTS = ['BENCH', 'COMP', 'AUDIT']
+
+def get_benchmark_cases(issue_count, history_length, years, seed=0):
+  """
+  Sets up the calculators being benchmarked, along with their synthetic data.
+  
+  @param issue_count: Number of issues generated for each calculator.
+  @param history_length: Maximum number of status transitions of each issue.
+  @param years: Number of years of history that creation dates span.
+  @param seed: Seed of the random generator, so that data can be reproduced.
+  @return: Ordered data dictionary mapping case names to tuples containing a
+  function creating a new calculator and the data it calculates metrics for.
+  """
+  
+  jira = dict(issue_count=issue_count, history_length=history_length, years=years, seed=seed)
+  return OrderedDict([
+    ('JiraGT', (lambda: JiraGTCalculator('BENCH', DEFECT),
+                generate_issue_data(JiraGTCalculator, **jira))),
+    ('SEPTA', (SEPTACalculator,
+               generate_issue_data(SEPTACalculator, project='SEPTA', septa=True, **jira))),
+    ('Compliance', (lambda: ComplianceCalculator(project_list=COMPLIANCE_PROJECTS),
+                    generate_issue_data(ComplianceCalculator, issuetype='Compliance',
+                                        compliance_projects=COMPLIANCE_PROJECTS, **jira))),
+    ('SCR', (lambda: SCRCalculator('BENCH', DEFECT),
+             generate_clearquest_data(SCRCalculator, DEFECT, **jira))),
+    ('DCR', (lambda: DCRCalculator('BENCH', ENG_CHANGE),
+             generate_clearquest_data(DCRCalculator, ENG_CHANGE, **jira))),
+    ('RR', (lambda: RRCalculator('BENCH', PROD),
+            generate_clearquest_data(RRCalculator, PROD, **jira))),
+  ])
+
+def count_transitions(data):
+  """
+  Counts the status transitions of the given issues (including the first
+  status of every issue).
+  
+  @param data: Data dictionary mapping issue key to its various associated
+  parameters.
+  @return: Number of transitions.
+  """
+  
+  return sum([1 + len(params[HIST][TRANS]) if (HIST in params) else 1
+              for params in data.values()])
+
+def time_phases(calc, data):
+  """
+  Performs the phases of a calculation one at a time, timing each of them.
+  
+  @param calc: Calculator object (not used for any previous calculation).
+  @param data: Data dictionary mapping issue key to its various associated
+  parameters.
+  @return: Ordered data dictionary mapping phase names to their durations (in
+  seconds).
+  """
+  
+  timings = OrderedDict()
+  def timed(phase, func, *args):
+    start_time = time()
+    results = func(*args)
+    timings[phase] = time() - start_time
+    return results
+  
+  timed('Field compaction', calc.compact_data, data)
+  timed('History compaction', calc.compact_histories, data, calc.created_status)
+  if (isinstance(calc, SEPTACalculator)):
+    calc.issue_categories = timed('Issue categories', calc._get_issue_categories, data)
+  events = timed('Transition records', calc._get_events, data, calc.sweep_fields, None,
+                 calc.created_status)
+  timed('Weekly sweep', calc._sweep, *events)
+  timed('Status intervals', calc.get_status_intervals, data)
+  timed('Average ages', calc._get_average_age_data, data)
+  timed('Flow metrics', FlowCalculator(calc).calculate, data)
+  
+  return timings
+
+def _get_flow_issue(created, *transitions):
+  """
+  Sets up a single JIRA defect for the flow metrics check.
+  
+  @param created: Creation date of the issue (in the New status).
+  @param *transitions: Tuples of the new status and the date of every status
+  transition of the issue, in date order.
+  @return: Data dictionary mapping field names to associated parameters.
+  """
+  
+  status = 'New'
+  hist = OrderedDict([(OLD, []), (NEW, []), (TRANS, [])])
+  for new_status, date in transitions:
+    for field, value in [(OLD, status), (NEW, new_status), (TRANS, date)]:
+      hist[field].append(value)
+    status = new_status
+  return OrderedDict([(ISSUETYPE, DEFECT), (PRIORITY, 'Major'), (STATUS, status),
+                      (CREATED, created), (RESOLVED, None), (HIST, hist)])
+
+def check_flow_metrics():
+  """
+  Checks the flow metrics calculated for a handmade set of JIRA defects against
+  their known throughput, lead times and cycle times. The defects are created
+  on Monday, January 4th 2016, and close within the weeks ending on Friday,
+  January 8th and 15th:
+    - CHECK-1: In Dev on the 5th and Closed on the 7th (lead time of 3 days,
+      cycle time of 2 days)
+    - CHECK-2: Open on the 5th and Closed on the 6th, never entering In Dev 
+      (lead time of 2 days, no cycle time)
+    - CHECK-3: In Dev on the 5th and Closed on the 6th (lead time of 2 days, 
+      cycle time of 1 day), then reopened on the 11th, In Dev on the 12th and
+      Closed again on the 14th (lead time of 10 days, and cycle time of 9 days
+      from when it first entered In Dev)
+  
+  @return: List of descriptions of the values that did not match (empty if
+  every value matched).
+  """
+  
+  day = lambda day: datetime(2016, 1, day)
+  data = OrderedDict([
+    ('CHECK-1', _get_flow_issue(day(4), ('In Dev', day(5)), ('Closed', day(7)))),
+    ('CHECK-2', _get_flow_issue(day(4), ('Open', day(5)), ('Closed', day(6)))),
+    ('CHECK-3', _get_flow_issue(day(4), ('In Dev', day(5)), ('Closed', day(6)),
+                                ('Reopened', day(11)), ('In Dev', day(12)),
+                                ('Closed', day(14)))),
+  ])
+  flow_data = FlowCalculator(JiraGTCalculator('CHECK', DEFECT)).calculate(data)
+  
+  # Expected throughput, and (count, total time) of the lead and cycle times,
+  # of both weeks
+  days = lambda days: timedelta(days=days)
+  expected = OrderedDict([
+    (THROUGHPUT, [3, 1]),
+    (LEAD_TIME, [(3, days(3 + 2 + 2)), (1, days(10))]),
+    (CYCLE_TIME, [(2, days(2 + 1)), (1, days(9))]),
+  ])
+  
+  mismatches = []
+  for flow_type, weeks in expected.iteritems():
+    for date, value in zip(flow_data[flow_type], weeks):
+      actual = flow_data[flow_type][date]
+      if (flow_type != THROUGHPUT): actual = (actual.num, actual.sum)
+      if (actual != value):
+        mismatches.append('%s on %s: %s (expected %s)' % (flow_type, date, actual, value))
+  
+  # Every defect is closed by the end of both weeks
+  for date in list(flow_data[CUMULATIVE_FLOW])[:2]:
+    closed = flow_data[CUMULATIVE_FLOW][date][CLOSED]
+    if (closed != len(data)):
+      mismatches.append('%s on %s: %d closed (expected %d)' % (CUMULATIVE_FLOW, date,
+                                                               closed, len(data)))
+  return mismatches
+
+def run_benchmarks(cases, repeat=3):
+  """
+  Times every benchmark case end to end and per phase, keeping the best time
+  of the repeated runs, and prints the results.
+  
+  @param cases: Ordered data dictionary of benchmark cases, as returned by
+  get_benchmark_cases().
+  @param repeat: Number of times each case is run.
+  @return: Ordered data dictionary mapping case names to phase names (and
+  'End to end') to their best durations (in seconds).
+  """
+  
+  results = OrderedDict()
+  for name, (get_calc, data) in cases.iteritems():
+    issues = len(data)
+    transitions = count_transitions(data)
+    print '\n%s (%d issues, %d transitions)' % (name, issues, transitions)
+    
+    # Keeps the best duration of every phase
+    best = OrderedDict()
+    for _ in range(repeat):
+      start_time = time()
+      get_calc().calculate(data)
+      timings = OrderedDict([('End to end', time() - start_time)])
+      timings.update(time_phases(get_calc(), data))
+      for phase, duration in timings.iteritems():
+        best[phase] = min(duration, best.get(phase, duration))
+    
+    for phase, duration in best.iteritems():
+      duration = max(duration, 1e-9)
+      print '  %-20s %9.4f s %12.0f issues/sec %12.0f transitions/sec' % \
+        (phase, duration, issues / duration, transitions / duration)
+    results[name] = best
+  
+  return results
+
+# Only runs benchmarks when it is being directly executed
+if (__name__ == '__main__'):
+  parser = ArgumentParser(description='Benchmarks the calculators on synthetic data.')
+  parser.add_argument('--issues', type=int, default=5000, help='Issues per calculator.')
+  parser.add_argument('--history', type=int, default=8, help='Maximum transitions per issue.')
+  parser.add_argument('--years', type=int, default=3, help='Years of history.')
+  parser.add_argument('--repeat', type=int, default=3, help='Runs per calculator.')
+  parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+  parser.add_argument('--only', nargs='*', help='Names of the calculators to benchmark.')
+  args = parser.parse_args()
+  
+  # Checks the flow metrics before timing them
+  mismatches = check_flow_metrics()
+  if (mismatches):
+    raise ValueError('Flow metrics do not match the handmade issues:\n  %s' %
+                     '\n  '.join(mismatches))
+  
+  cases = get_benchmark_cases(args.issues, args.history, args.years, args.seed)
+  if (args.only):
+    cases = OrderedDict([(name, case) for name, case in cases.iteritems() if (name in args.only)])
+  run_benchmarks(cases, args.repeat)
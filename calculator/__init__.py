@@ -5,17 +5,22 @@ is passed.
 
 # Built-in modules
 from collections import OrderedDict
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # User-defined modules
 from constants import *
-from utilities import AverageAge
+from calculator.status_config import get_status_config
+from time_axis import TimeAxis
+from utilities import AverageAge, OpenAge, QuantileSketch, merge_metric
 
 class Calculator(object):
   """
   Default calculator used to calculate metrics for a given project.
   """
   
+  # Issue fields read by calculate() (all others are ignored by calculators)
+  input_fields = [PROJECT, PRIORITY, STATUS, CREATED, SUBMIT_DATE, HIST]
+  
   def __init__(self, project, issuetype):
     """
     Initializes basic parameters regarding the metrics being calculated.
@@ -31,11 +36,35 @@ class Calculator(object):
     # Week day for extraction (0=Mon, 1=Tue, 2=Wed, 3=Thu, 4=Fri, 5=Sat, 6=Sun)
     self.extraction_day = 4
     
-    # Priority list
-    self.priority_list = ['Blocker', 'Critical', 'Major' ,'Minor', 'Trivial']
+    # Sets priority order, status group map and closed statuses from the status
+    # configuration (compiled once and shared by every calculator instance)
+    self._set_status_config(get_status_config(self.__class__, issuetype))
+    
+    # Determines whether age data carries quantile sketches (for percentiles)
+    self.age_sketches = False
+    
+    # Time-in-status interval index of the last data passed (see get_status_intervals)
+    self.interval_data = None
+    self.interval_index = None
+    
+    # Compacted transition histories of the last data passed (see compact_histories)
+    self.history_data = None
+    self.history_data_status = None
+    self.history_index = None
+    
+  def _set_status_config(self, config):
+    """
+    Sets the priority order, status group and pack lookup tables of the 
+    calculator.
+    
+    @param config: StatusConfig object containing the compiled lookup tables.
+    """
     
-    # Sets status group map
-    self.status_map = OrderedDict()
+    self.priority_list = config.priority_list
+    self.status_map = config.status_map
+    self.status_groups = config.status_groups
+    self.closed_statuses = config.closed_statuses
+    self.link_packs = config.link_packs
     
   def get_status_desc(self):
     """
@@ -69,11 +98,8 @@ class Calculator(object):
     @return: The name of the status group that the status is part of.
     """
     
-    # Iterates through each of the available status groups
-    status = ' '.join(status.split()).strip()
-    for status_group, status_list in self.status_map.iteritems():
-      if (status in status_list): return status_group
-    return None
+    # Looks up the status (with normalized spacing) in the status group table
+    return self.status_groups.get(' '.join(status.split()).strip())
     
   def _get_severity_data(self, data):
     """
@@ -88,7 +114,7 @@ class Calculator(object):
     # Initializes data dictionary named severity_data
     data_types = [TOTAL, CLOSED, OPEN]
     severity_data = OrderedDict([(x, OrderedDict([
-       (priority, 0) for priority in self.priority_list + [TOTAL]                                      
+       (priority, 0) for priority in list(self.priority_list) + [TOTAL]                                      
     ])) for x in data_types])
     
     # Iterates through each issue
@@ -101,7 +127,7 @@ class Calculator(object):
           # Increments priority counts on both the priority and Total level
           for p in [priority, TOTAL]:
             # Regular severity counts
-            if (status in self.status_map[CLOSED]): severity_data[CLOSED][p] += 1
+            if (status in self.closed_statuses): severity_data[CLOSED][p] += 1
             else:                  severity_data[OPEN][p] += 1
             severity_data[TOTAL][p] += 1
     
@@ -158,83 +184,208 @@ class Calculator(object):
       if (status_group in age_map[p]):
         age_map[p][status_group].update(diff, update_avg=False)
   
-  def _get_average_age_data(self, data):
+  def _set_open_age_value(self, open_map, priority, status_group, lower_date):
     """
-    Calculates average age (in number of days) of all the issues based on the 
-    data passed, broken down by priority and status.
+    Sets the open age map values for an age that is still running (ending at the
+    current date), based on the given parameters of the current issue.
     
-    @param data: A data dictionary containing the parameters and history of
-    each parameter.
-    @return: A data dictionary containing AverageAge objects containing the 
-    average age of the issues in a given priority/status group. It has the
-    following structure:
-      <priority> -> <status group> -> AverageAge object
+    @param open_map: Data dictionary containing OpenAge objects, segmented by 
+    priority and status group.
+    @param priority: Priority of the current issue.
+    @param status_group: Status group under which the current issue's status is part of.
+    @param lower_date: Marks the beginning of a status group.
+    """
+    
+    # Adds age information for Overall as well
+    p_list = [priority, OVERALL] if (priority) else [OVERALL]
+    for p in p_list:
+      if (status_group in open_map[p]):
+        open_map[p][status_group].update(lower_date)
+        
+  def _init_age_map(self, age_factory=AverageAge):
+    """
+    Initializes an age map containing an empty age object for every priority 
+    and status group (both appended with Overall).
+    
+    @param age_factory: Function (or class) creating each empty age object,
+    such as AverageAge or OpenAge.
+    @return: A data dictionary with the following structure:
+      <priority> -> <status group> -> age object
     """
     
     # Sets the status and priority lists (appended with Overall)
     status_list = self.status_map.keys() + [OVERALL]
     priority_list = list(self.priority_list) + [OVERALL]
     
-    # Initializes the age map
-    age_map = OrderedDict([
+    return OrderedDict([
       (priority, OrderedDict([
-        (status, AverageAge()) for status in status_list
+        (status, age_factory()) for status in status_list
       ])) for priority in priority_list
     ])
+  
+  def _get_status_history(self, param_data):
+    """
+    Gets the status history of an issue, starting with its first status at its
+    creation date.
     
-    # Iterates through each issue
-    for param_data in data.values():
-      # Grabs param_data fields relevant to age average calculations
-      priority = param_data.get(PRIORITY)
-      status = param_data[STATUS]
-      created = param_data.get(CREATED, param_data.get(SUBMIT_DATE))
-      hist = param_data.get(HIST)
+    @param param_data: Data dictionary of the parameters of an issue.
+    @return: A tuple with the creation date of the issue and its list of 
+    (status, date) tuples, in date order.
+    """
+    
+    created = param_data.get(CREATED, param_data.get(SUBMIT_DATE))
+    hist = param_data.get(HIST)
+    
+    # Accounts for change histories that include the very first issues
+    if (hist):
+      first_status = hist[OLD][0] if (hist[OLD][0]) else hist[NEW][0]
+      return created, [(first_status, created)] + zip(hist[NEW], hist[TRANS])
+    return created, [(param_data[STATUS], created)]
+  
+  def get_status_intervals(self, data):
+    """
+    Builds the time-in-status interval index of the given issues, walking the
+    status history of each issue only once. The index of the last data 
+    dictionary passed is kept, so that age, flow and other time-in-status 
+    computations over the same data all share it.
+    
+    @param data: Data dictionary mapping issue key to its various associated 
+    parameters.
+    @return: Data dictionary mapping issue key to a tuple with three items 
+    (created, updated, intervals). The first two are the creation date and the
+    date of the last transition of the issue, and the last is a list of 
+    (status group, enter date, exit date) tuples in date order, where the exit
+    date of the current status group is None.
+    """
+    
+    if (data is self.interval_data): return self.interval_index
+    
+    interval_index = OrderedDict()
+    for key, param_data in data.iteritems():
+      created, history_list = self._get_status_history(param_data)
       
-      # Sets status history tuple list
-      if (hist):
-        # Accounts for change histories that include the very first issues
-        if (hist[OLD][0]):
-          first_status = hist[OLD][0]
-          history_list = [(first_status, created)] + zip(hist[NEW], hist[TRANS])
-        else:
-          first_status = hist[NEW][0]
-          history_list = zip(hist[NEW], hist[TRANS])
-        curr_group = self._get_status_group(first_status)
-      else:
-        history_list = [(status, created)]
-        curr_group = self._get_status_group(status)
-        
-      # Sets current date of status group
+      # Sets current status group and its date
+      curr_group = self._get_status_group(history_list[0][0])
       curr_date = created
-        
-      # Iterates through history list
+      intervals = []
+      
+      # Closes the current interval at every status group change
       for status, status_date in history_list:
-        # Gets the status group of the given status
         group = self._get_status_group(status)
-      
-        # Marks status group change
         if (group != curr_group):
-          self._set_age_map_value(age_map, priority, curr_group, status_date, curr_date)
-          
-          # Sets current status parameters
+          intervals.append((curr_group, curr_date, status_date))
           curr_group = group
           curr_date = status_date
-          
-      # Determines age of current status group
-      curr_date = datetime.today()
-      self._set_age_map_value(age_map, priority, group, curr_date, status_date)
+      intervals.append((curr_group, curr_date, None))
+      
+      interval_index[key] = (created, status_date, intervals)
+    
+    # Keeps index for other computations over the same data
+    self.interval_data = data
+    self.interval_index = interval_index
+    return interval_index
+  
+  def _get_age_state(self, data):
+    """
+    Accumulates the ages of all the issues based on the data passed, broken 
+    down by priority and status. Ages that have ended are summed directly, while
+    ages that are still running (up to the current date) are kept apart so they
+    can be re-aged for any current date by _age_open_issues(). If age_sketches
+    is set, the closed ages are also added to quantile sketches, and the start
+    dates of the open ages are kept.
+    
+    @param data: A data dictionary containing the parameters and history of
+    each parameter.
+    @return: A tuple of two data dictionaries (closed ages, open ages), with the
+    following structures:
+      <priority> -> <status group> -> AverageAge object (averages not calculated)
+      <priority> -> <status group> -> OpenAge object
+    """
+    
+    # Initializes the age maps
+    if (self.age_sketches):
+      age_map = self._init_age_map(lambda: AverageAge(sketch=QuantileSketch()))
+      open_map = self._init_age_map(lambda: OpenAge(starts=[]))
+    else:
+      age_map = self._init_age_map()
+      open_map = self._init_age_map(OpenAge)
+    
+    # Iterates through the status intervals of each issue
+    interval_index = self.get_status_intervals(data)
+    for key, param_data in data.iteritems():
+      priority = param_data.get(PRIORITY)
+      created, updated, intervals = interval_index[key]
+      
+      # Determines ages of the status groups that have been exited
+      for group, enter_date, exit_date in intervals[:-1]:
+        self._set_age_map_value(age_map, priority, group, exit_date, enter_date)
+        
+      # Determines age of current status group (runs up to the current date)
+      group = intervals[-1][0]
+      self._set_open_age_value(open_map, priority, group, updated)
       
       # Determines Overall age of an issue (either to Closed or to current date)
-      if (curr_group == CLOSED):
-        self._set_age_map_value(age_map, priority, OVERALL, status_date, created)
+      if (group == CLOSED):
+        self._set_age_map_value(age_map, priority, OVERALL, updated, created)
       else:
-        self._set_age_map_value(age_map, priority, OVERALL, curr_date, created)
+        self._set_open_age_value(open_map, priority, OVERALL, created)
         
-    # Performs calculations
-    for status_map in age_map.values(): 
-      for average in status_map.values(): average.calculate_average()
+    return age_map, open_map
+  
+  @staticmethod
+  def _age_open_issues(age_map, open_map, current_date=None):
+    """
+    Combines the closed ages with the open ages (aged up to the given date) into
+    a new age map, and calculates its averages. Quantile sketches (if any) are
+    copied and have the ages of the open issues added to them.
+    
+    @param age_map: Data dictionary of AverageAge objects for ages that have 
+    ended, as returned by _get_age_state(). It is not modified.
+    @param open_map: Data dictionary of OpenAge objects for ages that are still
+    running, as returned by _get_age_state().
+    @param current_date: Date that open ages run up to. Defaults to the current 
+    date.
+    @return: A data dictionary containing AverageAge objects containing the 
+    average age of the issues in a given priority/status group. It has the
+    following structure:
+      <priority> -> <status group> -> AverageAge object
+    """
+    
+    if (not current_date): current_date = datetime.today()
+    
+    aged_map = OrderedDict()
+    for priority, status_map in age_map.iteritems():
+      aged_map[priority] = OrderedDict()
+      for status_group, average in status_map.iteritems():
+        open_age = open_map[priority][status_group]
+        
+        # Adds the individual open ages to a copy of the sketch
+        sketch = None
+        if (average.sketch is not None):
+          sketch = average.sketch.copy()
+          for start_date in open_age.starts:
+            sketch.add((current_date - start_date).total_seconds() / 86400)
+            
+        aged_map[priority][status_group] = AverageAge(
+          average.sum + open_age.get_age_sum(current_date), 
+          average.num + open_age.num, sketch)
         
-    return age_map
+    return aged_map
+  
+  def _get_average_age_data(self, data):
+    """
+    Calculates average age (in number of days) of all the issues based on the 
+    data passed, broken down by priority and status.
+    
+    @param data: A data dictionary containing the parameters and history of
+    each parameter.
+    @return: A data dictionary containing AverageAge objects containing the 
+    average age of the issues in a given priority/status group. It has the
+    following structure:
+      <priority> -> <status group> -> AverageAge object
+    """
+    
+    return self._age_open_issues(*self._get_age_state(data))
   
   @staticmethod
   def combine_age_data(data, issue_type):
@@ -258,20 +409,272 @@ class Calculator(object):
     
     combined_data = OrderedDict()
     
-    # Iterates through every project's or group's age data
+    # Merges every project's or group's age data
     for age_data in data.values():
-      for priority, status_data in age_data[issue_type].iteritems():
-        # Maps priority if it currently doesn't exist
-        if (priority not in combined_data):
-          combined_data[priority] = OrderedDict()
-        for status_group, age_obj in status_data.iteritems():
-          # Maps status group if it currently doesn't exist
-          if (status_group not in combined_data[priority]):
-            combined_data[priority][status_group] = AverageAge()
-          combined_data[priority][status_group].combine(age_obj)
+      combined_data = merge_metric(combined_data, age_data[issue_type])
     
     return combined_data
     
+  @classmethod
+  def compact_data(cls, data):
+    """
+    Strips the given data down to the fields used by the calculator, so that it
+    can be cheaply passed (pickled) to another process.
+    
+    @param data: Data dictionary mapping issue key to its various associated 
+    parameters.
+    @return: Data dictionary with the same keys, containing only the fields
+    listed in input_fields.
+    """
+    
+    compact = OrderedDict()
+    for key, params in data.iteritems():
+      compact[key] = dict([(field, params[field]) for field in cls.input_fields 
+                           if (field in params)])
+    return compact
+    
+  def _load_checkpoint(self, checkpoint, data, fields, created_status=None):
+    """
+    Loads the sweep state saved by the given checkpoint store for the current
+    calculator. Issues that no longer exist within the data are dropped from 
+    the loaded state, and the attributes of the remaining issues (every field 
+    but the date and status of their latest transition) are refreshed from the
+    data. The checkpoint is discarded if an issue missing from its state has 
+    transitions up to its date (such as an issue moved into the project), since
+    the weeks it should have been counted in were already swept.
+    
+    @param checkpoint: CalculationCheckpoint object (or None).
+    @param data: Data dictionary mapping issue key to its various associated 
+    parameters.
+    @param fields: List of field names mapped within each issue's current 
+    state (see _get_events()).
+    @param created_status: Status added at the creation date of every issue, 
+    if any.
+    @return: The checkpoint state (a data dictionary), or None if there is no
+    usable checkpoint.
+    """
+    
+    if (not checkpoint): return None
+    state = checkpoint.load(self)
+    if (not state): return None
+    
+    # Discards the checkpoint if an issue it has never counted is already due
+    current_state = state['current_state']
+    history_index = self.compact_histories(data, created_status)
+    for key in data:
+      if (key not in current_state and history_index[key] and 
+          history_index[key][0][0].date() <= state['date']):
+        return None
+      
+    # Drops deleted issues and refreshes the attributes of the others
+    for key in current_state.keys():
+      if (key not in data):
+        del current_state[key]
+      else:
+        current_state[key].update(self._get_issue_params(data[key], fields))
+    return state
+  
+  def _get_issue_params(self, param_data, fields):
+    """
+    Gets the attributes of an issue that stay the same for every transition.
+    
+    @param param_data: Data dictionary of the issue's parameters.
+    @param fields: List of field names mapped within each issue's current 
+    state (see _get_events()).
+    @return: Data dictionary mapping the project and attribute fields to their
+    values.
+    """
+    
+    params = { PROJECT : param_data.get(PROJECT, self.project) }
+    for field in fields[3:]:
+      params[field] = param_data.get(field)
+    return params
+  
+  def compact_histories(self, data, created_status=None):
+    """
+    Collapses the consecutive transitions of each issue that stay within the
+    same status group (and closure), keeping the first transition of every run.
+    Only the status group and closure of the current status of an issue are
+    counted by the weekly sweep, so bounces between statuses of the same group
+    can be dropped without changing any results. Transitions of an issue that 
+    share the same date are applied in status order by the sweep, so only the
+    one applied last is kept. The histories of the last data dictionary passed
+    are kept, so that they are only compacted once.
+    
+    @param data: Data dictionary mapping issue key to its various associated 
+    parameters.
+    @param created_status: Status to add at the creation date of every issue, 
+    if any.
+    @return: Data dictionary mapping issue key to its compacted list of 
+    (date, status) transitions, in date order.
+    """
+    
+    if (data is self.history_data and created_status == self.history_data_status):
+      return self.history_index
+    
+    # Maps every status to its (status group, closure) tuple as it is reached
+    status_keys = { }
+    history_index = { }
+    for key, param_data in data.iteritems():
+      transitions = [(param_data.get(CREATED), created_status)] if (created_status) else []
+      hist = param_data.get(HIST)
+      if (hist): transitions.extend(zip(hist[TRANS], hist[NEW]))
+      
+      # Resolves transitions sharing a date to the one the sweep applies last
+      resolved = []
+      for date, status in transitions:
+        if (resolved and resolved[-1][0] == date):
+          resolved[-1] = (date, max(resolved[-1][1], status))
+        else: resolved.append((date, status))
+      
+      # Keeps a transition only when it changes the status group or closure
+      compacted = []
+      last_key = None
+      for date, status in resolved:
+        if (status not in status_keys):
+          group = self._get_status_group(status) if (status) else None
+          status_keys[status] = (group, status in self.closed_statuses)
+        status_key = status_keys[status]
+        if (status_key != last_key):
+          compacted.append((date, status))
+          last_key = status_key
+      history_index[key] = compacted
+      
+    # Keeps histories for later passes over the same data
+    self.history_data = data
+    self.history_data_status = created_status
+    self.history_index = history_index
+    return history_index
+  
+  def _get_events(self, data, fields, after=None, created_status=None):
+    """
+    Converts the histories of the given issues into slim transition records 
+    (date, issue index, status code), storing the remaining attributes of each
+    issue only once within a side table.
+    
+    Issue indices follow the (project, key) order and status codes follow the
+    alphabetical order of the statuses, so that transitions on the same date are
+    ordered the same way as full (date, project, key, status) tuples would be.
+    Histories are compacted first (see compact_histories), so that bounces 
+    within a status group never reach the sweep.
+    
+    @param data: Data dictionary mapping issue key to its various associated 
+    parameters.
+    @param fields: List of field names mapped within each issue's current 
+    state. It must start with PROJECT, TRANS and STATUS, followed by the issue
+    attributes that stay the same for every transition.
+    @param after: Date after which transitions are kept (all are kept if blank).
+    @param created_status: Status to add at the creation date of every issue, 
+    if any.
+    @return: A tuple with three items (events, issues, statuses). The events are
+    the transition records sorted by date, the issues are (key, parameters) 
+    tuples indexed by issue index, and the statuses are the status names 
+    indexed by status code.
+    """
+    
+    # Orders issues the same way full transition tuples would be ordered
+    keys = sorted(data, key=lambda key: (data[key].get(PROJECT, self.project), key))
+    history_index = self.compact_histories(data, created_status)
+    
+    # Assigns status codes in alphabetical order
+    statuses = set()
+    for key in keys:
+      statuses.update([status for _, status in history_index[key]])
+    statuses = sorted(statuses)
+    status_codes = dict([(status, code) for code, status in enumerate(statuses)])
+    
+    # Builds side table of issue parameters and the transition records
+    issues = []
+    events = []
+    for index, key in enumerate(keys):
+      params = self._get_issue_params(data[key], fields)
+      issues.append((key, params))
+      
+      # Adds the compacted statuses of the issue (already in date order)
+      for date, status in history_index[key]:
+        if (not after or date.date() > after):
+          events.append((date, index, status_codes[status]))
+    
+    # Merges the already ordered runs of each issue (a single sort in C)
+    events.sort()
+    return events, issues, statuses
+  
+  def _sweep(self, events, issues, statuses, state=None):
+    """
+    Applies the given transition records in date order, taking a snapshot of 
+    the severity and status data at every extraction date (the boundary dates
+    of a weekly time axis on the calculator's extraction day).
+    
+    The sweep also produces a checkpoint state as of the last week that has 
+    already ended. Passing it to a later sweep resumes from that week, so that
+    only transitions after it need to be passed.
+    
+    @param events: Date-sorted list of (date, issue index, status code) 
+    transition records, as returned by _get_events().
+    @param issues: Side table of (key, parameters) tuples indexed by issue 
+    index. The parameters of an issue are updated in place with the date and
+    status of its latest transition and used as its current state.
+    @param statuses: List of status names indexed by status code.
+    @param state: Checkpoint state to resume from (as returned by a previous 
+    sweep), if any.
+    @return: A tuple with three items (severity, status, state). The first two
+    are data dictionaries, each mapping snapshot dates to the severity or 
+    status data at that date. The last is the checkpoint state (None if no week
+    has ended yet).
+    """
+    
+    # Sets up data dictionaries that will be used to contain calculated data
+    severity_data = OrderedDict()
+    status_data = OrderedDict()
+    current_state = { }
+    earliest = events[0][0] if (events) else None
+    
+    # Resumes from the checkpoint state (starting the week after it)
+    if (state):
+      current_state = dict(state['current_state'])
+      severity_data.update(state['severity'])
+      status_data.update(state['status'])
+      checkpoint_date = state['date']
+      earliest = datetime(checkpoint_date.year, checkpoint_date.month, 
+                          checkpoint_date.day) + timedelta(days=1)
+    
+    # Iterates through dates to populate status and severity data dictionaries
+    new_state = state
+    if (earliest):
+      dates = TimeAxis(WEEKLY, self.extraction_day).get_dates(earliest)
+      
+      # Last extraction date whose week has already ended
+      today = datetime.today().date()
+      closed_dates = [date for date in dates if (date < today)]
+      checkpoint_date = closed_dates[-1] if (closed_dates) else None
+      
+      position = 0
+      for date in dates:
+        # Applies transitions until none are left or date limit is reached
+        while (position < len(events) and events[position][0].date() <= date):
+          trans_date, index, status_code = events[position]
+          position += 1
+          
+          # Maps the key's current parameters, overwriting previous mapping
+          key, params = issues[index]
+          params[TRANS] = trans_date
+          params[STATUS] = statuses[status_code]
+          current_state[key] = params
+          
+        # Sets severity and status metric data at the given date
+        severity_data[date] = self._get_severity_data(current_state)
+        status_data[date] = self._get_status_data(current_state)
+          
+        # Saves the state at the end of the last week that has ended (copying
+        # parameters, since they keep being updated in place)
+        if (date == checkpoint_date):
+          new_state = { 'date' : date, 'severity' : OrderedDict(severity_data),
+                       'current_state' : dict([(key, dict(params)) for key, params 
+                                               in current_state.iteritems()]),
+                       'status' : OrderedDict(status_data) }
+          
+    return severity_data, status_data, new_state
+    
   def calculate(self, data, *args, **kwargs):
     """
     Calculates metrics data based on the given data passed.
@@ -279,12 +682,23 @@ class Calculator(object):
     
     raise NotImplemented("calculate() function needs to be implemented by a sub-class")
   
-  def get_metrics(self, data):
+  def get_metrics(self, data, cache=None, checkpoint=None):
     """
     Performs calculation on given data and returns the resulting calculation.
+    
+    @param data: Data dictionary mapping issue key to its various associated 
+    parameters.
+    @param cache: CalculationCache object used to reuse the results of previous
+    runs when the data has not changed. If left blank, the full calculation is
+    always performed.
+    @param checkpoint: CalculationCheckpoint object that the weekly sweep 
+    resumes from, when no cache is used (the cache has its own checkpoints).
+    @return: A tuple with the following calculated data: (severity, status, age).
     """
     
     print "Performing calculations for %s data..." % self.project
+    if (cache): return cache.get_metrics(self, data)
+    if (checkpoint): return self.calculate(data, checkpoint=checkpoint)
     return self.calculate(data)
   
 # Brings children classes to top level
@@ -292,4 +706,5 @@ from clearquest_calculator import DCRCalculator, RRCalculator, SCRCalculator
 from jira_gt_calculator import JiraGTCalculator
 from jira_gt_calculator.septa import SEPTACalculator
 from jira_gt_calculator.compliance import ComplianceCalculator
+from flow import FlowCalculator
       
\ No newline at end of file
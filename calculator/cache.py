@@ -0,0 +1,233 @@
+"""
+This module contains the cache responsible for memoizing calculator results, so
+that projects whose data has not changed since the previous run are not fully
+recalculated, along with the checkpoints that let a changed project's weekly 
+counts resume from the last week that has already ended.
+"""
+
+# Built-in modules
+import cPickle
+from datetime import datetime
+import hashlib
+import os
+
+# User-defined modules
+from constants import *
+from directories import CACHE_DIR
+from time_axis import TimeAxis
+from utilities import create_dirpath
+
+def get_config_fingerprint(calc):
+  """
+  Gets a fingerprint of the given calculator's configuration (anything that
+  affects its results other than the data itself).
+  
+  @param calc: Calculator whose configuration is being fingerprinted.
+  @return: Hexadecimal digest string representing the calculator.
+  """
+  
+  return hashlib.sha1(repr((calc.__class__.__name__, calc.project, calc.issuetype, 
+    calc.extraction_day, calc.priority_list, calc.status_map.items(),
+    calc.age_sketches, getattr(calc, 'project_list', None)))).hexdigest()
+
+class _CalculationStore(object):
+  """
+  Generic store that pickles one entry per calculator (project, issue type and
+  calculator class) into the cache directory.
+  
+  It should NOT be accessed directly outside of this module.
+  """
+  
+  # Suffix added to the file names of the entries
+  suffix = ''
+  
+  def __init__(self, subdirs=[CACHE_DIR]):
+    """
+    Initializes the location of the cache files.
+    
+    @param subdirs: List of sub-directories (within the base Files folder) 
+    where the cache files are stored.
+    """
+    
+    self.subdirs = subdirs
+    
+  def _get_file_path(self, calc):
+    """
+    Gets the path of the file associated with the given calculator.
+    
+    @param calc: Calculator whose file path is being obtained.
+    @return: The path of the file.
+    """
+    
+    file_name = '%s %s %s%s.pickle' % (calc.project, calc.issuetype, 
+                                       calc.__class__.__name__, self.suffix)
+    return os.path.join(create_dirpath(subdirs=self.subdirs), file_name)
+  
+  def load(self, calc):
+    """
+    Loads the entry of the given calculator, if one exists.
+    
+    @param calc: Calculator whose entry is being loaded.
+    @return: The entry (a data dictionary), or None if no valid entry exists.
+    """
+    
+    file_path = self._get_file_path(calc)
+    if (not os.path.isfile(file_path)): return None
+    try:
+      with open(file_path, 'rb') as f:
+        return cPickle.load(f)
+    except Exception, e:
+      print "Ignoring unreadable cache file %s: %s" % (file_path, str(e))
+      return None
+    
+  def save(self, calc, entry):
+    """
+    Saves the given entry for the given calculator.
+    
+    @param calc: Calculator whose entry is being saved.
+    @param entry: The entry (a data dictionary) being saved.
+    """
+    
+    file_path = self._get_file_path(calc)
+    with open(file_path, 'wb') as f:
+      cPickle.dump(entry, f, cPickle.HIGHEST_PROTOCOL)
+      
+class CalculationCheckpoint(_CalculationStore):
+  """
+  Persists the state of a calculator's weekly sweep (the current state of every
+  issue, along with the severity and status series) as of the last week that 
+  had ended, so that the next run only has to apply the transitions after it.
+  
+  Weeks before the checkpoint are never recounted, so changes to them (such as
+  a backdated transition, a deleted issue, or a priority change) only show up 
+  in the weeks counted afterward: deleted issues are dropped and the attributes
+  of every issue are refreshed from the current data when the sweep resumes. 
+  The checkpoint is discarded (and every week recounted) when an issue it has
+  never counted has transitions up to its date, such as an issue moved into 
+  the project or one that changed issue type.
+  """
+  
+  # Suffix added to the file names of the entries
+  suffix = ' Checkpoint'
+  
+  def load(self, calc):
+    """
+    Loads the checkpoint state of the given calculator, if one exists and it
+    was saved with the same calculator configuration.
+    
+    @param calc: Calculator whose checkpoint state is being loaded.
+    @return: The checkpoint state (a data dictionary), or None.
+    """
+    
+    entry = super(CalculationCheckpoint, self).load(calc)
+    if (entry and entry['config'] == get_config_fingerprint(calc)):
+      return entry['state']
+    return None
+  
+  def save(self, calc, state):
+    """
+    Saves the checkpoint state of the given calculator.
+    
+    @param calc: Calculator whose checkpoint state is being saved.
+    @param state: Checkpoint state returned by the calculator's sweep.
+    """
+    
+    entry = { 'config' : get_config_fingerprint(calc), 'state' : state }
+    super(CalculationCheckpoint, self).save(calc, entry)
+
+class CalculationCache(_CalculationStore):
+  """
+  Persists the results of each calculator (severity and status series, along 
+  with its closed and open age sums), keyed by a fingerprint of the calculator's
+  configuration and input data. When the fingerprint of a later run matches, 
+  the new extraction weeks are appended to the stored series and the open ages
+  are re-aged to the current date, rather than recalculating from scratch.
+  """
+  
+  def __init__(self, subdirs=[CACHE_DIR], checkpoints=False):
+    """
+    Initializes the location of the cache files.
+    
+    @param subdirs: List of sub-directories (within the base Files folder) 
+    where the cache files are stored.
+    @param checkpoints: True if calculations performed on a cache miss should
+    resume from the calculator's weekly checkpoint (which does not recount the
+    weeks before it, see CalculationCheckpoint), False if they should be 
+    performed from scratch.
+    """
+    
+    super(CalculationCache, self).__init__(subdirs)
+    self.checkpoint = CalculationCheckpoint(subdirs) if (checkpoints) else None
+    
+  @staticmethod
+  def get_fingerprint(calc, data):
+    """
+    Gets a fingerprint of the given calculator's configuration and the fields 
+    of the given data that the calculator reads.
+    
+    @param calc: Calculator that the data is being passed to.
+    @param data: Data dictionary mapping issue key to its various associated 
+    parameters.
+    @return: Hexadecimal digest string representing the calculator and data.
+    """
+    
+    digest = hashlib.sha1()
+    
+    # Calculator configuration
+    digest.update(get_config_fingerprint(calc))
+    
+    # Issue fields (and change history) read by the calculator
+    for key in sorted(data):
+      params = data[key]
+      digest.update(repr((key, [params.get(field) for field in calc.input_fields])))
+      
+    return digest.hexdigest()
+  
+  @staticmethod
+  def _extend_series(series, extraction_day):
+    """
+    Appends every extraction date that has passed since the series was last 
+    calculated. Since the data has not changed, each new date has the same data
+    as the final date of the series.
+    
+    @param series: Data dictionary mapping dates to severity or status data.
+    @param extraction_day: Day of the week when data is extracted.
+    """
+    
+    if (series):
+      last_date = next(reversed(series))
+      last_data = series[last_date]
+      earliest = datetime(last_date.year, last_date.month, last_date.day)
+      for date in TimeAxis(WEEKLY, extraction_day).get_dates(earliest):
+        if (date > last_date): series[date] = last_data
+    
+  def get_metrics(self, calc, data):
+    """
+    Gets the calculated metrics of the given data, reusing the cached results 
+    of the calculator if the data has not changed.
+    
+    @param calc: Calculator used to perform calculations on a cache miss.
+    @param data: Data dictionary mapping issue key to its various associated 
+    parameters.
+    @return: A tuple with the following calculated data: (severity, status, age).
+    """
+    
+    fingerprint = self.get_fingerprint(calc, data)
+    entry = self.load(calc)
+    
+    # Extends the cached series (cache hit) or recalculates them (cache miss)
+    if (entry and entry['fingerprint'] == fingerprint):
+      print "Reusing cached calculations for %s data..." % calc.project
+      for series in [entry['severity'], entry['status']]:
+        self._extend_series(series, calc.extraction_day)
+    else:
+      severity, status, _ = calc.calculate(data, age_data=False, 
+                                           checkpoint=self.checkpoint)
+      age_map, open_map = calc._get_age_state(data)
+      entry = { 'fingerprint' : fingerprint, 'severity' : severity, 
+               'status' : status, 'age' : age_map, 'open_age' : open_map }
+    self.save(calc, entry)
+    
+    # Re-ages open issues up to the current date
+    age = calc._age_open_issues(entry['age'], entry['open_age'])
+    return entry['severity'], entry['status'], age
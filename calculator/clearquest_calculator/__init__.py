@@ -5,13 +5,11 @@ ClearQuest.
 
 # Built-in modules
 from collections import OrderedDict
-from datetime import datetime
-import heapq
 
 # User-defined modules
 from calculator import Calculator
+from calculator.status_config import get_status_config
 from constants import *
-from utilities import get_historical_dates, AverageAge
 
 class ClearQuestCalculator(Calculator):
   """
@@ -19,6 +17,11 @@ class ClearQuestCalculator(Calculator):
   on data from ClearQuest.
   """
   
+  # Fields of the current state of each issue during the weekly sweep (the first
+  # status of every issue is already part of its history)
+  sweep_fields = [PROJECT, TRANS, STATUS, PRIORITY]
+  created_status = None
+  
   def __init__(self, project, issuetype):
     """
     Initializes basic parameters regarding the metrics being calculated.
@@ -29,18 +32,18 @@ class ClearQuestCalculator(Calculator):
     
     super(ClearQuestCalculator, self).__init__(project, issuetype)
     
-  @staticmethod
-  def get_status_group_map(issuetype):
+  @classmethod
+  def get_status_group_map(cls, issuetype):
     """
     Gets the dictionary for the status map, mapping a status group to its given 
     statuses.
     
     @param issuetype: Issue type associated with the calculator.
     @return: Data dictionary for the status group mapping, based on the issue 
-    type passed.
+    type passed (as configured within the status configuration).
     """
     
-    raise NotImplemented('Needs to be implemented by subclass.')
+    return get_status_config(cls, issuetype).status_map
     
   def calculate(self, data, *args, **kwargs):
     """
@@ -48,51 +51,30 @@ class ClearQuestCalculator(Calculator):
     
     @param data: Data dictionary mapping issue key to its various associated 
     parameters.
-    @return: A tuple with the following calculated data: (severity, status).
+    @param age_data: Keyword argument determining whether age data is 
+    calculated (defaults to True).
+    @param checkpoint: Keyword argument containing a CalculationCheckpoint 
+    object. If it is passed, the weekly sweep resumes from the last saved week
+    (only queuing the transitions after it) and saves its new state afterward.
+    @return: A tuple with the following calculated data: (severity, status, age).
     """
     
-    # Sets up priority queue, where data is prioritized by date
-    queue = []
-    
-    # Sets up data dictionaries that will be used to contain calculated data
-    severity_data = OrderedDict()
-    status_data = OrderedDict()
-    current_state = { }
+    # Loads checkpoint state (transitions up to its date are already counted)
+    checkpoint = kwargs.get('checkpoint')
+    state = self._load_checkpoint(checkpoint, data, self.sweep_fields)
+    after = state['date'] if (state) else None
     
-    # List of fields used
-    fields = [PROJECT, TRANS, STATUS, PRIORITY]
-    
-    # Populates priority queue with appropriate data
-    for key, param_data in data.iteritems():
-      # Grabs param_data fields
-      priority = param_data.get(PRIORITY, None)
-      hist = param_data.get(HIST, None)
-      proj = param_data.get(PROJECT, self.project)
-      
-      # Adds the historical statuses of the current JIRA item to the queue
-      if (hist):
-        for i, date in enumerate(hist[TRANS]):
-          heapq.heappush(queue, (date, proj, key, hist[NEW][i], priority))
+    # Builds transition records from the history of each issue
+    events, issues, statuses = self._get_events(data, self.sweep_fields, after)
     
     # Iterates through dates to populate status and severity data dictionaries
-    if (queue):
-      earliest = queue[0][0]
-      for date in get_historical_dates(earliest, self.extraction_day, False):
-        # Pops items off queue until queue is empty or date limit is reached
-        while(queue and queue[0][0].date() <= date):
-          curr, proj, key, status, priority = heapq.heappop(queue)
-          
-          # Maps the key's current parameters, overwriting previous mapping
-          current_state[key] = { }
-          for field, value in zip(fields, [proj, curr, status, priority]):
-            current_state[key][field] = value
-          
-        # Sets severity and status metric data at the given date
-        severity_data[date] = self._get_severity_data(current_state)
-        status_data[date] = self._get_status_data(current_state)
+    severity_data, status_data, state = self._sweep(events, issues, statuses, state)
+    if (checkpoint and state): checkpoint.save(self, state)
       
     # Gets age data separately from status and severity
-    age_map = self._get_average_age_data(data)
+    if (kwargs.get('age_data', True)):
+      age_map = self._get_average_age_data(data)
+    else: age_map = None
       
     return severity_data, status_data, age_map
   
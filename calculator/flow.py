@@ -0,0 +1,106 @@
+"""
+This module contains the calculation of flow metrics (throughput, lead time,
+cycle time and cumulative flow), based on the status histories of issues.
+"""
+
+# Built-in modules
+from bisect import bisect_left
+from collections import OrderedDict
+
+# User-defined modules
+from constants import *
+from time_axis import TimeAxis
+from utilities import AverageAge, QuantileSketch
+
+class FlowCalculator(object):
+  """
+  Calculates weekly flow metrics for the issues of a project, using the status
+  groups of the project's calculator:
+    - Throughput: number of issues entering the Closed status group each week.
+    - Lead time: time from creation to Closed of the issues closed each week.
+    - Cycle time: time from first entering the In Dev status group to Closed of
+      the issues closed each week.
+    - Cumulative flow: number of issues within each status group at every week.
+  """
+  
+  def __init__(self, calc, start_group='In Dev', time_axis=None):
+    """
+    Initializes the status group codes of the given calculator.
+    
+    @param calc: Calculator object whose status groups (and extraction day)
+    are used.
+    @param start_group: Status group that marks the start of the cycle time.
+    @param time_axis: TimeAxis object that metrics are bucketed along. Defaults
+    to weekly buckets on the calculator's extraction day.
+    """
+    
+    self.calc = calc
+    self.time_axis = time_axis if (time_axis) else TimeAxis(WEEKLY, calc.extraction_day)
+    
+    # Maps every status group to its code (index within the status map)
+    self.groups = calc.status_map.keys()
+    self.group_codes = dict([(group, code) for code, group in enumerate(self.groups)])
+    
+    # Codes of the status groups starting and ending cycle times (if they exist)
+    self.start_code = self.groups.index(start_group) if (start_group in self.groups) else None
+    self.closed_code = self.groups.index(CLOSED) if (CLOSED in self.groups) else None
+  
+  def calculate(self, data):
+    """
+    Calculates the flow metrics of the given issues, within one pass over the
+    status intervals of each issue (see Calculator.get_status_intervals).
+    
+    @param data: Data dictionary mapping issue key to its various associated
+    parameters.
+    @return: Data dictionary mapping each flow metric type to its series, with
+    the following structures:
+      THROUGHPUT -> <date> -> int count
+      LEAD_TIME -> <date> -> AverageAge object (with quantile sketch)
+      CYCLE_TIME -> <date> -> AverageAge object (with quantile sketch)
+      CUMULATIVE_FLOW -> <date> -> <status group> -> int count
+    """
+    
+    flow_data = OrderedDict([(x, OrderedDict()) for x in
+                             [THROUGHPUT, LEAD_TIME, CYCLE_TIME, CUMULATIVE_FLOW]])
+    if (not data): return flow_data
+    
+    # Sets up bucket dates and per-bucket accumulators
+    interval_index = self.calc.get_status_intervals(data)
+    dates = self.time_axis.get_dates(min([created for created, _, _ in interval_index.values()]))
+    throughput = [0] * len(dates)
+    lead_times = [AverageAge(sketch=QuantileSketch()) for _ in dates]
+    cycle_times = [AverageAge(sketch=QuantileSketch()) for _ in dates]
+    
+    # Changes in status group counts at each bucket (one extra for later dates)
+    flow_changes = [[0] * len(self.groups) for _ in range(len(dates) + 1)]
+    
+    # Iterates through the status intervals of each issue
+    for created, _, intervals in interval_index.values():
+      start_date = None
+      for group, enter_date, exit_date in intervals:
+        code = self.group_codes.get(group)
+        if (code is None): continue
+        
+        # Counts issue within the status group from the bucket it entered on
+        bucket = bisect_left(dates, enter_date.date())
+        flow_changes[bucket][code] += 1
+        if (exit_date): flow_changes[bisect_left(dates, exit_date.date())][code] -= 1
+        
+        # Marks the first start of work, and adds closures to their bucket
+        if (code == self.start_code and start_date is None):
+          start_date = enter_date
+        elif (code == self.closed_code and bucket < len(dates)):
+          throughput[bucket] += 1
+          lead_times[bucket].update(enter_date - created)
+          if (start_date): cycle_times[bucket].update(enter_date - start_date)
+    
+    # Accumulates status group changes into cumulative flow counts
+    counts = [0] * len(self.groups)
+    for i, date in enumerate(dates):
+      counts = [count + change for count, change in zip(counts, flow_changes[i])]
+      flow_data[THROUGHPUT][date] = throughput[i]
+      flow_data[LEAD_TIME][date] = lead_times[i]
+      flow_data[CYCLE_TIME][date] = cycle_times[i]
+      flow_data[CUMULATIVE_FLOW][date] = OrderedDict(zip(self.groups, counts))
+    
+    return flow_data
@@ -15,17 +15,19 @@ class ComplianceCalculator(JiraGTCalculator):
   Calculator used to calculate metrics for a given JIRA (Germantown) project.
   """
   
-  def __init__(self):
+  def __init__(self, project_list=None):
     """
     Initializes basic parameters regarding the metrics being calculated.
     
-    @param project: Name of the project whose metrics are being calculated.
+    @param project_list: List of projects with Compliance issues. If it is left
+    blank, the projects are queried from JIRA.
     """
     
     super(ComplianceCalculator, self).__init__('Compliance', 'Compliance')
     
     # Determines list of projects with Compliance issues
-    self.project_list = self._get_compliance_projects()
+    if (project_list is None): project_list = self._get_compliance_projects()
+    self.project_list = project_list
     
   def _get_compliance_projects(self):
     """
@@ -63,7 +65,7 @@ class ComplianceCalculator(JiraGTCalculator):
     # Initializes data dictionary named severity_data
     data_types = [TOTAL, CLOSED, OPEN]
     severity_data = OrderedDict([(x, OrderedDict([
-       (priority, 0) for priority in self.priority_list + [TOTAL]                                      
+       (priority, 0) for priority in list(self.priority_list) + [TOTAL]                                      
     ])) for x in data_types])
     
     # Iterates through each issue
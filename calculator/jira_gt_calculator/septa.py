@@ -8,6 +8,14 @@ from collections import OrderedDict
 # User-defined modules
 from constants import *
 from calculator.jira_gt_calculator import JiraGTCalculator
+from calculator.link_graph import LinkGraph, get_issue_links
+
+# Bit flags of the categories (packs) that a SEPTA issue can belong to
+FAT_A_FLAG, FAT_B_FLAG, FAT_B_HI_FLAG, PILOT_FLAG, PILOT_HI_FLAG = [1 << i for i in range(5)]
+ALL_FLAGS = FAT_A_FLAG | FAT_B_FLAG | FAT_B_HI_FLAG | PILOT_FLAG | PILOT_HI_FLAG
+
+# Category flags of the packs defined by links (see link_packs in the config)
+LINK_PACK_FLAGS = {FAT_A: FAT_A_FLAG}
 
 class SEPTACalculator(JiraGTCalculator):
   """
@@ -24,25 +32,81 @@ class SEPTACalculator(JiraGTCalculator):
     # Sets extraction day to Saturday
     self.extraction_day = 5
     
-  def _set_status_group_map(self):
+    # Maps issue keys to their precomputed (excluded, flags) category tuples
+    self.issue_categories = {}
+    
+  def calculate(self, data, *args, **kwargs):
+    """
+    Precomputes the categories of every issue, then calculates severity, 
+    status, and age data in the same way as JiraGTCalculator.calculate.
+    
+    @param data: Data dictionary mapping issue key to its various associated 
+    parameters.
+    @return: A tuple with the following calculated data: (severity, status, age).
+    """
+    
+    self.issue_categories = self._get_issue_categories(data)
+    return super(SEPTACalculator, self).calculate(data, *args, **kwargs)
+  
+  def _get_issue_category(self, param, link_flags=None):
+    """
+    Evaluates the component, link and pack conditions of a single issue.
+    
+    @param param: Data dictionary of the parameters of an issue.
+    @param link_flags: Bitmask of the link packs the issue belongs to, as
+    looked up in the link graph. If it is left blank, only the direct links of
+    the issue are checked.
+    @return: Tuple containing whether the issue is excluded (hardware and
+    security issues) and a bitmask of the categories the issue belongs to.
+    """
+    
+    comps = param[COMPS]
+    pack = param[PACK]
+    hi_priority = param[PRIORITY] not in ['Minor', 'Trivial']
+    
+    # Skips hardware and security
+    if (comps is not None):
+      comps = comps.lower()
+      excluded = 'hardware' in comps or 'hw' in comps or 'security' == comps
+    else: excluded = False
+    
+    # Checks direct links against the root of every link pack
+    if (link_flags is None):
+      links = get_issue_links(param)
+      link_flags = 0
+      for link_pack, (root, _) in self.link_packs.iteritems():
+        if (root in links): link_flags |= LINK_PACK_FLAGS[link_pack]
+    
+    # Sets category flags (FAT-A, FAT-B, Hi Priority FAT-B, Pilot, Hi Priority Pilot)
+    flags = link_flags
+    if (FAT_B == pack):                    flags |= FAT_B_FLAG
+    if (FAT_B == pack and hi_priority):    flags |= FAT_B_HI_FLAG
+    if ('PILOT' == pack):                  flags |= PILOT_FLAG
+    if ('PILOT' == pack and hi_priority):  flags |= PILOT_HI_FLAG
+    
+    return excluded, flags
+    
+  def _get_issue_categories(self, data):
     """
-    Sets the dictionary for the status map, mapping a status group to its given 
-    statuses.
+    Evaluates the categories of every issue once, so that the weekly counts
+    only need to look them up. Link pack members are looked up in a link graph
+    of the data.
+    
+    @param data: Data dictionary mapping issue key to its various associated 
+    parameters.
+    @return: Dictionary mapping issue key to its (excluded, flags) tuple.
     """
     
-    # Initializes the status map for various parameters
-    self.status_map = OrderedDict()
-    self.status_map['In Dev'] = ['New', 'In Dev', 'In Analysis', 'Dev Lead Review', 
-                                 'Test Defects Pending', 'Prod Defects Pending']
-    self.status_map['Passed to Test'] = ['Passed to Test']
-    self.status_map['Test Build Pending'] = ['Test Build Pending']
-        
-    # Adds the Test status group for certain statuses
-    self.status_map['In Test'] = ['Deployed to Test', 'In Test','Test Lead Review']
-            
-    # Adds the Closed status group
-    self.status_map['Closed'] = ['Passed to Prod', 'Prod Build Pending', 'Resolved', 'Closed']
+    # Combines the flags of every link pack that each issue belongs to
+    graph = LinkGraph(data)
+    link_flags = dict.fromkeys(data, 0)
+    for pack, (root, transitive) in self.link_packs.iteritems():
+      for key in graph.get_members(root, transitive):
+        if (key in link_flags): link_flags[key] |= LINK_PACK_FLAGS[pack]
     
+    return dict([(key, self._get_issue_category(param, link_flags[key]))
+                 for key, param in data.iteritems()])
+  
   def _get_severity_data(self, data):
     """
     Parses the given data and return a data dictionary for the priority 
@@ -54,48 +118,47 @@ class SEPTACalculator(JiraGTCalculator):
     issues.
     """
     
-    # Initializes list of data types
+    # Initializes list of data types (category types follow the three base types)
+    sub_types = [(FAT_A, FAT_A_FLAG), (FAT_B, FAT_B_FLAG), (PILOT, PILOT_FLAG), 
+                 (PILOT_HI, PILOT_HI_FLAG)]
     data_types = [TOTAL, CLOSED, OPEN]
     for original_type in [TOTAL, CLOSED, OPEN]:
-      for sub_type in [FAT_A, FAT_B, PILOT, PILOT_HI]:
+      for sub_type, _ in sub_types:
         data_types.append('%s (%s)' % (original_type, sub_type))
-        
-    # Initializes data dictionary named severity_data
-    severity_data = OrderedDict([(x, OrderedDict([
-       (priority, 0) for priority in self.priority_list + [TOTAL]                                      
-    ])) for x in data_types])
+    
+    # Maps closure (1 for closed, 2 for open) and category flags to row indices
+    rows_by_flags = [None]
+    for state_row in [1, 2]:
+      rows_by_flags.append([[0, state_row] + [
+        3 + len(sub_types) * base_row + i for base_row in [0, state_row] 
+          for i, (_, flag) in enumerate(sub_types) if (flags & flag)
+      ] for flags in range(ALL_FLAGS + 1)])
+    
+    # Initializes integer-indexed counters
+    columns = list(self.priority_list) + [TOTAL]
+    column_index = dict([(priority, i) for i, priority in enumerate(columns)])
+    total_column = len(columns) - 1
+    counts = [[0] * len(columns) for _ in data_types]
+    closed_statuses = self.closed_statuses
+    categories = self.issue_categories
     
     # Iterates through each issue
-    for param in data.values():
-      status = param[STATUS]
+    for key, param in data.iteritems():
       priority = param[PRIORITY]
-      comps = param[COMPS]
-      linked = param[LINKS]
-      pack = param[PACK]
-          
-      # Increments priority counts depending on closure
+      
+      # Increments priority counts depending on closure (skipping hardware)
       if (priority):
-        # Skips hardware
-        if (comps is None or ('hardware' not in comps.lower() and 'hw' not in comps.lower()
-                              and 'security' != comps.lower())):
-          
-          # Increments priority counts on both the priority and Total level
-          for p in [priority, TOTAL]:
-            # Regular severity counts
-            if (status in self.status_map[CLOSED]): severity_data[CLOSED][p] += 1
-            else:                                   severity_data[OPEN][p] += 1
-            severity_data[TOTAL][p] += 1
-            
-            # Fat-A, Fat-B, Pilot
-            for cond, data_type in [('PACK-151' in linked, FAT_A), 
-                (FAT_B == pack, FAT_B), ('PILOT' == pack, PILOT),
-                ('PILOT' == pack and priority not in ['Minor', 'Trivial'], PILOT_HI)]:
-              if (cond):
-                if (status in self.status_map[CLOSED]): 
-                  severity_data['%s (%s)' % (CLOSED, data_type)][p] += 1
-                else:                  
-                  severity_data['%s (%s)' % (OPEN, data_type)][p] += 1
-                severity_data['%s (%s)' % (TOTAL, data_type)][p] += 1
+        excluded, flags = categories.get(key) or self._get_issue_category(param)
+        if (not excluded):
+          column = column_index[priority]
+          state_row = 1 if (param[STATUS] in closed_statuses) else 2
+          for row in rows_by_flags[state_row][flags]:
+            counts[row][column] += 1
+            counts[row][total_column] += 1
+    
+    # Converts counters into severity data dictionary
+    severity_data = OrderedDict([(data_type, OrderedDict(zip(columns, counts[i]))) 
+                                 for i, data_type in enumerate(data_types)])
     
     # Removes Minor and Trivial categories from Hi Priority
     for data_type in [TOTAL, OPEN, CLOSED]:
@@ -115,40 +178,35 @@ class SEPTACalculator(JiraGTCalculator):
     issues.
     """
       
-    # Initializes data dictionary named status_data
+    # Data types (in the same order as the category flag bits, then Total)
     data_types = [FAT_1A, FAT_1B, FAT_1B_HI, PILOT, PILOT_HI, TOTAL]
-    status_data = OrderedDict([(x, OrderedDict([
-       (group, 0) for group in self.status_map.keys() + [TOTAL]                                      
-    ])) for x in data_types])
+    total_row = len(data_types) - 1
+    rows_by_flags = [[i for i in range(total_row) if (flags & (1 << i))] + [total_row]
+                     for flags in range(ALL_FLAGS + 1)]
+    
+    # Initializes integer-indexed counters
+    columns = self.status_map.keys() + [TOTAL]
+    column_index = dict([(group, i) for i, group in enumerate(columns)])
+    total_column = len(columns) - 1
+    counts = [[0] * len(columns) for _ in data_types]
+    categories = self.issue_categories
     
     # Iterates through each issue
-    for param in data.values():
-      status = param[STATUS]
-      priority = param[PRIORITY]
-      comps = param[COMPS]
-      linked = param[LINKS]
-      pack = param[PACK]
+    for key, param in data.iteritems():
+      excluded, flags = categories.get(key) or self._get_issue_category(param)
       
       # Skips hardware
-      if (comps is None or ('hardware' not in comps.lower() and 'hw' not in comps.lower()
-                            and 'security' != comps.lower())):
+      if (not excluded):
         # Formats status
-        status = self._get_status_group(status)
+        status = self._get_status_group(param[STATUS])
               
         # Increments status counts on both the status and Total level
         if (status):
-          for s in [status, TOTAL]:
-            # FAT-1A, FAT-1B, Hi Priority FAT-1B, Pilot, Hi Priority Pilot
-            for cond, data_type in [('PACK-151' in linked, FAT_1A), 
-                  ('FAT-B' == pack, FAT_1B), 
-                  ('FAT-B' == pack and priority not in ['Minor', 'Trivial'], FAT_1B_HI),
-                  ('PILOT' == pack, PILOT), 
-                  ('PILOT' == pack and priority not in ['Minor', 'Trivial'], PILOT_HI)   
-                ]:
-              if (cond):
-                status_data[data_type][s] += 1
-              
-            # Sets total count
-            status_data[TOTAL][s] += 1
+          column = column_index[status]
+          for row in rows_by_flags[flags]:
+            counts[row][column] += 1
+            counts[row][total_column] += 1
     
-    return status_data
\ No newline at end of file
+    # Converts counters into status data dictionary
+    return OrderedDict([(data_type, OrderedDict(zip(columns, counts[i]))) 
+                        for i, data_type in enumerate(data_types)])
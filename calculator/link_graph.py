@@ -0,0 +1,93 @@
+"""
+This module indexes the links between issues as a graph, so that membership of
+packs (issues linked to a root issue) can be looked up in constant time.
+"""
+
+# User-defined modules
+from constants import *
+from utilities import get_link_set
+
+def get_issue_links(params):
+  """
+  Gets the set of issues linked to the given issue, falling back to splitting
+  the linked issue string if the set was not built during extraction.
+  
+  @param params: Data dictionary of the parameters of an issue.
+  @return: Frozen set of linked issue keys.
+  """
+  
+  if (LINK_SET in params): return params[LINK_SET]
+  return get_link_set(params.get(LINKS))
+
+class LinkGraph(object):
+  """
+  Adjacency index of the links between the given issues, in both directions.
+  Pack memberships are computed once per root issue and then shared.
+  """
+  
+  def __init__(self, data):
+    """
+    Builds the adjacency sets of the given issues.
+    
+    @param data: Data dictionary mapping issue key to its various associated 
+    parameters.
+    """
+    
+    # Maps issue keys to the keys they link to, and linked keys back to issues
+    self.links = { }
+    self.linked_by = { }
+    for key, params in data.iteritems():
+      self.links[key] = get_issue_links(params)
+      for link in self.links[key]:
+        self.linked_by.setdefault(link, set()).add(key)
+        
+    # Caches members of every (root, transitive) pack queried
+    self.members = { }
+    
+  def get_links(self, key):
+    """
+    Gets the issues that the given issue links to.
+    
+    @param key: Issue key.
+    @return: Frozen set of linked issue keys.
+    """
+    
+    return self.links.get(key, frozenset())
+  
+  def is_linked(self, key, target):
+    """
+    Checks whether the given issue links directly to the target issue.
+    
+    @param key: Issue key.
+    @param target: Key of the target issue.
+    @return: True if the issue links to the target, False otherwise.
+    """
+    
+    return target in self.links.get(key, ())
+  
+  def get_members(self, root, transitive=False):
+    """
+    Gets the issues belonging to the pack of the given root issue.
+    
+    @param root: Key of the root issue of the pack (which does not need to be
+    part of the data).
+    @param transitive: True if issues linked to the root through other issues
+    belong to the pack, False if only issues linking directly to it do.
+    @return: Frozen set of the keys of the pack members (excluding the root).
+    """
+    
+    if ((root, transitive) not in self.members):
+      members = set(self.linked_by.get(root, ()))
+      
+      # Walks the links backward from the direct members
+      if (transitive):
+        pending = list(members)
+        while (pending):
+          for key in self.linked_by.get(pending.pop(), ()):
+            if (key not in members):
+              members.add(key)
+              pending.append(key)
+        members.discard(root)
+        
+      self.members[(root, transitive)] = frozenset(members)
+    return self.members[(root, transitive)]
@@ -0,0 +1,130 @@
+"""
+This module compiles the status group and pack configuration
+(configs/status_maps.yaml) into read-only lookup tables, which are shared by
+every calculator of the same class and issue type.
+"""
+
+# Built-in modules
+from collections import OrderedDict
+from os.path import join
+
+# Third-party modules
+import yaml
+
+# User-defined modules
+from directories import CONFIG_DIR
+from utilities import get_top_level_path
+
+# Name of the status group configuration file (within the configs folder)
+STATUS_CONFIG_FILE = 'status_maps.yaml'
+
+# Raw configuration and compiled tables, loaded once per process
+_config = None
+_tables = { }
+
+class FrozenOrderedDict(OrderedDict):
+  """
+  Ordered data dictionary that can no longer be modified once created.
+  """
+  
+  def __init__(self, *args, **kwargs):
+    OrderedDict.__init__(self, *args, **kwargs)
+    self._frozen = True
+  
+  def __setitem__(self, key, value, *args, **kwargs):
+    if (getattr(self, '_frozen', False)): raise TypeError('Status maps are read-only.')
+    OrderedDict.__setitem__(self, key, value, *args, **kwargs)
+  
+  def __delitem__(self, key, *args, **kwargs):
+    if (getattr(self, '_frozen', False)): raise TypeError('Status maps are read-only.')
+    OrderedDict.__delitem__(self, key, *args, **kwargs)
+
+class StatusConfig(object):
+  """
+  Compiled status group configuration of a calculator class and issue type.
+  """
+  
+  def __init__(self, priorities, status_groups, closed_groups, link_packs=()):
+    """
+    Compiles the given configuration fields into lookup tables.
+    
+    @param priorities: List of priorities, from highest to lowest.
+    @param status_groups: List of single-item data dictionaries, each mapping a
+    status group to its list of statuses.
+    @param closed_groups: List of status groups whose statuses count as closed.
+    @param link_packs: List of single-item data dictionaries, each mapping a
+    pack defined by issue links to its root issue and transitive setting.
+    """
+    
+    # Priority order and status group map (in configuration order)
+    self.priority_list = tuple(priorities)
+    self.status_map = FrozenOrderedDict([(group, tuple(statuses))
+      for group_map in status_groups for group, statuses in group_map.iteritems()])
+    
+    # Maps every status to its status group (the first one listing it)
+    self.status_groups = { }
+    for group, statuses in self.status_map.iteritems():
+      for status in statuses:
+        self.status_groups.setdefault(status, group)
+    
+    # Set of statuses that count as closed
+    self.closed_statuses = frozenset([status for group in closed_groups
+                                      for status in self.status_map.get(group, ())])
+    
+    # Maps every link pack to its (root issue, transitive) tuple
+    self.link_packs = FrozenOrderedDict([
+      (pack, (pack_def['root'], pack_def.get('transitive', False)))
+        for pack_map in link_packs for pack, pack_def in pack_map.iteritems()])
+
+def load_status_config(file_path=None):
+  """
+  Loads the raw status group configuration (only read once per process).
+  
+  @param file_path: Path of the configuration file. Defaults to the status
+  group configuration file within the configs folder.
+  @return: Data dictionary mapping calculator class names to issue types (or
+  'default') to their configuration fields.
+  """
+  
+  global _config
+  if (_config is None or file_path):
+    if (not file_path):
+      file_path = join(get_top_level_path(), CONFIG_DIR, STATUS_CONFIG_FILE)
+    with open(file_path, 'r') as config_file:
+      _config = yaml.safe_load(config_file)
+    _tables.clear()
+  return _config
+
+def _get_field(calc_class, issuetype, field):
+  """
+  Looks up a configuration field for the given calculator class and issue type,
+  falling back to the default entry and then to the entries of parent classes.
+  
+  @param calc_class: Calculator class whose configuration is being looked up.
+  @param issuetype: Issue type associated with the calculator.
+  @param field: Name of the configuration field.
+  @return: The value of the configuration field.
+  """
+  
+  config = load_status_config()
+  for cls in calc_class.__mro__:
+    entries = config.get(cls.__name__) or { }
+    for entry in [entries.get(issuetype), entries.get('default')]:
+      if (entry and field in entry): return entry[field]
+  raise KeyError('No %s configured for %s.' % (field, calc_class.__name__))
+
+def get_status_config(calc_class, issuetype):
+  """
+  Gets the compiled status group configuration for the given calculator class
+  and issue type, which is only compiled once and then shared.
+  
+  @param calc_class: Calculator class whose configuration is being retrieved.
+  @param issuetype: Issue type associated with the calculator.
+  @return: StatusConfig object containing the lookup tables.
+  """
+  
+  key = (calc_class.__name__, issuetype)
+  if (key not in _tables):
+    fields = ['priorities', 'status_groups', 'closed_groups', 'link_packs']
+    _tables[key] = StatusConfig(*[_get_field(calc_class, issuetype, field) for field in fields])
+  return _tables[key]
@@ -5,47 +5,28 @@ metrics.
 
 # Built-in modules
 from collections import OrderedDict
-from time import time
 
 # User-defined modules
 from constants import *
 from calculator import ComplianceCalculator
 from directories import PROJECT_DIR, RAW_DATA_DIR, PREV_DATA_DIR
 from db_accessor.jira_gt import JiraGT
+from tracing import span, tracer, save_trace
 from utilities import create_dirpath, move_old_files
 from xl_writer import RawDataWriter, ExportDataWriter
 
-def timer(func):
-  """
-  A decorator function that prints the execution time of whatever function is
-  passed into it.
-  """
-  
-  def func_wrapper(action='Operation', *args, **kwargs):
-    """
-    Function wrapper that prints the execution time of the func passed by
-    timer() after executing func.
-    
-    @param action: Textual description of the action being performed by the function.
-    @param *args: Arbitrary parameters passed into function.
-    @param **kwargs: Arbitrary keyword parameters passed into function.
-    """
-    
-    start_time = time()
-    results = func(*args, **kwargs)
-    print "\n>>>> %s ran in %f seconds. <<<<\n" % (action, time() - start_time)
-    return results
-  
-  return func_wrapper
-
-@timer
-def query_data():
+def query_data(db=None):
   """
   Queries Compliance data from the JIRA back end database and returns its results.
   
+  @param db: Connected JiraGT object to query with (such as one shared by a
+  batch run). If it is left blank, a connection is opened for the query.
   @return: Raw data queried from the JIRA back end database.
   """
   
+  # Uses the given connection
+  if (db): return db.get_compliance_data()
+  
   # Access JIRA backend and gets data
   db_accessor = JiraGT()
   db_accessor.connect()
@@ -53,7 +34,6 @@ def query_data():
   db_accessor.disconnect()
   return data
 
-@timer
 def generate_raw_data(data):
   """
   Re-arranges the data pulled from the back end of the JIRA database and 
@@ -79,7 +59,7 @@ def generate_raw_data(data):
   for key, params in data.iteritems():
     curr_params = [key]
     for k, v in params.iteritems():
-      if (k != HIST): curr_params.append(v)
+      if (k not in DERIVED_FIELDS): curr_params.append(v)
     raw_data[MAIN].append(curr_params)
     
     # Gets historical data if it exists
@@ -92,7 +72,6 @@ def generate_raw_data(data):
                              'Compliance Raw Data', raw_save_path)
   raw_writer.produce_workbook(raw_data)
   
-@timer
 def do_calculations(data):
   """
   Performs calculations on raw data pulled from the JIRA back end, and returns
@@ -113,7 +92,6 @@ def do_calculations(data):
   sev, status, _ = calc.get_metrics(data)
   return calc, sev, status
 
-@timer
 def export_metrics(calc, sev, status):
   """
   Takes the results of the calculated metrics and exports them to Excel
@@ -153,16 +131,38 @@ def export_metrics(calc, sev, status):
     exporter = ExportDataWriter(filename, save_path, series_names)
     exporter.produce_workbook(data, sheet_data=sheet_data)
 
-# Only runs script when it is being directly executed
-if (__name__ == '__main__'):
+def run_compliance(db=None):
+  """
+  Produces every Compliance file (raw data and metric data), tracing each step.
+  
+  @param db: Connected JiraGT object to query with. If it is left blank, a 
+  connection is opened for the query.
+  """
+  
   # Grabs Compliance data
-  data = query_data(action='Querying Compliance data')
+  with span('Querying Compliance data', 'extract', echo=True) as query_span:
+    data = query_data(db)
+    query_span.set(issues=len(data))
   
   # Generates raw Compliance data workbooks
-  generate_raw_data(data=data, action='Producing raw data')
+  with span('Producing raw data', 'write', echo=True):
+    generate_raw_data(data=data)
     
   # Calculates severity and status data
-  calc, sev, status = do_calculations(data=data, action='Performing calculations')
+  with span('Performing calculations', 'calculate', echo=True):
+    calc, sev, status = do_calculations(data=data)
   
   # Exports severity and status data
-  export_metrics(calc=calc, sev=sev, status=status, action='Exporting metric data')
\ No newline at end of file
+  with span('Exporting metric data', 'write', echo=True):
+    export_metrics(calc=calc, sev=sev, status=status)
+
+# Only runs script when it is being directly executed
+if (__name__ == '__main__'):
+  # Traces the whole run (exported to a trace file once it has finished)
+  run_span = tracer.start('Compliance run', 'run', True)
+  try:
+    run_compliance()
+  finally:
+    tracer.finish(run_span, echo=True)
+    save_trace('Compliance', run_span)
+    tracer.clear(run_span)
\ No newline at end of file
@@ -31,6 +31,7 @@ TRIVIAL = 'Trivial'
 
 # Data types for exports
 AGE = 'Age Data'
+AGE_PCT = 'Age Percentiles'
 SEV = 'Severity'
 PRIORITY = 'Priority'
 STATUS = 'Status'
@@ -54,6 +55,10 @@ OLD = 'Old Status'
 NEW = 'New Status'
 TRANS = 'Status Transition Date'
 PROJECT = 'Project'
+LINK_SET = 'Linked Issue Set'
+
+# Derived fields (kept out of raw data files, which only store queried fields)
+DERIVED_FIELDS = [HIST, LINK_SET]
 
 # Data Parameters (ClearQuest)
 HEADLINE = 'Headline'
@@ -77,6 +82,17 @@ FAT_1B_HI = 'Hi Priority Fat-1B'
 PILOT = 'Pilot'
 PILOT_HI = 'Hi Priority Pilot'
 
+# Flow metric types
+THROUGHPUT = 'Throughput'
+LEAD_TIME = 'Lead Time'
+CYCLE_TIME = 'Cycle Time'
+CUMULATIVE_FLOW = 'Cumulative Flow'
+
+# Time axis granularities
+DAILY = 'Daily'
+WEEKLY = 'Weekly'
+MONTHLY = 'Monthly'
+
 # Miscellaneous constants
 TOTAL = 'Total'
 OPEN = 'Open'
@@ -3,26 +3,39 @@ This module contains classes used to access the back end of the JIRA database
 and ClearQuest database.
 """
 
+# Built-in modules
+from contextlib import contextmanager
+from Queue import Queue
+from threading import Lock
+
 # Third-party modules
 import cx_Oracle
 import pyodbc
 
+# User-defined modules
+from tracing import span
+
 def log_action(func):
   """
-  A decorator function that prints a message when a query is being performed.
-  It should be used to wrap any query functions.
+  A decorator function that prints a message when a query is being performed,
+  and traces the query within a span. It should be used to wrap any query 
+  functions.
   """
   
   def func_wrapper(self, *args, **kwargs):
     """
-    Function wrapper that prints the fact that an action is occurring.
+    Function wrapper that prints the fact that an action is occurring, and 
+    records the number of records it returned.
     
     @param *args: Arbitrary parameters passed into function.
     @param **kwargs: Arbitrary keyword parameters passed into function.
     """
     
     print 'Querying data...'
-    return func(self, *args, **kwargs)
+    with span(func.__name__, 'query', args=repr(args), kwargs=repr(kwargs)) as query_span:
+      results = func(self, *args, **kwargs)
+      if (hasattr(results, '__len__')): query_span.set(records=len(results))
+    return results
     
   return func_wrapper
 
@@ -198,6 +211,86 @@ class MSSQL(_DBAccessor):
     # Calls the superclass init() to set appropriate parameters
     super(MSSQL, self).__init__(pyodbc, connectstr)
     
+####################################################################
+#                         Connection Pool                          #
+####################################################################
+
+class ConnectionPool(object):
+  """
+  This class shares a bounded number of database connections between threads
+  (such as the jobs of a batch run). Each connection is a separate accessor
+  object, which is only used by one thread at a time, and which is connected
+  whenever it is checked out (since its user may have disconnected it).
+  """
+
+  def __init__(self, accessor_class, size=2):
+    """
+    Initializes the pool. Accessors are only created when they are first needed.
+
+    @param accessor_class: _DBAccessor sub-class (taking no parameters) used to
+    create the accessors of the pool, such as JiraGT.
+    @param size: Maximum number of accessors (and so connections) of the pool.
+    """
+
+    self.accessor_class = accessor_class
+    self.size = max(size, 1)
+
+    # Accessors that are not checked out, and the number created so far
+    self.idle = Queue()
+    self.created = 0
+    self.lock = Lock()
+
+  def acquire(self):
+    """
+    Checks out a connected accessor, waiting for one to be released if every
+    accessor of the pool is already checked out.
+
+    @return: The accessor object.
+    """
+
+    with self.lock:
+      create = self.idle.empty() and self.created < self.size
+      if (create): self.created += 1
+    accessor = self.accessor_class() if (create) else self.idle.get()
+    try:
+      accessor.connect()
+    except Exception:
+      self.idle.put(accessor)
+      raise
+    return accessor
+
+  def release(self, accessor):
+    """
+    Returns a checked out accessor to the pool (leaving it connected).
+
+    @param accessor: The accessor object.
+    """
+
+    self.idle.put(accessor)
+
+  @contextmanager
+  def connection(self):
+    """
+    Context manager checking out an accessor for the duration of its block.
+
+    @yield: The connected accessor object.
+    """
+
+    accessor = self.acquire()
+    try:
+      yield accessor
+    finally:
+      self.release(accessor)
+
+  def close(self):
+    """
+    Disconnects every accessor that is not checked out. This function should be
+    called once the pool is no longer needed.
+    """
+
+    while (not self.idle.empty()):
+      self.idle.get().disconnect()
+
 # Imports lower-level class into top level
 from jira_gt import JiraGT
 from clearquest import ClearQuest
\ No newline at end of file
@@ -0,0 +1,199 @@
+"""
+This module contains the shared extraction layer of batch runs, which lets the
+jobs of a run that need issue data of the same project (such as SEPTA, which
+is also part of the State of Quality project map) share a single extraction.
+"""
+
+# Built-in modules
+from collections import OrderedDict
+from threading import Lock
+
+# User-defined modules
+from constants import *
+from tracing import span
+
+def _get_type_list(issuetype):
+  """
+  Turns an issue type (or list of issue types) into a list.
+
+  @param issuetype: Issue type string, or list of issue types.
+  @return: List of issue types.
+  """
+
+  return [issuetype] if (isinstance(issuetype, basestring)) else list(issuetype)
+
+class ExtractionPlanner(object):
+  """
+  Collects the issue data needs (projects and issue types) of every job of a
+  run before it starts, then extracts each project once, with the union of the
+  issue types needed by every job, and fans the data out to each job (only
+  keeping the issue types that it asked for). The data of a project is only
+  kept until every job that needs it has either received it or finished (see
+  release()).
+
+  Every project is extracted with the same fields (those of get_issue_data()),
+  so the union of the fields needed by the jobs is always covered.
+  """
+
+  def __init__(self):
+    """
+    Initializes the needs of the run.
+    """
+
+    # Maps projects to the union of the issue types needed, and the number of
+    # jobs that still need to receive their data
+    self.needs = OrderedDict()
+    self.remaining = { }
+
+    # Maps job names to the projects they still need to receive
+    self.pending = { }
+
+    # Maps projects to their extracted data, and the issue types it contains
+    self.data = { }
+    self.extracted = { }
+
+    # Locks of every project (so that each one is only extracted once, even if
+    # several jobs ask for it at the same time)
+    self.lock = Lock()
+    self.project_locks = { }
+
+  def require(self, project, issuetype, job=None):
+    """
+    Registers that a job of the run needs the data of the given project.
+
+    @param project: Project key.
+    @param issuetype: Issue type (or list of issue types) needed by the job.
+    @param job: Name of the job, so that its needs can be released once it has
+    finished (see release()).
+    """
+
+    with self.lock:
+      types = self.needs.setdefault(project, [])
+      types.extend([x for x in _get_type_list(issuetype) if (x not in types)])
+      self.remaining[project] = self.remaining.get(project, 0) + 1
+      if (job is not None): self.pending.setdefault(job, []).append(project)
+
+  def _release_project(self, project):
+    """
+    Records that one less job needs the data of the given project, dropping the
+    data once no job needs it anymore. The lock needs to be held by the caller.
+
+    @param project: Project key.
+    """
+
+    self.remaining[project] = self.remaining.get(project, 0) - 1
+    if (self.remaining[project] <= 0):
+      self.data.pop(project, None)
+      self.extracted.pop(project, None)
+
+  def release(self, job):
+    """
+    Releases the needs of a job that it has not received (such as when the job
+    failed early, or only asked for part of its projects) once it has finished,
+    so that their data is not kept for the rest of the run.
+
+    @param job: Name of the job.
+    """
+
+    with self.lock:
+      for project in self.pending.pop(job, []):
+        self._release_project(project)
+
+  def get_shared_projects(self):
+    """
+    Gets the projects needed by more than one job.
+
+    @return: Data dictionary mapping those projects to the number of jobs
+    needing them.
+    """
+
+    with self.lock:
+      return OrderedDict([(project, self.remaining[project]) for project in self.needs
+                          if (self.remaining[project] > 1)])
+
+  def get_issue_data(self, db, project='', issuetype=[DEFECT, DEFECT_SUB], job=None):
+    """
+    Gets the issue data of the given project with the given issue type(s),
+    extracting the project (with every issue type needed by the run) unless it
+    was already extracted.
+
+    @param db: Connected JiraGT object used if the project is extracted.
+    @param project: Project key for the project being queried for.
+    @param issuetype: Issue type (or list of issue types) being queried for.
+    @param job: Name of the job asking for the data. Only requests matching a
+    need registered by the job (or made without a job name) count toward
+    releasing the data.
+    @return: Data dictionary mapping issue keys to field names to associated
+    parameters, as returned by JiraGT.get_issue_data(). The parameters of each
+    issue are shared with the other jobs, so they should not be modified.
+    """
+
+    types = _get_type_list(issuetype)
+    with self.lock:
+      project_lock = self.project_locks.setdefault(project, Lock())
+
+    with project_lock:
+      # Extracts the project, unless it was extracted with every type needed
+      data = self.data.get(project)
+      if (data is None or not set(types) <= set(self.extracted[project])):
+        with self.lock:
+          union = list(self.needs.get(project, []))
+        union.extend([x for x in types if (x not in union)])
+        with span('Extracting %s' % project, 'extract', project=project,
+                  issue_types=union, jobs=self.remaining.get(project, 0)) as extract_span:
+          data = db.get_issue_data(project, union)
+          extract_span.set(issues=len(data))
+        self.data[project], self.extracted[project] = data, union
+      extracted = self.extracted[project]
+
+      # Drops the data once every job that needs it has received it (or right
+      # away, if it was extracted for a request that no job registered)
+      with self.lock:
+        pending = self.pending.get(job, [])
+        if (job is None or project in pending):
+          if (project in pending): pending.remove(project)
+          self._release_project(project)
+        elif (self.remaining.get(project, 0) <= 0):
+          self.data.pop(project, None)
+          self.extracted.pop(project, None)
+
+    # Only keeps the issue types asked for
+    if (set(types) >= set(extracted)):
+      return data
+    return OrderedDict([(key, params) for key, params in data.iteritems()
+                        if (params[ISSUETYPE] in types)])
+
+class PlannedAccessor(object):
+  """
+  Stands in for the connected accessor of a job, getting issue data through an
+  extraction planner and passing everything else on to the accessor.
+  """
+
+  def __init__(self, planner, db, job=None):
+    """
+    Initializes the planner and accessor being used.
+
+    @param planner: ExtractionPlanner object shared by the jobs of the run.
+    @param db: Connected JiraGT object of the job.
+    @param job: Name of the job (as its needs were registered with).
+    """
+
+    self.planner = planner
+    self.db = db
+    self.job = job
+
+  def get_issue_data(self, project='', issuetype=[DEFECT, DEFECT_SUB]):
+    """
+    Gets the issue data of the given project through the planner (see
+    ExtractionPlanner.get_issue_data()).
+
+    @param project: Project key for the project being queried for.
+    @param issuetype: Issue type (or list of issue types) being queried for.
+    @return: Data dictionary mapping issue keys to field names to associated
+    parameters.
+    """
+
+    return self.planner.get_issue_data(self.db, project, issuetype, self.job)
+
+  def __getattr__(self, name):
+    return getattr(self.db, name)
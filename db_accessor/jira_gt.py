@@ -14,7 +14,7 @@ import yaml
 from constants import *
 from directories import CONFIG_DIR
 from db_accessor import Oracle, log_action
-from utilities import get_top_level_path
+from utilities import get_top_level_path, get_link_set
 
 class JiraGT(Oracle):
   """
@@ -190,6 +190,7 @@ class JiraGT(Oracle):
         if (name == COMPS): val = val.replace('|', ',')
         if (name in [PBI, ROOT] and val is not None): val = val.read()
         data[results[0]][name] = val
+      data[results[0]][LINK_SET] = get_link_set(data[results[0]][LINKS])
         
     # Gets the historical data separately (saves querying time)
     query = """
@@ -354,6 +355,7 @@ class JiraGT(Oracle):
         if (name == COMPS): val = val.replace('|', ',')
         if (name in [PBI, ROOT] and val is not None): val = val.read()
         data[results[0]][name] = val
+      data[results[0]][LINK_SET] = get_link_set(data[results[0]][LINKS])
         
     # Gets the historical data separately (saves querying time)
     query = """
@@ -450,6 +452,7 @@ class JiraGT(Oracle):
       data[results[0]] = OrderedDict()
       for name, val in zip(fields, results[1:]):
         if (name in [LINKS]):
+          data[results[0]][LINK_SET] = get_link_set(val)
           val = ', '.join(val) if (val) else ''   # List > str
         data[results[0]][name] = val
         
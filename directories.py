@@ -44,4 +44,13 @@ TMS_DIR = 'Transport Management Systems'
 TEMPLATE_DIR = 'Templates'
 
 # Contains Powerpoint presentation files
-PPT_DIR = 'Presentations'
\ No newline at end of file
+PPT_DIR = 'Presentations'
+
+# Contains cached calculation results (reused when data is unchanged)
+CACHE_DIR = 'Cache'
+
+# Contains trace files of report runs (viewable in a Chrome trace viewer)
+TRACE_DIR = 'Traces'
+
+# Contains the history of metric results (snapshots of every run)
+HISTORY_DIR = 'History'
\ No newline at end of file
@@ -0,0 +1,435 @@
+"""
+This module contains the file manifest, which records every file produced by
+the reports and scripts (along with its kind, project, issue type, data type,
+date and fingerprint) within a single index file, so that later stages (such
+as moving old files or building the Powerpoint presentations) can look files up
+by their attributes rather than listing directories.
+"""
+
+# Built-in modules
+from contextlib import contextmanager
+from threading import Lock
+from time import sleep, time
+import atexit
+import errno
+import hashlib
+import os
+import re
+import shutil
+
+# User-defined modules
+from constants import AGE, AGE_PCT
+from directories import CACHE_DIR, PREV_DATA_DIR, PREV_AGE_DATA_DIR
+from utilities import create_dirpath, load_pickle, save_pickle
+
+# Kinds of files (other than AGE and AGE_PCT files)
+RAW = 'Raw Data'
+CHART = 'Chart'
+OTHER = 'Other'
+
+# File name patterns of dated files and chart files (such as "Defects by
+# Severity 2016-01-08.xlsx", whose issue type is Defect)
+_date_re = re.compile('(\d{4}-\d{2}-\d{2})\.\w+$')
+_chart_re = re.compile('(.+?)s by (.+?)(?: \d{4}-\d{2}-\d{2})?\.\w+$')
+
+# Names of the folders that old files are moved into, which are never looked
+# up (so their files are not kept within the manifest). Raw data files are
+# produced into the Data Archive folder as current files, so they are kept
+# (with the RAW kind, which lookups can filter on).
+_archive_dirs = set([os.path.normcase(name) for name in [PREV_DATA_DIR, PREV_AGE_DATA_DIR]])
+
+def describe(file_name):
+  """
+  Gets the attributes of a file from its name, following the naming of the
+  files produced by the reports.
+  
+  @param file_name: Name of the file (without its directory).
+  @return: Data dictionary with the kind, issue type, data type and date of
+  the file (None for those that cannot be told from the name).
+  """
+  
+  attrs = { 'kind' : OTHER, 'issue_type' : None, 'data_type' : None, 'date' : None }
+  date_match = _date_re.search(file_name)
+  if (date_match): attrs['date'] = date_match.group(1)
+  
+  chart_match = _chart_re.search(file_name)
+  if (RAW in file_name):
+    attrs['kind'] = RAW
+  elif (AGE_PCT in file_name or AGE in file_name):
+    attrs['kind'] = attrs['data_type'] = AGE_PCT if (AGE_PCT in file_name) else AGE
+  elif (chart_match):
+    attrs['kind'] = CHART
+    attrs['issue_type'], attrs['data_type'] = chart_match.groups()
+  return attrs
+
+def _get_key(path):
+  """
+  Gets the key of a path within the manifest (its normalized form, with either
+  kind of separator).
+  
+  @param path: Path of a file or directory.
+  @return: The normalized path.
+  """
+  
+  return os.path.normcase(os.path.normpath(path.replace('\\', '/')))
+
+def _is_archived(dir_key):
+  """
+  Checks whether a directory is a folder that old files are archived into.
+  
+  @param dir_key: Key of the directory (see _get_key()).
+  @return: True if the directory is an archive folder, False otherwise.
+  """
+  
+  return os.path.basename(dir_key) in _archive_dirs
+
+def _group(entries):
+  """
+  Groups the entries of an index file by directory, dropping those of archive
+  folders (and the entries of index files written before entries were grouped).
+  
+  @param entries: Data dictionary mapping directory keys to data dictionaries
+  mapping path keys to entries (or path keys to entries, for older files).
+  @return: Data dictionary mapping directory keys to data dictionaries mapping
+  path keys to entries.
+  """
+  
+  groups = { }
+  for key, value in entries.iteritems():
+    for path_key, entry in (value.iteritems() if ('path' not in value) else [(key, value)]):
+      if (not _is_archived(entry['directory'])):
+        groups.setdefault(entry['directory'], { })[path_key] = entry
+  return groups
+
+def _get_name(path):
+  """
+  Gets the name of a file (without its directory), with either kind of
+  separator.
+  
+  @param path: Path of the file.
+  @return: The name of the file.
+  """
+  
+  return path.replace('\\', '/').rsplit('/', 1)[-1]
+
+def _get_fingerprint(path):
+  """
+  Gets a content fingerprint of the given file.
+  
+  @param path: Path of the file.
+  @return: Hexadecimal MD5 digest of the content of the file.
+  """
+  
+  digest = hashlib.md5()
+  with open(path, 'rb') as f:
+    for chunk in iter(lambda: f.read(1 << 16), ''):
+      digest.update(chunk)
+  return digest.hexdigest()
+
+@contextmanager
+def _file_lock(file_path, timeout=60):
+  """
+  Context manager holding an inter-process lock on a file (a lock file created
+  next to it), so that processes sharing the file (such as the shards of a
+  report) do not write it at the same time. A lock left behind by a process
+  that stopped while holding it is broken once it is older than the timeout.
+  
+  @param file_path: Path of the file being locked.
+  @param timeout: Number of seconds after which a lock is considered stale.
+  """
+  
+  lock_path = file_path + '.lock'
+  while (True):
+    try:
+      os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+      break
+    except OSError, e:
+      if (e.errno != errno.EEXIST): raise
+    
+    # Waits for the lock, breaking it if it is stale
+    try:
+      if (time() - os.path.getmtime(lock_path) > timeout): os.remove(lock_path)
+    except OSError:
+      pass
+    sleep(0.1)
+  
+  try:
+    yield
+  finally:
+    os.remove(lock_path)
+
+class Manifest(object):
+  """
+  Index of the produced files, mapping their paths to entries with the
+  following attributes: path, directory, name, kind, project (or project group,
+  for the files of project groups and the TDC), issue type, data type, date and
+  fingerprint (along with the size and modification time the fingerprint was
+  taken at).
+  
+  Files are recorded as they are written (see XLWriter.produce_workbook()), and
+  directories that were never indexed (such as those with files from before the
+  manifest existed) are listed once, when they are first looked up. Files that
+  no longer exist are dropped whenever they are looked up, and files within
+  archive folders (such as Previous Severity and Status Data) are not kept.
+  """
+  
+  def __init__(self, file_name='Manifest.pickle', subdirs=[CACHE_DIR]):
+    """
+    Initializes the location of the index file. The index is loaded when it is
+    first used.
+    
+    @param file_name: Name of the index file.
+    @param subdirs: List of sub-directories (within the base Files folder)
+    where the index file is stored.
+    """
+    
+    self.file_name = file_name
+    self.subdirs = subdirs
+    
+    # Maps directory keys to path keys to entries, and the keys of the
+    # directories indexed
+    self.entries = None
+    self.indexed = None
+    
+    # Keys of the entries changed and removed, and of the directories indexed,
+    # since the index was loaded
+    self.changed = set()
+    self.removed = set()
+    self.new_indexed = set()
+    self.lock = Lock()
+  
+  def _get_file_path(self):
+    """
+    Gets the path of the index file.
+    
+    @return: The path of the index file.
+    """
+    
+    return os.path.join(create_dirpath(subdirs=self.subdirs), self.file_name)
+  
+  def _read(self):
+    """
+    Reads the index file.
+    
+    @return: A tuple of the entries (grouped by directory, see _group()) and
+    indexed directories of the index file (both empty if there is no readable
+    index file).
+    """
+    
+    file_path = self._get_file_path()
+    try:
+      entries, indexed = load_pickle(file_path, ({ }, set()))
+      return _group(entries), indexed
+    except Exception, e:
+      print "Ignoring unreadable manifest file %s: %s" % (file_path, str(e))
+      return { }, set()
+  
+  def _load(self):
+    """
+    Loads the index file (unless it is already loaded). The lock needs to be
+    held by the caller.
+    """
+    
+    if (self.entries is None): self.entries, self.indexed = self._read()
+  
+  def _set_entry(self, path, **attrs):
+    """
+    Records (or updates) the entry of a file, taking its fingerprint if the file
+    is new or was changed. Files within archive folders are not recorded. The
+    lock needs to be held by the caller.
+    
+    @param path: Path of the file.
+    @param **attrs: Attributes of the file, which override those told from its
+    name (see describe()).
+    @return: The entry of the file.
+    """
+    
+    key = _get_key(path)
+    dir_key = os.path.dirname(key)
+    entry = self.entries.get(dir_key, { }).get(key)
+    if (not entry):
+      entry = dict(describe(_get_name(path)), project=None, group=None,
+                   directory=dir_key, name=_get_name(path))
+    entry['path'] = path
+    entry.update([(name, value) for name, value in attrs.iteritems() if (value is not None)])
+    
+    # Files belong to either a project or a project group (or the TDC)
+    if (attrs.get('group')): entry['project'] = None
+    elif (attrs.get('project')): entry['group'] = None
+    if (_is_archived(dir_key)): return entry
+    
+    # Fingerprints the file unless it is unchanged
+    stat = os.stat(path)
+    if ((entry.get('size'), entry.get('mtime')) != (stat.st_size, stat.st_mtime)):
+      entry.update(size=stat.st_size, mtime=stat.st_mtime,
+                   fingerprint=_get_fingerprint(path))
+    
+    self.entries.setdefault(dir_key, { })[key] = entry
+    self.changed.add(key)
+    self.removed.discard(key)
+    return entry
+  
+  def _remove_entry(self, key):
+    """
+    Removes the entry with the given key. The lock needs to be held by the
+    caller.
+    
+    @param key: Key of the entry.
+    """
+    
+    dir_entries = self.entries.get(os.path.dirname(key), { })
+    if (dir_entries.pop(key, None) is not None):
+      self.removed.add(key)
+      self.changed.discard(key)
+  
+  def _index(self, directory):
+    """
+    Lists the files of a directory into the index, unless it was already
+    indexed. The lock needs to be held by the caller.
+    
+    @param directory: Path of the directory.
+    """
+    
+    dir_key = _get_key(directory)
+    if (dir_key in self.indexed or _is_archived(dir_key)): return
+    if (os.path.isdir(directory)):
+      for file_name in os.listdir(directory):
+        path = os.path.join(directory, file_name)
+        if (not file_name.startswith('~$') and os.path.isfile(path)):
+          self._set_entry(path)
+    self.indexed.add(dir_key)
+    self.new_indexed.add(dir_key)
+  
+  def record(self, path, **attrs):
+    """
+    Records a produced (or updated) file.
+    
+    @param path: Path of the file.
+    @param **attrs: Attributes of the file (such as the project), which
+    override those told from its name (see describe()).
+    @return: The entry of the file.
+    """
+    
+    with self.lock:
+      self._load()
+      return dict(self._set_entry(path, **attrs))
+  
+  def move(self, path, directory):
+    """
+    Moves a file into another directory, moving its entry along with it.
+    
+    @param path: Path of the file.
+    @param directory: Path of the directory it is moved into.
+    @return: The new path of the file.
+    """
+    
+    new_path = os.path.join(directory, _get_name(path))
+    shutil.move(path, new_path)
+    with self.lock:
+      self._load()
+      key = _get_key(path)
+      entry = self.entries.get(os.path.dirname(key), { }).get(key, { })
+      self._remove_entry(key)
+      attrs = dict([(name, entry.get(name)) for name in ['project', 'group', 'issue_type',
+                                                         'data_type']])
+      self._set_entry(new_path, **attrs)
+    return new_path
+  
+  def find(self, directory=None, **attrs):
+    """
+    Looks up the files with the given attributes.
+    
+    @param directory: Path of the directory the files are in. If left blank,
+    files are looked up in every directory (other than archive folders, whose
+    files are never recorded).
+    @param **attrs: Attributes that the files need to have (such as kind,
+    project, group, issue_type, data_type or date).
+    @return: List of the entries of the files, sorted by path.
+    """
+    
+    with self.lock:
+      self._load()
+      
+      # Only goes through the entries of the directory (if one is given)
+      if (directory):
+        self._index(directory)
+        candidates = self.entries.get(_get_key(directory), { }).items()
+      else:
+        candidates = [item for dir_entries in self.entries.values()
+                      for item in dir_entries.iteritems()]
+      
+      entries = []
+      for key, entry in candidates:
+        if (any([entry.get(name) != value for name, value in attrs.iteritems()])):
+          continue
+        if (not os.path.isfile(entry['path'])):
+          self._remove_entry(key)
+        else:
+          entries.append(dict(entry))
+    return sorted(entries, key=lambda entry: entry['path'])
+  
+  def reindex(self, directory):
+    """
+    Lists the files of a directory into the index again (such as after files
+    were added to it by hand).
+    
+    @param directory: Path of the directory.
+    """
+    
+    with self.lock:
+      self._load()
+      self.indexed.discard(_get_key(directory))
+      self._index(directory)
+  
+  def save(self):
+    """
+    Writes the entries changed since the index was loaded into the index file,
+    merging them with the entries recorded by other processes in the meantime
+    (see utilities.save_pickle()). The index file is locked while it is merged,
+    so that processes saving at the same time do not drop each other's entries.
+    """
+    
+    with self.lock:
+      if (not self.changed and not self.removed and not self.new_indexed): return
+      file_path = self._get_file_path()
+      with _file_lock(file_path):
+        entries, indexed = self._read()
+        for key in self.removed:
+          entries.get(os.path.dirname(key), { }).pop(key, None)
+        for key in self.changed:
+          dir_key = os.path.dirname(key)
+          entries.setdefault(dir_key, { })[key] = self.entries[dir_key][key]
+        indexed.update(self.new_indexed)
+        save_pickle(file_path, (entries, indexed))
+      
+      self.changed.clear()
+      self.removed.clear()
+      self.new_indexed.clear()
+
+# Manifest shared by the whole process (saved when the process exits, at the
+# latest)
+manifest = Manifest()
+atexit.register(manifest.save)
+
+def record_file(path, **attrs):
+  """
+  Records a produced file within the shared manifest (see Manifest.record()).
+  
+  @param path: Path of the file.
+  @param **attrs: Attributes of the file (such as the project).
+  @return: The given file path.
+  """
+  
+  manifest.record(path, **attrs)
+  return path
+
+def find_files(directory=None, **attrs):
+  """
+  Looks up files within the shared manifest (see Manifest.find()).
+  
+  @param directory: Path of the directory the files are in (if any).
+  @param **attrs: Attributes that the files need to have.
+  @return: List of the paths of the files, sorted by path.
+  """
+  
+  return [entry['path'] for entry in manifest.find(directory, **attrs)]
@@ -10,6 +10,7 @@ import re
 
 # User-defined modules
 from constants import BLOCKER, CRITICAL, MAJOR, MINOR, TRIVIAL, AGE, SEV, STATUS, TOTAL
+from manifest import manifest, CHART
 from powerpoint import Powerpoint
 from utilities import get_str_date
 
@@ -396,7 +397,8 @@ wrong colors, not aligned, etc.)."""
   
   def _get_age_files(self, dir_path, keyword=None):
     """
-    Gets a list of all the aging files within the given directory path.
+    Gets a list of all the aging files within the given directory path, as
+    recorded within the manifest.
     
     @param dir_path: Path of directory being searched for Age Data files.
     @param keyword: Additional keyword to search for in file name, if any.
@@ -405,13 +407,11 @@ wrong colors, not aligned, etc.)."""
     
     age_files = []
     
-    # Iterates through directory for aging files
-    for file_name in os.listdir(dir_path):
-      file_path = os.path.join(dir_path, file_name)
-      if (AGE in file_name and os.path.isfile(file_path) 
-          and file_name.endswith('xlsx') and not file_name.startswith('~$')):
-        if (not keyword or keyword in file_name):
-          age_files.append(file_path)
+    # Iterates through the aging files recorded in the directory
+    for entry in manifest.find(dir_path, data_type=AGE):
+      if (entry['name'].endswith('xlsx')):
+        if (not keyword or keyword in entry['name']):
+          age_files.append(entry['path'])
         
     return age_files
   
@@ -515,8 +515,9 @@ wrong colors, not aligned, etc.)."""
   def _get_chart_files(self, dir_path, keywords, issue_type=None):
     """
     Gets an Ordered data dictionary of all the chart files (Severity, Status, etc) 
-    of the given issue type within the given directory path, with each keyword 
-    within the keywords list mapped to the associated file paths with the keyword.
+    of the given issue type within the given directory path (as recorded within
+    the manifest), with each keyword within the keywords list mapped to the 
+    associated file paths with the keyword.
     
     @param dir_path: Path of directory being searched for chart files.
     @param keywords: List of keywords for file paths to have. If a file path 
@@ -528,11 +529,10 @@ wrong colors, not aligned, etc.)."""
     # Initializes paths dictionary
     paths = OrderedDict([(keyword, []) for keyword in keywords])
     
-    # Iterates through directory for aging files
-    for file_name in os.listdir(dir_path):
-      file_path = os.path.join(dir_path, file_name)
-      if (os.path.isfile(file_path) and file_name.endswith('xlsx') and not 
-          file_name.startswith('~$')):
+    # Iterates through the chart files recorded in the directory
+    for entry in manifest.find(dir_path, kind=CHART):
+      file_name, file_path = entry['name'], entry['path']
+      if (file_name.endswith('xlsx')):
         # Pulls issue type from file
         file_type_pattern = self._issue_type_re.search(file_name)
         if (file_type_pattern):
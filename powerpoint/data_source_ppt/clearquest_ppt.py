@@ -136,7 +136,9 @@ are all closed, all charts and tables related to that given issue type are exclu
     # Setups up the parameters for using the win32 functionalities
     self.setup()
     
-    # Performs work for generating Powerpoint and cleans up afterward
+    # Performs work for generating Powerpoint and cleans up afterward (leaving
+    # no file path if it fails)
+    save_path = None
     try:
       # Add title slide
       slide = self.add_title_slide(self.title, date.strftime('%B %d, %Y'))
@@ -171,5 +173,7 @@ are all closed, all charts and tables related to that given issue type are exclu
       self.ppt_file.SaveAs(save_path)
     except Exception, e:
       print str(e)    # For troubleshooting
+      save_path = None
     #finally:
-    self.cleanup()
\ No newline at end of file
+    self.cleanup()
+    return save_path
\ No newline at end of file
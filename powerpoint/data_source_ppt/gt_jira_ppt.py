@@ -180,5 +180,6 @@ Build Pending, Deployed, Deployed to Test, Smoke Test, In Test, Test Defects Pen
       save_path = '%s\\%s %s (GT JIRA).pptx' % (self.save_path, self.file_name, 
                                                 date.strftime('%Y-%m-%d'))
       self.ppt_file.SaveAs(save_path)
+      return save_path
     finally:
       self.cleanup()
\ No newline at end of file
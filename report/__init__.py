@@ -4,30 +4,59 @@ This package contains modules for running various types of reports.
 
 # Built-in modules
 from collections import OrderedDict
-from time import time
+from datetime import date
+from multiprocessing import Pool
 
 # User-define modules
 from constants import *
 from directories import STATE_OF_QUALITY_DIR, PROJECT_DIR, RAW_DATA_DIR, PREV_DATA_DIR, PREV_AGE_DATA_DIR
 from db_accessor.jira_gt import JiraGT
 from calculator import JiraGTCalculator
+from calculator.cache import CalculationCache, CalculationCheckpoint
+from report.artifacts import ArtifactGraph
+from report.checkpoint import ReportCheckpoint, EXTRACTED, CALCULATED, RAW_WRITTEN, METRICS_WRITTEN
+from report.pipeline import Pipeline, Stage
+from report.project_store import ProjectStore, DATA, METRICS
+from report.rollup import Rollup
+from report.snapshot_store import SnapshotStore
+from manifest import manifest, record_file
+from tracing import span, tracer, save_trace
 from xl_writer import RawDataWriter, ExportDataWriter, TableDataWriter
-from utilities import create_dirpath, move_old_files
+from utilities import create_dirpath, move_old_files, reset_dirpaths
 
-def timer(func, action='Operation', *args, **kwargs):
+# Stages of a report that can be performed separately (querying project data,
+# producing project files from it, and producing group files and Powerpoint)
+EXTRACT_STAGE, METRICS_STAGE, DECK_STAGE = 'extract', 'metrics', 'deck'
+STAGES = [EXTRACT_STAGE, METRICS_STAGE, DECK_STAGE]
+
+def calculate_metrics(project, jobs, use_cache=False, age_sketches=False, checkpoints=False):
   """
-  Decorator function that prints the execution time of the func after 
-  executing it.
+  Performs the calculations for every calculation job of a single project. This
+  function is kept at the module level so that it can be dispatched to a 
+  worker process by a multiprocessing pool.
   
-  @param func: Function being called and timed.
-  @param action: Textual description of the action being performed by the function.
-  @param *args: Arbitrary parameters passed into function.
-  @param **kwargs: Arbitrary keyword parameters passed into function.
+  @param project: Name of project whose metrics are being calculated.
+  @param jobs: List of tuples, each containing a job key, the calculator class,
+  the issue type, and the (compacted) data dictionary for that issue type:
+    [(job key, calculator class, issue type, data),]
+  @param use_cache: True if the results of previous runs should be reused for
+  data that has not changed, False otherwise.
+  @param age_sketches: True if age data should carry quantile sketches (so 
+  that percentiles can be produced), False otherwise.
+  @param checkpoints: True if the weekly sweeps of the calculators should 
+  resume from their checkpoints (see CalculationCheckpoint), False otherwise.
+  @return: List of tuples pairing each job key with the (severity, status, age)
+  tuple calculated for it, in the same order as the jobs passed.
   """
   
-  start_time = time()
-  results = func(*args, **kwargs)
-  print "\n>>>> %s ran in %f seconds. <<<<\n" % (action, time() - start_time)
+  cache = CalculationCache(checkpoints=checkpoints) if (use_cache) else None
+  checkpoint = CalculationCheckpoint() if (checkpoints and not use_cache) else None
+  
+  results = []
+  for job_key, calc_class, issue_type, data in jobs:
+    calc = calc_class(project, issue_type)
+    calc.age_sketches = age_sketches
+    results.append((job_key, calc.get_metrics(data, cache=cache, checkpoint=checkpoint)))
   return results
 
 class Report(object):
@@ -35,12 +64,89 @@ class Report(object):
   Generic class responsible for producing the State of Quality reports.
   """
   
-  def __init__(self):
+  def __init__(self, processes=None, use_cache=False, percentiles=None, calc_workers=None,
+               write_workers=1, queue_size=1, skip_unchanged=False, checkpoints=False,
+               trace=False):
     """
     Initializes the parameters responsible for producing reports for a specific
     data source.
+    
+    @param processes: Number of worker processes used to calculate project 
+    metrics in parallel. The processes are only used through the workers of the
+    calculation stage (see calc_workers), each of which keeps one process busy.
+    If left blank (or set to 0), calculations are performed on the threads of
+    the calculation stage.
+    @param use_cache: True if calculation results of previous runs should be 
+    reused for projects whose data has not changed, False otherwise.
+    @param percentiles: List of age percentiles (such as [50, 90, 99]) to 
+    produce age percentile tables for, at the project, group and TDC levels.
+    @param calc_workers: Number of projects whose metrics are calculated at the
+    same time (each one on a worker process if processes are used). If left
+    blank, one project is calculated per worker process (or a single one if no
+    worker processes are used).
+    @param write_workers: Number of projects whose Excel files are written at 
+    the same time.
+    @param queue_size: Maximum number of projects waiting in front of each stage
+    of the report pipeline (querying, calculation, writing), which bounds the
+    number of project data sets held in memory.
+    @param skip_unchanged: True if files whose inputs have not changed since the
+    previous run should be left as they are (see ArtifactGraph), False if every
+    file should be produced again.
+    @param checkpoints: True if the progress of every run should be checkpointed
+    (see ReportCheckpoint), so that an interrupted run can be resumed, and the
+    weekly sweeps of the calculations should resume from the last week already
+    counted (see CalculationCheckpoint), False otherwise. Resumed runs are
+    always checkpointed.
+    @param trace: True if the spans of every run should be exported to a Chrome
+    trace-event file (see tracing.save_trace), False otherwise.
     """
     
+    # Number of worker processes used for metric calculations, and the worker
+    # pool shared with other jobs (if set, such as by a batch run, it is used
+    # instead of a pool of its own, and is left open)
+    self.processes = processes
+    self.pool = None
+    
+    # Determines whether cached calculation results are reused
+    self.use_cache = use_cache
+    
+    # Age percentiles produced alongside average ages (none by default)
+    self.percentiles = percentiles if (percentiles) else []
+    
+    # Worker threads of the calculation and writing stages, and the queue size 
+    # between stages (querying always runs on the single database connection)
+    self.calc_workers = calc_workers
+    self.write_workers = write_workers
+    self.queue_size = queue_size
+    
+    # Determines whether unchanged artifacts are skipped, and the artifact graph
+    # of the current run (only set while a report is being produced)
+    self.skip_unchanged = skip_unchanged
+    self.artifacts = None
+    
+    # Determines whether runs are checkpointed, the checkpoint of the current 
+    # run, and the entries of the projects that an interrupted run had already
+    # worked on (only set while a report is being produced)
+    self.checkpoints = checkpoints
+    self.checkpoint = None
+    self.resumed = { }
+    
+    # Determines whether a trace file is saved for every run
+    self.trace = trace
+    
+    # Latest queried data and metric data of every project
+    self.store = ProjectStore(self.__class__.__name__)
+    
+    # Name of the runs of the report, which names their checkpoint, artifact and
+    # trace files (the shards of a sharded run each have their own, see 
+    # report.sharding)
+    self.run_name = self.__class__.__name__
+    
+    # Snapshots of the metric results of every run, and the date of the current
+    # run (only set while a report is being produced)
+    self.snapshots = SnapshotStore()
+    self.run_date = None
+    
     # Database object (needs to be set to an actual _DBAccessor subclass)
     self.db = None
     
@@ -78,10 +184,12 @@ class Report(object):
     
     raise NotImplemented('Needs to be implemented by sub-class.')
   
-  def _query_data(self, *args, **kwargs):
+  def _query_data(self, skip=(), *args, **kwargs):
     """
     Iteratively queries data from the data source.
     
+    @param skip: Keys of the projects that are not queried (as they were 
+    already queried by an interrupted run), in which case they are not yielded.
     @param *args: Arbitrary list arguments for the function.
     @param *kwargs: Arbitrary keyword arguments for the function.
     @yield: A tuple of three items, with the first two items being group name
@@ -91,6 +199,120 @@ class Report(object):
     
     raise NotImplemented('Needs to be implemented by sub-class.')
   
+  def _get_target_map(self, targets=None):
+    """
+    Gets the part of the project map targeted by a run.
+    
+    @param targets: List of project keys and project group names. If it is left
+    blank, every project is targeted.
+    @return: Ordered data dictionary mapping project groups to lists of targeted
+    projects, in the same format (and order) as the project map.
+    """
+    
+    if (not targets): return OrderedDict(self.project_map)
+    
+    # Raises an error for names that are neither projects nor groups
+    project_keys = [proj for projects in self.project_map.values() for proj, _ in projects]
+    unknown = [x for x in targets if (x not in self.project_map and x not in project_keys)]
+    if (unknown):
+      raise KeyError('Unknown projects or project groups: %s' % ', '.join(unknown))
+    
+    target_map = OrderedDict()
+    for group, projects in self.project_map.iteritems():
+      projects = [x for x in projects if (group in targets or x[0] in targets)]
+      if (projects): target_map[group] = projects
+    return target_map
+  
+  def _get_project_data(self, target_map, query=True, load=True):
+    """
+    Iteratively gets the data of every targeted project, in project map order.
+    Projects that an interrupted run had already queried (or every project, if
+    data is not being queried) are taken from the project store, with no data 
+    if an interrupted run had completed them (or if stored data is not being
+    loaded). Queried data is stored in the project store as it arrives.
+    
+    @param target_map: Targeted part of the project map.
+    @param query: True if data should be queried from the data source, False if
+    the data stored by an earlier run should be used instead.
+    @param load: True if the stored data of the projects that are not queried
+    should be loaded, False if it is not needed (such as when no project files
+    are being produced).
+    @yield: A tuple of three items (group, project, data), as yielded by 
+    _query_data().
+    """
+    
+    # Skips every project that is not queried (in the project map order)
+    targeted = [proj for projects in target_map.values() for proj, _ in projects]
+    skip = set([proj for projects in self.project_map.values() for proj, _ in projects
+                if (not query or proj in self.resumed or proj not in targeted)])
+    queried = self._query_data(skip=skip)
+    
+    for group, projects in target_map.iteritems():
+      for proj, _ in projects:
+        if (proj in skip):
+          if (proj in self.resumed): print "Resuming %s from checkpoint..." % proj
+          completed = self.resumed.get(proj, { }).get(METRICS_WRITTEN)
+          yield group, proj, None if (completed or not load) else self.store.load(proj, DATA)
+        else:
+          with span('Querying data for %s' % proj, 'extract', project=proj):
+            item = next(queried)
+            self.store.save(proj, DATA, item[2])
+          yield item
+  
+  def _save_checkpoint(self, project, stage, **values):
+    """
+    Records that a stage of a project was completed (if the run is being
+    checkpointed).
+    
+    @param project: Key of the project.
+    @param stage: Stage that was completed.
+    @param **values: Values saved along with the stage.
+    """
+    
+    if (self.checkpoint): self.checkpoint.save(project, stage, **values)
+  
+  def _record_output(self, file_path, **attrs):
+    """
+    Attributes a produced file to the artifact being built (if unchanged 
+    artifacts are being skipped), and records its attributes within the
+    manifest.
+    
+    @param file_path: Path of the file produced.
+    @param **attrs: Attributes of the file (such as project or issue_type).
+    @return: The given file path.
+    """
+    
+    if (self.artifacts): self.artifacts.record_output(file_path)
+    if (attrs): record_file(file_path, **attrs)
+    return file_path
+  
+  def _build_artifact(self, name, build_func, inputs=None, deps=(), action=None, **attrs):
+    """
+    Builds an artifact of the report within a span. If unchanged artifacts are
+    being skipped, the artifact is added to the artifact graph and only built if
+    its inputs (or the nodes it depends on) have changed since the previous run.
+    
+    @param name: Unique name of the artifact.
+    @param build_func: Function (taking no parameters) building the artifact.
+    @param inputs: Content read by the artifact, other than its dependencies.
+    @param deps: Names of the artifact graph nodes the artifact depends on.
+    @param action: Textual description of the building of the artifact (used to
+    name its span). If it is left blank, the name of the artifact is used.
+    @param **attrs: Attributes of the span (such as the project).
+    @return: A tuple with two items (built, results). The first is True if the
+    artifact was built, and the second is the return value of the function (or
+    None if it was skipped).
+    """
+    
+    with span(action or name, 'write', echo=True, **attrs) as build_span:
+      if (not self.artifacts):
+        built, results = True, build_func()
+      else:
+        self.artifacts.add(name, inputs, deps)
+        built, results = self.artifacts.build(name, build_func)
+      build_span.set(built=built)
+    return built, results
+  
   def _prepare_data_for_raw_file(self, data):
     """
     Helper function that converts the given data dictionary into a format
@@ -111,7 +333,7 @@ class Report(object):
       
       # Obtains main data parameters
       for k, v in params.iteritems():
-        if (k != HIST): curr_params.append(v)
+        if (k not in DERIVED_FIELDS): curr_params.append(v)
       raw_data[MAIN].append(curr_params)
       
       # Gets historical data if it exists (for write to separate sheet)
@@ -143,7 +365,7 @@ class Report(object):
     # Writes data to raw data files
     raw_writer = RawDataWriter(raw_data.keys(), self.raw_data_headers, 
                                '%s Raw Data' % project, save_path)
-    return raw_writer.produce_workbook(raw_data)
+    return self._record_output(raw_writer.produce_workbook(raw_data), project=project)
   
   def _produce_age_file(self, data, save_path_trail, prefix='Average Issue',
                         chart_title='Average Aging (in days)', side_header='Priority',
@@ -175,14 +397,59 @@ class Report(object):
     # Saves age data
     writer = TableDataWriter(file_name, save_path, chart_title=chart_title, 
                         side_header=side_header, top_header=top_header)
-    return writer.produce_workbook(data, write_func=float)
+    return self._record_output(writer.produce_workbook(data, write_func=float))
+  
+  def _produce_percentile_file(self, data, save_path_trail, prefix='Issue',
+                               chart_title='Age Percentiles (in days)', 
+                               side_header='Priority', top_header='Status'):
+    """
+    Produces a single Excel file containing age percentile data for all 
+    available issue types, with one sheet for each issue type and percentile.
+    
+    @param data: Age data whose AverageAge objects carry quantile sketches. It
+    has the following structure:
+      <issue type> -> <priority> -> <status group> -> <AverageAge object>
+    @param save_path_trail: List of directories that form a trail to the save
+    location, starting from the base Files folder (which does not need to be
+    included in the list).
+    @param prefix: Prefix to the given file name.
+    @param chart_title: Title of the table within the sheets.
+    @param side_header: Header for the side of the table.
+    @param top_header: Header for the top of the table.
+    @return: File path of the age percentile file produced.
+    """
+    
+    # Save path for project
+    save_path = create_dirpath(subdirs=save_path_trail)
+    
+    # Moves all old files of the given data type to the old folder
+    move_old_files([AGE_PCT], save_path_trail + [PREV_AGE_DATA_DIR])
+    
+    # Sets file name (without data or file extension)
+    file_name = '%s %s' % (prefix, AGE_PCT)
+    
+    # Estimates each percentile for every priority and status group
+    percentile_data = OrderedDict()
+    for issue_type, age_map in data.iteritems():
+      for percentile in self.percentiles:
+        percentile_data['%s p%g' % (issue_type, percentile)] = OrderedDict([
+          (priority, OrderedDict([
+            (group, age.get_percentile(percentile)) for group, age in status_map.iteritems()
+          ])) for priority, status_map in age_map.iteritems()
+        ])
+    
+    # Saves age percentile data
+    writer = TableDataWriter(file_name, save_path, chart_title=chart_title, 
+                        side_header=side_header, top_header=top_header)
+    return self._record_output(writer.produce_workbook(percentile_data))
   
   def _produce_chart_file(self, project, data, issue_type, data_type, 
-                          series_names, prefix=''):
+                          series_names, prefix='', save_path_trail=None, group=None):
     """
     Produces a single metric Excel file containing chart data.
     
-    @param project: Name of project that the file is associated with.
+    @param project: Name of project that the file is associated with (None for
+    the files of a project group).
     @param data: Data to be inserted into the metric file.
     @param issue_type: Type of issue represented within metric file (Defect,
     Change Request, Task, etc).
@@ -191,11 +458,17 @@ class Report(object):
     @param series_names: List of tuple containing series names paired with 
     their associated descriptions.
     @param prefix: Prefix to the given file name.
+    @param save_path_trail: List of directories that form a trail to the save
+    location, starting from the base Files folder. Defaults to the project's 
+    folder.
+    @param group: Name of the project group (or TDC) that the file is
+    associated with, if it is a file of a project group rather than of a
+    project (it is recorded as such within the manifest).
     @return: File path of the metric data file produced.
     """
     
-    # Save path for project
-    directories = self.base_dir_trail + [PROJECT_DIR, project]
+    # Save path for project (unless another location is given)
+    directories = save_path_trail if (save_path_trail) else self.base_dir_trail + [PROJECT_DIR, project]
     save_path = create_dirpath(subdirs=directories)
     
     # Moves all old files of the given data type to the old folder
@@ -231,15 +504,35 @@ class Report(object):
       
     # Performs exports
     exporter = ExportDataWriter(file_name, save_path, series_names)
-    return exporter.produce_workbook(data, sheet_data=sheet_data)
+    owner = { 'group' : group } if (group) else { 'project' : project }
+    return self._record_output(exporter.produce_workbook(data, sheet_data=sheet_data),
+                               issue_type=issue_type, data_type=data_type, **owner)
   
-  def _produce_metric_files(self, project, data, *args, **kwargs):
+  def _get_calc_jobs(self, project, data):
+    """
+    Segments the given project data into calculation jobs, each of which can be
+    performed independently (and in a separate process) by calculate_metrics().
+    
+    @param project: Name of project whose data is being segmented.
+    @param data: Data from which calculated metrics are derived.
+    @return: List of tuples, each containing a job key, the calculator class,
+    the issue type, and the compacted data dictionary for that issue type:
+      [(job key, calculator class, issue type, data),]
+    """
+    
+    raise NotImplemented('Needs to be implemented by sub-class.')
+  
+  def _produce_metric_files(self, project, data, results=None, write=True, *args, **kwargs):
     """
     Produces all the Excel metric files to be used in the final Powerpoint 
     report.
     
     @param project: Name of project for which metric files are being produced.
     @param data: Data from which calculated metrics are derived.
+    @param results: Results of calculate_metrics() for the project, if they were
+    already calculated elsewhere (in which case data is not used).
+    @param write: False if only the metric data is needed (its files are 
+    unchanged), True otherwise.
     @param *args: Arbitrary list arguments for the function.
     @param *kwargs: Arbitrary keyword arguments for the function.
     @return: Tuple of three data dictionaries for severity data, status data,
@@ -248,16 +541,15 @@ class Report(object):
     
     raise NotImplemented('Needs to be implemented by sub-class.')
   
-  def _produce_group_age_tables(self, data, *args, **kwargs):
+  def _produce_group_files(self, group_data, tdc_data, *args, **kwargs):
     """
-    Combines data dictionary age data of every group contained inside, and 
-    outputs Average Age data file for all of them. Afterwards, produces an
-    overall Average Age data file for all contained projects.
+    Produces the group-level files (such as Average Age data files) of every 
+    project group, as well as the overall files for all contained projects.
     
-    @param data: Multi-level data dictionary mapping groups to projects to age
-    data dictionaries. It has the following structure:
-      <project group> -> <project> -> <issue type> -> <priority> 
-        -> <status group> -> <AverageAge object>
+    @param group_data: Data dictionary mapping project groups to their rolled up
+    metric data, which has the same structure as the (severity, status, age) 
+    tuple returned by _produce_metric_files() for a single project.
+    @param tdc_data: Rolled up metric data of all projects as a whole.
     @param *args: Arbitrary list arguments for the function.
     @param *kwargs: Arbitrary keyword arguments for the function.
     """
@@ -274,37 +566,280 @@ class Report(object):
     @return: File path for the Powerpoint file.
     """
     
-    self.ppt.generate_presentation()
+    file_path = self.ppt.generate_presentation()
+    if (file_path): self._record_output(file_path)
+    return file_path
+  
+  def _get_snapshot_metrics(self, metric_data):
+    """
+    Pairs the severity, status and age data of every issue type within the
+    given metric data, for its snapshot.
+    
+    @param metric_data: Tuple of severity, status and age data, as returned by
+    _produce_metric_files() (or rolled up from it).
+    @return: List of tuples with the following format:
+      [(issue type, severity, status, age),]
+    """
+    
+    sev_data, status_data, age_data = metric_data
+    return [(issue_type, sev, status_data[issue_type], age_data.get(issue_type))
+            for issue_type, sev in sev_data.iteritems()]
+  
+  def _save_snapshot(self, name, metric_data):
+    """
+    Saves the snapshot of the metric data of a project (or project group) for
+    the current run. A snapshot that cannot be saved does not stop the report.
+    
+    @param name: Key of the project (or name of the project group).
+    @param metric_data: Tuple of severity, status and age data.
+    """
+    
+    try:
+      self.snapshots.save(self.run_date, self.data_source, name,
+                          self._get_snapshot_metrics(metric_data))
+    except Exception, e:
+      print "Could not save the snapshot of %s: %s" % (name, str(e))
   
-  def produce_report(self):
+  def _calculate_project(self, item, pool=None):
     """
-    Produces the State of Quality report for the associated data source.
+    Calculation stage of the report pipeline, which calculates the metrics of a
+    single project.
+    
+    @param item: Tuple of three items (group, project, data), as yielded by 
+    _query_data().
+    @param pool: Worker pool that the calculations are dispatched to. If left
+    blank, they are performed on the current thread.
+    @return: Tuple of four items (group, project, data, results), where the 
+    results are those of calculate_metrics().
     """
     
-    # Connects into database
-    self.db.connect()
+    group, project, data = item
+    entry = self.resumed.get(project, { })
+    if (entry.get(METRICS_WRITTEN)): return group, project, None, None
+    if (entry.get(CALCULATED)):      return group, project, data, entry['results']
+    if (not entry.get(EXTRACTED)):   self._save_checkpoint(project, EXTRACTED)
+    
+    with span('Calculating metrics for %s' % project, 'calculate', echo=True, 
+              project=project) as calc_span:
+      jobs = self._get_calc_jobs(project, data)
+      calc_span.set(jobs=len(jobs), pooled=bool(pool))
+      args = (project, jobs, self.use_cache, bool(self.percentiles), self.checkpoints)
+      results = pool.apply(calculate_metrics, args) if (pool) else calculate_metrics(*args)
+    self._save_checkpoint(project, CALCULATED, results=results)
+    return group, project, data, results
+  
+  def _write_project(self, item):
+    """
+    Writing stage of the report pipeline, which produces the raw data file and
+    the metric files of a single project.
     
-    # Prepares aging data data dictionary
-    age_data = OrderedDict()
+    @param item: Tuple of four items (group, project, data, results), as 
+    returned by _calculate_project().
+    @return: Tuple of the group, the project and its metric data, as returned 
+    by _produce_metric_files().
+    """
     
-    # Queries data for use
-    for group, project, data in timer(self._query_data, action='Querying data'):
-      if (group not in age_data): age_data[group] = OrderedDict()
-      if (project not in age_data[group]): age_data[group][project] = OrderedDict()
+    group, project, data, results = item
+    entry = self.resumed.get(project, { })
+    nodes = ['%s %s' % (project, node) for node in 
+             ['data', 'metrics', 'raw data file', 'metric files']]
+    data_node, metrics_node, raw_node, files_node = nodes
+    
+    # Takes the metric data of projects completed by an interrupted run from the
+    # project store (along with their artifacts)
+    if (entry.get(METRICS_WRITTEN)): return group, project, self._restore_project(project)
+    
+    # Adds the queried data and calculated metrics to the artifact graph
+    if (self.artifacts):
+      self.artifacts.add(data_node, data)
+      self.artifacts.add(metrics_node, results, [data_node])
+    
+    # Produces Excel raw data files (unless an interrupted run already did)
+    if (not entry.get(RAW_WRITTEN)):
+      self._build_artifact(raw_node, 
+        lambda: self._produce_raw_data_file(project=project, data=data), deps=[data_node],
+        action='Producing raw data files for %s' % project, project=project)
+      self._save_checkpoint(project, RAW_WRITTEN)
+    
+    # Produces Excel metric data for Powerpoint presentation (only getting the
+    # metric data if the files are unchanged)
+    built, metric_data = self._build_artifact(files_node, 
+      lambda: self._produce_metric_files(project=project, data=None, results=results), 
+      deps=[metrics_node], action='Producing metric files for %s' % project, project=project)
+    if (not built):
+      metric_data = self._produce_metric_files(project, None, results=results, write=False)
+    self.store.save(project, METRICS, {'metric_data' : metric_data, 
+      'artifacts' : self.artifacts.get_nodes(nodes) if (self.artifacts) else None})
+    self._save_snapshot(project, metric_data)
+    self._save_checkpoint(project, METRICS_WRITTEN)
+    return group, project, metric_data
+  
+  def _restore_project(self, project):
+    """
+    Gets the metric data of a project that was produced by an earlier run from
+    the project store, adding its artifact graph nodes back into the graph (so
+    that group files and the Powerpoint presentation can depend on them).
+    
+    @param project: Key of the project.
+    @return: The metric data of the project, or None if none was stored.
+    """
+    
+    entry = self.store.load(project, METRICS)
+    if (entry is None): return None
+    
+    metric_data = entry['metric_data']
+    if (self.artifacts and entry['artifacts']):
+      self.artifacts.restore(entry['artifacts'])
+    elif (self.artifacts):
+      metrics_node, files_node = '%s metrics' % project, '%s metric files' % project
+      self.artifacts.add(metrics_node, metric_data)
+      self.artifacts.add(files_node, deps=[metrics_node])
+    return metric_data
+  
+  def produce_report(self, resume=False, targets=None, stages=STAGES):
+    """
+    Produces the State of Quality report for the associated data source. If
+    checkpoints are enabled, the progress of every project is checkpointed as it
+    goes, so that a run that is interrupted (such as by a database timeout or a
+    locked Excel file) can be resumed.
+    
+    Runs can be limited to some projects and stages, in which case everything
+    else is taken from the previous runs: data that is not queried is taken
+    from the project store, and the group files and Powerpoint presentation
+    roll up the stored metric data of the projects that were not produced.
+    
+    @param resume: True if the projects completed by the previous (interrupted)
+    run should be taken from its checkpoint rather than queried, calculated and
+    written again, False if the report should be produced from scratch.
+    @param targets: List of project keys and project group names whose project
+    data is queried and whose project files are produced. If it is left blank,
+    every project is targeted.
+    @param stages: List of stages being performed (see STAGES), which are:
+      - extract: queries the data of the targeted projects into the store
+      - metrics: produces the files of the targeted projects (from the queried
+        data, or the stored data if it is not being queried)
+      - deck: produces the group files and the Powerpoint presentation
+    """
+    
+    # Determines the targeted projects and the stages performed
+    target_map = self._get_target_map(targets)
+    extract, metrics, deck = [stage in stages for stage in STAGES]
+    if (metrics and not extract):
+      missing = [proj for projects in target_map.values() for proj, _ in projects
+                 if (not self.store.has(proj, DATA))]
+      if (missing):
+        raise ValueError('No stored data for %s (it needs to be extracted first).' % 
+                         ', '.join(missing))
+    
+    # Starts the span of the whole run (which the pipeline threads nest within),
+    # checking the directories used again
+    self.run_date = date.today()
+    reset_dirpaths()
+    run_span = tracer.start('%s run' % self.run_name, 'run', True if (self.trace) else None,
+                            resume=resume, stages=list(stages), targets=targets)
+    try:
+      # Connects into database (if data is being queried)
+      if (extract):
+        with span('Connecting to database', 'extract'): self.db.connect()
+    
+      # Rolls metric data up to project groups and the TDC as projects finish
+      rollup = Rollup(self.project_map)
+      produced = set()
+      projects = []
+    
+      # Loads the artifacts of the previous run (if unchanged ones are skipped)
+      if (self.skip_unchanged): self.artifacts = ArtifactGraph(self.run_name)
+    
+      # Loads the progress of the interrupted run (if resuming), or discards it,
+      # then checkpoints the progress of the current run (if enabled)
+      checkpoint = ReportCheckpoint(self.run_name)
+      if (resume):
+        self.resumed = checkpoint.load_all(
+          [proj for group_projects in target_map.values() for proj, _ in group_projects])
+      else:
+        checkpoint.clear()
+      if (self.checkpoints or resume): self.checkpoint = checkpoint
+    
+      # Sets up worker pool and the stages following the queries (querying one 
+      # project overlaps with calculating and writing the files of earlier ones),
+      # unless only the data is being queried
+      pool = self.pool
+      if (not pool and self.processes and metrics): pool = Pool(self.processes)
+      
+      # Calculates one project per worker process by default, since every
+      # calculation blocks its worker thread until its process is done
+      calc_workers = self.calc_workers
+      if (not calc_workers): calc_workers = pool._processes if (pool) else 1
+      pipeline = Pipeline([
+        Stage('Calculation', lambda item: self._calculate_project(item, pool), 
+              calc_workers),
+        Stage('Writing', self._write_project, self.write_workers),
+      ] if (metrics) else [], self.queue_size)
+    
+      # Queries data and runs it through the pipeline (in project order)
+      results = pipeline.run(self._get_project_data(target_map, extract, metrics))
+      try:
+        with span('Producing project files', echo=True) as files_span:
+          for item in results:
+            if (metrics):
+              group, project, metric_data = item
+              rollup.add(group, project, metric_data)
+              produced.add((group, project))
+              if (project not in projects): projects.append(project)
+          files_span.set(projects=len(projects))
+      finally:
+        # Stops the pipeline (waiting for its threads, so that none of them is
+        # still querying), then disconnects from database and shuts down worker
+        # pool (unless shared)
+        results.close()
+        self.db.disconnect()
+        if (pool and pool is not self.pool):
+          pool.close()
+          pool.join()
+          
+      if (deck):
+        # Rolls up the stored metric data of the projects not produced by the run
+        for group, group_projects in self.project_map.iteritems():
+          for proj, _ in group_projects:
+            if ((group, proj) in produced): continue
+            metric_data = self._restore_project(proj)
+            if (metric_data is None):
+              print "No metric data stored for %s, leaving it out..." % proj
+            else:
+              rollup.add(group, proj, metric_data)
+              if (proj not in projects): projects.append(proj)
+      
+        # Produces files for project groups and overall TDC from the rolled up data
+        group_data, tdc_data = rollup.get_totals()
+        for group, data in group_data.iteritems(): self._save_snapshot(group, data)
+        if (tdc_data): self._save_snapshot('TDC', tdc_data)
+        self._build_artifact('Group files', 
+          lambda: self._produce_group_files(group_data=group_data, tdc_data=tdc_data), 
+          inputs=self.project_map, deps=['%s metrics' % project for project in projects], 
+          action='Producing group-level files')
+        
+        # Generates Powerpoint (from the files of every project and group)
+        self._build_artifact('Powerpoint presentation', self._generate_powerpoint,
+          deps=['%s metric files' % project for project in projects] + ['Group files'],
+          action='Producing Powerpoint presentation')
       
-      # Produces Excel raw data files
-      timer(self._produce_raw_data_file, project=project, data=data, 
-                            action='Producing raw data files for %s' % project)
+      # Discards the checkpoint once the report is complete, along with the
+      # snapshots past their retention period
+      checkpoint.clear()
+      self.snapshots.prune(self.run_date)
+    finally:
+      # Records the artifacts and files produced (even if the report was
+      # interrupted)
+      manifest.save()
+      if (self.artifacts):
+        self.artifacts.save()
+        self.artifacts = None
+      self.checkpoint = None
+      self.resumed = { }
       
-      # Produces Excel metric data for Powerpoint presentation (and gets age data)
-      age_data[group][project] = timer(self._produce_metric_files, project=project, 
-        data=data, action='Producing metric files for %s' % project)[2]
-                                
-    # Disconnects from database
-    self.db.disconnect()
-                                
-    # Produces age data charts for project groups and overall dictionary
-    self._produce_group_age_tables(age_data, action='Producing group-level aging files')
-    
-    # Generates Powerpoint
-    timer(self._generate_powerpoint, action='Producing Powerpoint presentation')
\ No newline at end of file
+      # Finishes the span of the run, and saves its trace (if traces are saved),
+      # discarding its spans unless the run is nested within another span (such
+      # as that of a batch run, which discards them once it has finished)
+      tracer.finish(run_span, echo=True)
+      if (self.trace): save_trace(self.run_name, run_span)
+      if (run_span.parent is None): tracer.clear(run_span)
\ No newline at end of file
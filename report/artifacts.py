@@ -0,0 +1,232 @@
+"""
+This module contains the artifact graph of a report, which tracks the files
+produced by the report (raw data files, metric files, group files and the
+Powerpoint presentation) along with content fingerprints of their inputs, so
+that artifacts whose inputs have not changed since the previous run are skipped.
+"""
+
+# Built-in modules
+from collections import OrderedDict
+import cPickle
+import hashlib
+import os
+from threading import Lock, local
+
+# User-defined modules
+from directories import CACHE_DIR
+from utilities import create_dirpath
+
+def _update_digest(digest, value):
+  """
+  Feeds the given value into the given digest, in a form that only depends on
+  its content (sets and unordered dictionaries are sorted, and objects are
+  represented by their class name and attributes).
+  
+  @param digest: Hash object being updated.
+  @param value: Value being fingerprinted.
+  """
+  
+  if (isinstance(value, dict)):
+    items = value.iteritems() if (isinstance(value, OrderedDict)) else sorted(value.iteritems())
+    digest.update('{')
+    for key, sub_value in items:
+      _update_digest(digest, key)
+      _update_digest(digest, sub_value)
+    digest.update('}')
+  elif (isinstance(value, (list, tuple))):
+    digest.update('[')
+    for sub_value in value: _update_digest(digest, sub_value)
+    digest.update(']')
+  elif (isinstance(value, (set, frozenset))):
+    _update_digest(digest, sorted(value))
+  elif (hasattr(value, '__dict__')):
+    digest.update(value.__class__.__name__)
+    _update_digest(digest, value.__dict__)
+  else:
+    digest.update(repr(value))
+
+def get_fingerprint(value):
+  """
+  Gets a content fingerprint of the given value (such as queried data or
+  calculated metric data), which stays the same across runs and processes as
+  long as the content does.
+  
+  @param value: Value being fingerprinted.
+  @return: Hexadecimal digest string representing the value.
+  """
+  
+  digest = hashlib.sha1()
+  _update_digest(digest, value)
+  return digest.hexdigest()
+
+class ArtifactGraph(object):
+  """
+  Directed acyclic graph of the artifacts of a report. Every node is either an
+  input (such as the queried data of a project, or its calculated metrics) or
+  an artifact built from other nodes, and is fingerprinted by the content of its
+  inputs and the fingerprints of the nodes it depends on. Nodes are added in
+  dependency order, as the report produces them.
+  
+  The fingerprints and output files of the previous run are stored within the
+  cache directory. An artifact is only rebuilt when its fingerprint differs from
+  the previous run, or when any of its output files no longer exists. Otherwise
+  its previous output files are left in place.
+  """
+  
+  def __init__(self, name, subdirs=[CACHE_DIR]):
+    """
+    Loads the fingerprints recorded by the previous run.
+    
+    @param name: Name of the graph (used to name its file within the cache).
+    @param subdirs: List of sub-directories (within the base Files folder)
+    where the fingerprint file is stored.
+    """
+    
+    self.file_path = os.path.join(create_dirpath(subdirs=subdirs),
+                                  '%s Artifacts.pickle' % name)
+    
+    # Maps node names to data dictionaries with 'fingerprint' and 'outputs'
+    # keys, for the previous run and the current one (outputs stay None until
+    # the artifact of a node has been built)
+    self.previous = self._load()
+    self.nodes = OrderedDict()
+    
+    # Output files produced by the artifact being built on each thread
+    self.lock = Lock()
+    self.building = local()
+  
+  def _load(self):
+    """
+    Loads the nodes recorded by the previous run.
+    
+    @return: Data dictionary mapping node names to their recorded fingerprints
+    and output files (empty if none were recorded).
+    """
+    
+    if (not os.path.isfile(self.file_path)): return { }
+    try:
+      with open(self.file_path, 'rb') as f:
+        return cPickle.load(f)
+    except Exception, e:
+      print "Ignoring unreadable artifact file %s: %s" % (self.file_path, str(e))
+      return { }
+  
+  def save(self):
+    """
+    Records the artifacts built (or skipped) by the current run, along with the
+    artifacts of the previous run that were not part of it, for the next run to
+    compare against. Input nodes and artifacts that failed are not recorded.
+    """
+    
+    with self.lock:
+      nodes = dict(self.previous)
+      nodes.update([(name, node) for name, node in self.nodes.iteritems()
+                    if (node['outputs'] is not None)])
+    with open(self.file_path, 'wb') as f:
+      cPickle.dump(nodes, f, cPickle.HIGHEST_PROTOCOL)
+  
+  def add(self, name, inputs=None, deps=()):
+    """
+    Adds a node to the graph, fingerprinting it.
+    
+    @param name: Unique name of the node.
+    @param inputs: Content read by the node, other than its dependencies (such
+    as queried data or metric data), if any.
+    @param deps: Names of the nodes that the node depends on, which must have
+    already been added.
+    @return: The fingerprint of the node.
+    """
+    
+    with self.lock:
+      missing = [dep for dep in deps if (dep not in self.nodes)]
+      if (missing):
+        raise KeyError('%s depends on nodes that were not added: %s' % (name, missing))
+      dep_prints = [(dep, self.nodes[dep]['fingerprint']) for dep in deps]
+    
+    fingerprint = get_fingerprint((inputs, dep_prints))
+    with self.lock:
+      self.nodes[name] = { 'fingerprint' : fingerprint, 'outputs' : None }
+    return fingerprint
+  
+  def get_nodes(self, names):
+    """
+    Gets the current nodes with the given names (such as the nodes of a project
+    whose progress is being checkpointed).
+    
+    @param names: Names of the nodes.
+    @return: Data dictionary mapping the names of the nodes that were added to
+    copies of their fingerprints and output files.
+    """
+    
+    with self.lock:
+      return OrderedDict([(name, dict(self.nodes[name])) for name in names
+                          if (name in self.nodes)])
+  
+  def restore(self, nodes):
+    """
+    Adds nodes that were completed by an earlier (interrupted) run, as returned
+    by get_nodes(), along with their fingerprints and output files.
+    
+    @param nodes: Data dictionary mapping node names to their fingerprints and
+    output files.
+    """
+    
+    with self.lock:
+      for name, node in nodes.iteritems(): self.nodes[name] = dict(node)
+  
+  def is_current(self, name):
+    """
+    Checks whether the given node is unchanged since the previous run, with all
+    of its output files still in place. Nodes that recorded no output files are
+    always rebuilt, since nothing tells whether their artifact still exists.
+    
+    @param name: Name of the node (which must have already been added).
+    @return: True if the node does not need to be rebuilt, False otherwise.
+    """
+    
+    previous = self.previous.get(name)
+    return bool(previous and previous['fingerprint'] == self.nodes[name]['fingerprint'] and
+                previous['outputs'] and
+                all([os.path.isfile(path) for path in previous['outputs']]))
+  
+  def build(self, name, build_func, *args, **kwargs):
+    """
+    Builds the artifact of the given node, unless it is current. Every output
+    file recorded (by record_output()) while it is being built is attributed to
+    the node.
+    
+    @param name: Name of the node (which must have already been added).
+    @param build_func: Function building the artifact.
+    @param *args: Arbitrary parameters passed into the function.
+    @param **kwargs: Arbitrary keyword parameters passed into the function.
+    @return: A tuple with two items (built, results). The first is True if the
+    artifact was built, and the second is the return value of the function (or
+    None if it was skipped).
+    """
+    
+    if (self.is_current(name)):
+      print "Skipping unchanged %s..." % name
+      self.nodes[name]['outputs'] = self.previous[name]['outputs']
+      return False, None
+    
+    # Collects the outputs produced on the current thread
+    self.building.outputs = []
+    try:
+      results = build_func(*args, **kwargs)
+      self.nodes[name]['outputs'] = self.building.outputs
+    finally:
+      self.building.outputs = None
+    return True, results
+  
+  def record_output(self, file_path):
+    """
+    Attributes the given output file to the artifact being built on the current
+    thread (if any).
+    
+    @param file_path: Path of the file produced.
+    @return: The given file path.
+    """
+    
+    outputs = getattr(self.building, 'outputs', None)
+    if (outputs is not None): outputs.append(file_path)
+    return file_path
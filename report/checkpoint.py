@@ -0,0 +1,115 @@
+"""
+This module contains the checkpoints of report runs, which record the stages
+completed for every project (extraction, calculation and file writing), so 
+that an interrupted run can be resumed without repeating the work already done.
+"""
+
+# Built-in modules
+from collections import OrderedDict
+import os
+from threading import Lock
+
+# User-defined modules
+from directories import CACHE_DIR
+from utilities import create_dirpath, load_pickle, remove_dirpath, save_pickle
+
+# Stages of a project that are checkpointed (in the order they are completed)
+EXTRACTED = 'Extracted'
+CALCULATED = 'Calculated'
+RAW_WRITTEN = 'Raw Data File Written'
+METRICS_WRITTEN = 'Metric Files Written'
+
+class ReportCheckpoint(object):
+  """
+  Persists the progress of a report run within the cache directory, with one
+  file per project. Each project entry records the stages completed, along
+  with the values needed to skip them that are not kept in the project store
+  of the report (see ProjectStore, which keeps the queried data and the metric
+  data of every project):
+    - Extracted: nothing else
+    - Calculated: the results of calculate_metrics() ('results')
+    - Raw Data File Written: nothing else
+    - Metric Files Written: nothing else
+  Once the metric files of a project are written, its results are dropped, 
+  since nothing is left to be done for it.
+  """
+  
+  def __init__(self, name, subdirs=[CACHE_DIR]):
+    """
+    Initializes the location of the checkpoint files.
+    
+    @param name: Name of the report run (used to name its folder in the cache).
+    @param subdirs: List of sub-directories (within the base Files folder)
+    where the checkpoint folder is created.
+    """
+    
+    self.subdirs = subdirs + ['%s Run Checkpoint' % name]
+    self.lock = Lock()
+  
+  def _get_file_path(self, project):
+    """
+    Gets the path of the checkpoint file of the given project.
+    
+    @param project: Key of the project.
+    @return: The path of the file.
+    """
+    
+    return os.path.join(create_dirpath(subdirs=self.subdirs), '%s.pickle' % project)
+  
+  def load(self, project):
+    """
+    Loads the checkpoint entry of the given project, if one exists.
+    
+    @param project: Key of the project.
+    @return: Data dictionary mapping the completed stages (and the values
+    saved with them) to True (or the saved value), or an empty data dictionary
+    if nothing was completed yet.
+    """
+    
+    file_path = self._get_file_path(project)
+    try:
+      return load_pickle(file_path, { })
+    except Exception, e:
+      print "Ignoring unreadable checkpoint file %s: %s" % (file_path, str(e))
+      return { }
+  
+  def load_all(self, projects):
+    """
+    Loads the checkpoint entries of the given projects.
+    
+    @param projects: List of project keys.
+    @return: Ordered data dictionary mapping project keys to their entries (in
+    the given order), for projects that have completed any stage.
+    """
+    
+    entries = OrderedDict([(project, self.load(project)) for project in projects])
+    return OrderedDict([(project, entry) for project, entry in entries.iteritems() if (entry)])
+  
+  def save(self, project, stage, **values):
+    """
+    Records that the given stage of a project was completed (see
+    utilities.save_pickle()).
+    
+    @param project: Key of the project.
+    @param stage: Stage that was completed.
+    @param **values: Values saved along with the stage.
+    """
+    
+    with self.lock:
+      entry = self.load(project)
+      entry[stage] = True
+      entry.update(values)
+      
+      # Drops what is no longer needed once the project is done
+      if (stage == METRICS_WRITTEN):
+        entry.pop('results', None)
+      
+      save_pickle(self._get_file_path(project), entry)
+  
+  def clear(self):
+    """
+    Removes every checkpoint entry of the run (once it has finished, or when a
+    new run starts without resuming).
+    """
+    
+    remove_dirpath(subdirs=self.subdirs)
@@ -12,7 +12,8 @@ from constants import *
 from directories import RAW_DATA_DIR, PROJECT_DIR, MATRICES_DIR, CQ_DIR, GROUP_DIR, TMS_DIR
 from db_accessor import ClearQuest
 from powerpoint import ClearQuestPPT
-from report import Report
+from report import Report, calculate_metrics
+from report.rollup import sort_series
 from utilities import create_dirpath
 from xl_writer import RawDataWriter
 
@@ -25,17 +26,41 @@ class ClearQuestReport(Report):
   JIRA.
   """
   
-  def __init__(self, project_map=None):
+  def __init__(self, project_map=None, processes=None, use_cache=False, 
+               percentiles=None, calc_workers=None, write_workers=1, queue_size=1,
+               skip_unchanged=False, checkpoints=False, trace=False):
     """
     Initializes JIRA-specific parameters.
     
     @param project_map: A customizable project map mapping project group to
     lists of associated projects. If this parameter is left blank, the default
     project mapping obtained by self._set_project_map() will be used instead.
+    @param processes: Number of worker processes used to calculate project 
+    metrics in parallel, through the workers of the calculation stage
+    (calculations stay on the current process if left blank).
+    @param use_cache: True if calculation results of previous runs should be 
+    reused for projects whose data has not changed, False otherwise.
+    @param percentiles: List of age percentiles (such as [50, 90, 99]) to 
+    produce age percentile tables for.
+    @param calc_workers: Number of projects calculated at the same time (one
+    per worker process if left blank).
+    @param write_workers: Number of projects whose files are written at the 
+    same time.
+    @param queue_size: Maximum number of projects waiting between the stages of
+    the report pipeline.
+    @param skip_unchanged: True if files whose inputs have not changed since the
+    previous run should be left as they are, False otherwise.
+    @param checkpoints: True if the progress of every run should be 
+    checkpointed (so that it can be resumed), and the weekly counts of the
+    calculations resumed from the last week already counted, False otherwise.
+    @param trace: True if a trace file should be saved for every run, False 
+    otherwise.
     """
     
     # Initializes initial parameters
-    super(ClearQuestReport, self).__init__()
+    super(ClearQuestReport, self).__init__(processes, use_cache, percentiles, calc_workers,
+                                           write_workers, queue_size, skip_unchanged, checkpoints,
+                                           trace)
     
     # Sets database to ClearQuest instance
     self.db = ClearQuest()
@@ -128,10 +153,12 @@ class ClearQuestReport(Report):
     if (USE_EXCEL): return self._read_excel_project_map()
     else:           return self.db.get_active_projects()
     
-  def _query_data(self, *args, **kwargs):
+  def _query_data(self, skip=(), *args, **kwargs):
     """
     Iteratively queries data from the data source.
     
+    @param skip: Keys of the projects that are not queried (as they were 
+    already queried by an interrupted run), in which case they are not yielded.
     @param *args: Arbitrary list arguments for the function.
     @param *kwargs: Arbitrary keyword arguments for the function.
     @yield: A tuple of three items, with the first two items being group name
@@ -142,6 +169,7 @@ class ClearQuestReport(Report):
     # Iterates through the projects within each project group
     for group, projects in self.project_map.iteritems():
       for proj, _ in projects:
+        if (proj in skip): continue
         # Gets DCR, RR, and SCR data
         data = OrderedDict([
           (DCR, self.db.get_dcr_data(proj)),
@@ -177,47 +205,82 @@ class ClearQuestReport(Report):
       file_paths.append(raw_writer.produce_workbook(raw_data))
     return file_paths
     
-  def _produce_metric_files(self, project, data, *args, **kwargs):
+  def _get_calc_jobs(self, project, data):
+    """
+    Segments the given project data into calculation jobs, one for each issue
+    type of each metric type.
+    
+    @param project: Name of project whose data is being segmented.
+    @param data: Data from which calculated metrics are derived.
+    @return: List of tuples, each containing a job key (a tuple of metric type
+    and issue type), the calculator class, the issue type, and the compacted 
+    data dictionary for that issue type.
+    """
+    
+    jobs = []
+    
+    # Iterates through each data type
+    for metric_type, metric_data in data.iteritems():
+      # Initializes segmented data dictionary
+      segmented_data = OrderedDict([(x, OrderedDict()) 
+                                    for x in self.issue_types[metric_type]])
+      
+      # Segments data by issue type
+      for key, params in metric_data.iteritems():
+        issue_type = params.get(ISSUETYPE, params.get(REL_TYPE))
+        segmented_data[issue_type][key] = params
+        
+      # Adds a job for each issue type
+      calc_class = self.calc[metric_type]
+      for issue_type, issue_data in segmented_data.iteritems():
+        jobs.append(((metric_type, issue_type), calc_class, issue_type, 
+                     calc_class.compact_data(issue_data)))
+        
+    return jobs
+    
+  def _produce_metric_files(self, project, data, results=None, write=True, *args, **kwargs):
     """
     Produces all the Excel metric files to be used in the final Powerpoint 
     report.
     
     @param project: Name of project for which metric files are being produced.
     @param data: Data from which calculated metrics are derived.
+    @param results: Results of calculate_metrics() for the project, if they were
+    already calculated elsewhere (in which case data is not used).
+    @param write: False if only the metric data is needed (its files are 
+    unchanged), True otherwise.
     @param *args: Arbitrary list arguments for the function.
     @param *kwargs: Arbitrary keyword arguments for the function.
     @return: Tuples of three data dictionaries for severity data, status data, 
     and age data.
     """
     
+    # Performs calculations for each issue type (if not already performed)
+    if (results is None):
+      results = calculate_metrics(project, self._get_calc_jobs(project, data), 
+                                  self.use_cache, bool(self.percentiles), self.checkpoints)
+    
     # Initializes overall metric data dictionaries
     all_sev_data = OrderedDict()
     all_status_data = OrderedDict()
     all_age_data = OrderedDict()
     
-    # Iterates through each data type
-    for metric_type, metric_data in data.iteritems():
-      # Initializes segmented data dictionary
-      segmented_data = OrderedDict([(x, OrderedDict()) 
-                                    for x in self.issue_types[metric_type]])
+    # Maps calculated results of each issue type to their metric types
+    for (metric_type, issue_type), (sev, status, age) in results:
+      if (metric_type not in all_sev_data):
+        all_sev_data[metric_type] = OrderedDict()
+        all_status_data[metric_type] = OrderedDict()
+        all_age_data[metric_type] = OrderedDict()
+      all_sev_data[metric_type][issue_type] = sev
+      all_status_data[metric_type][issue_type] = status
+      all_age_data[metric_type][issue_type] = age
       
-      # Segments data by issue type
-      for key, params in metric_data.iteritems():
-        issue_type = params.get(ISSUETYPE, params.get(REL_TYPE))
-        segmented_data[issue_type][key] = params
-        
-      # Performs calculations for each issue type
-      sev_data = OrderedDict()
-      status_data = OrderedDict()
-      age_data = OrderedDict()
-      for issue_type in self.issue_types[metric_type]:
+    # Iterates through each data type (unless only the metric data is needed)
+    for metric_type, age_data in (all_age_data.iteritems() if (write) else []):
+      for issue_type in age_data:
         calc = self.calc[metric_type](project, issue_type)
-        sev, status, age = calc.get_metrics(segmented_data[issue_type])
-        
-        # Inserts data into data dictionaries
-        sev_data[issue_type] = sev
-        status_data[issue_type] = status
-        age_data[issue_type] = age
+        sev = all_sev_data[metric_type][issue_type]
+        status = all_status_data[metric_type][issue_type]
         
         # Produces severity file (if priorities exist)
         if (calc.priority_list):
@@ -230,56 +293,73 @@ class ClearQuestReport(Report):
         self._produce_chart_file(project, status, issue_type, STATUS, series_names, 
                                  prefix=metric_type)
         
-      # Produces age file
+      # Produces age file (and age percentile file)
       self._produce_age_file(age_data, self.base_dir_trail + [PROJECT_DIR, project],
                              prefix='Average %s' % metric_type)
-      
-      # Maps data to data dictionaries
-      all_sev_data[metric_type] = sev_data
-      all_status_data[metric_type] = status_data
-      all_age_data[metric_type] = age_data
+      if (self.percentiles):
+        self._produce_percentile_file(age_data, self.base_dir_trail + 
+                                      [PROJECT_DIR, project], prefix=metric_type)
       
     return all_sev_data, all_status_data, all_age_data
   
-  def _produce_group_age_tables(self, data, *args, **kwargs):
+  def _get_snapshot_metrics(self, metric_data):
+    """
+    Pairs the severity, status and age data of every issue type within the
+    given metric data, for its snapshot. Since the data of every metric type 
+    (such as SCR, DCR or RR) is kept apart, the names of its issue types are
+    prefixed with the metric type (such as "SCR Defect"), so that they stay
+    unique within the snapshot.
+    
+    @param metric_data: Tuple of severity, status and age data, as returned by
+    _produce_metric_files() (or rolled up from it), each mapping metric types to
+    issue types to their data.
+    @return: List of tuples with the following format:
+      [(<metric type> <issue type>, severity, status, age),]
     """
-    Combines data dictionary age data of every group contained inside, and 
-    outputs Average Age data file for all of them.
     
-    @param data: Multi-level data dictionary mapping groups to projects to age
-    data dictionaries. It has the following structure:
-      <project group> -> <project> -> <metric type> -> <issue type> -> <priority> 
-        -> <status group> -> <AverageAge object>
+    sev_data, status_data, age_data = metric_data
+    return [('%s %s' % (metric_type, issue_type), sev, status_data[metric_type][issue_type],
+             age_data[metric_type].get(issue_type))
+            for metric_type, issue_data in sev_data.iteritems()
+            for issue_type, sev in issue_data.iteritems()]
+  
+  def _produce_group_files(self, group_data, tdc_data, *args, **kwargs):
+    """
+    Outputs severity and status trend files and Average Age data files of every
+    metric type for every project group, using their rolled up data (the weekly
+    series of their projects summed on the shared extraction-week axis).
+    
+    @param group_data: Data dictionary mapping project groups to their rolled up
+    (severity, status, age) data, where age data has the following structure:
+      <metric type> -> <issue type> -> <priority> -> <status group> 
+        -> <AverageAge object>
+    @param tdc_data: Rolled up (severity, status, age) data of all projects.
     @param *args: Arbitrary list arguments for the function.
     @param *kwargs: Arbitrary keyword arguments for the function.
     """
     
-    # Regroups data for use with combine_age_data() function
-    regrouped_data = OrderedDict()
-    for group, project_map in data.iteritems():
-      regrouped_data[group] = OrderedDict()
-      for project, metric_map in project_map.iteritems():
-        for metric_type, age_data in metric_map.iteritems():
-          if (metric_type not in regrouped_data[group]):
-            regrouped_data[group][metric_type] = OrderedDict()
-          regrouped_data[group][metric_type][project] = age_data
-          
-    # Initializes project group level aging data
-    group_age = OrderedDict([(group, OrderedDict([
-      (metric_type, OrderedDict()) for metric_type in self.issue_types.keys()
-    ])) for group in data])
-    
-    # Creates age files for all project groups
-    for group, metric_map in regrouped_data.iteritems():
-      for metric_type, issue_list in self.issue_types.iteritems():
-        for issue in issue_list:
-          group_age[group][metric_type][issue] = \
-            self.calc[metric_type].combine_age_data(metric_map[metric_type], issue)
+    # Creates files for all project groups and metric types
+    for group, (sev_data, status_data, metric_map) in group_data.iteritems():
+      save_path_trail = self.base_dir_trail + [GROUP_DIR, group]
+      for metric_type, age_data in metric_map.iteritems():
+        prefix = '%s %s' % (group, metric_type)
+        
+        # Creates severity (if priorities exist) and status trend files
+        for issue_type, status in status_data[metric_type].iteritems():
+          calc = self.calc[metric_type](group, issue_type)
+          if (calc.priority_list):
+            series_names = [(p, p) for p in calc.priority_list]
+            self._produce_chart_file(None, sort_series(sev_data[metric_type][issue_type]), 
+                                     issue_type, SEV, series_names, prefix=prefix, 
+                                     save_path_trail=save_path_trail, group=group)
+          self._produce_chart_file(None, sort_series(status), issue_type, STATUS, 
+                                   calc.get_status_desc(), prefix=prefix, 
+                                   save_path_trail=save_path_trail, group=group)
         
-        # Creates age data file for project group and metric type
-        age_data = group_age[group][metric_type]
-        save_path_trail = self.base_dir_trail + [GROUP_DIR, group]
+        # Creates age data files
         self._produce_age_file(age_data, save_path_trail, prefix='Average ' + metric_type)
+        if (self.percentiles):
+          self._produce_percentile_file(age_data, save_path_trail, prefix=metric_type)
         
 if (__name__=='__main__'):
   report = ClearQuestReport()
@@ -11,7 +11,8 @@ from constants import *
 from directories import PROJECT_DIR, MATRICES_DIR, GT_JIRA_DIR, GROUP_DIR, TDC_DIR
 from db_accessor import JiraGT
 from powerpoint import GTJiraPPT
-from report import Report
+from report import Report, calculate_metrics
+from report.rollup import sort_series
 from utilities import create_dirpath
 import xlrd
 
@@ -24,17 +25,41 @@ class JiraGTReport(Report):
   JIRA.
   """
   
-  def __init__(self, project_map=None):
+  def __init__(self, project_map=None, processes=None, use_cache=False, 
+               percentiles=None, calc_workers=None, write_workers=1, queue_size=1,
+               skip_unchanged=False, checkpoints=False, trace=False):
     """
     Initializes JIRA-specific parameters.
     
     @param project_map: A customizable project map mapping project group to
     lists of associated projects. If this parameter is left blank, the default
     project mapping obtained by self._set_project_map() will be used instead.
+    @param processes: Number of worker processes used to calculate project 
+    metrics in parallel, through the workers of the calculation stage
+    (calculations stay on the current process if left blank).
+    @param use_cache: True if calculation results of previous runs should be 
+    reused for projects whose data has not changed, False otherwise.
+    @param percentiles: List of age percentiles (such as [50, 90, 99]) to 
+    produce age percentile tables for.
+    @param calc_workers: Number of projects calculated at the same time (one
+    per worker process if left blank).
+    @param write_workers: Number of projects whose files are written at the 
+    same time.
+    @param queue_size: Maximum number of projects waiting between the stages of
+    the report pipeline.
+    @param skip_unchanged: True if files whose inputs have not changed since the
+    previous run should be left as they are, False otherwise.
+    @param checkpoints: True if the progress of every run should be 
+    checkpointed (so that it can be resumed), and the weekly counts of the
+    calculations resumed from the last week already counted, False otherwise.
+    @param trace: True if a trace file should be saved for every run, False 
+    otherwise.
     """
     
     # Initializes initial parameters
-    super(JiraGTReport, self).__init__()
+    super(JiraGTReport, self).__init__(processes, use_cache, percentiles, calc_workers,
+                                       write_workers, queue_size, skip_unchanged, checkpoints,
+                                       trace)
     
     # Sets database to Jira instance
     self.db = JiraGT()
@@ -114,10 +139,12 @@ class JiraGTReport(Report):
     if (USE_EXCEL): return self._read_excel_project_map()
     else:           return self.db.get_active_projects()
     
-  def _query_data(self, *args, **kwargs):
+  def _query_data(self, skip=(), *args, **kwargs):
     """
     Iteratively queries data from the data source.
     
+    @param skip: Keys of the projects that are not queried (as they were 
+    already queried by an interrupted run), in which case they are not yielded.
     @param *args: Arbitrary list arguments for the function.
     @param *kwargs: Arbitrary keyword arguments for the function.
     @yield: A tuple of three items, with the first two items being group name
@@ -128,41 +155,66 @@ class JiraGTReport(Report):
     # Iterates through the projects within each project group
     for group, projects in self.project_map.iteritems():
       for proj, _ in projects:
+        if (proj in skip): continue
         data = self.db.get_issue_data(proj, issuetype=self.issue_types)
         yield group, proj, data
     
-  def _produce_metric_files(self, project, data, *args, **kwargs):
+  def _get_calc_jobs(self, project, data):
+    """
+    Segments the given project data into calculation jobs, one for each issue
+    type.
+    
+    @param project: Name of project whose data is being segmented.
+    @param data: Data from which calculated metrics are derived.
+    @return: List of tuples, each containing a job key (the issue type), the 
+    calculator class, the issue type, and the compacted data dictionary for that
+    issue type.
+    """
+    
+    # Initializes segmented data dictionary
+    segmented_data = OrderedDict([(x, OrderedDict()) for x in self.issue_types])
+    
+    # Segments data by issue type
+    for key, params in data.iteritems():
+      segmented_data[params[ISSUETYPE]][key] = params
+      
+    return [(issue_type, self.calc, issue_type, self.calc.compact_data(issue_data))
+            for issue_type, issue_data in segmented_data.iteritems()]
+    
+  def _produce_metric_files(self, project, data, results=None, write=True, *args, **kwargs):
     """
     Produces all the Excel metric files to be used in the final Powerpoint 
     report.
     
     @param project: Name of project for which metric files are being produced.
     @param data: Data from which calculated metrics are derived.
+    @param results: Results of calculate_metrics() for the project, if they were
+    already calculated elsewhere (in which case data is not used).
+    @param write: False if only the metric data is needed (its files are 
+    unchanged), True otherwise.
     @param *args: Arbitrary list arguments for the function.
     @param *kwargs: Arbitrary keyword arguments for the function.
     @return: Tuple of three data dictionaries for severity data, status data,
     and age data.
     """
     
-    # Initializes segmented data dictionary
-    segmented_data = OrderedDict([(x, OrderedDict()) for x in self.issue_types])
-    
-    # Segments data by issue type
-    for key, params in data.iteritems():
-      segmented_data[params[ISSUETYPE]][key] = params
+    # Performs calculations for each issue type (if not already performed)
+    if (results is None):
+      results = calculate_metrics(project, self._get_calc_jobs(project, data), 
+                                  self.use_cache, bool(self.percentiles), self.checkpoints)
       
-    # Performs calculations for each issue type
+    # Produces metric files for each issue type
     sev_data = OrderedDict()
     status_data = OrderedDict()
     age_data = OrderedDict()
-    for issue_type in self.issue_types:
+    for issue_type, (sev, status, age) in results:
       calc = self.calc(project, issue_type)
-      sev, status, age = calc.get_metrics(segmented_data[issue_type])
       
       # Inserts data into data dictionaries
       sev_data[issue_type] = sev
       status_data[issue_type] = status
       age_data[issue_type] = age
+      if (not write): continue
       
       # Produces severity file
       series_names = [(p, p) for p in calc.priority_list]
@@ -172,43 +224,50 @@ class JiraGTReport(Report):
       series_names = calc.get_status_desc()
       self._produce_chart_file(project, status, issue_type, STATUS, series_names)
       
-    # Produces age file
-    self._produce_age_file(age_data, self.base_dir_trail + [PROJECT_DIR, project])
+    # Produces age file (and age percentile file)
+    if (write):
+      self._produce_age_file(age_data, self.base_dir_trail + [PROJECT_DIR, project])
+      if (self.percentiles):
+        self._produce_percentile_file(age_data, self.base_dir_trail + [PROJECT_DIR, project])
     
     return sev_data, status_data, age_data
   
-  def _produce_group_age_tables(self, data, *args, **kwargs):
+  def _produce_group_files(self, group_data, tdc_data, *args, **kwargs):
     """
-    Combines data dictionary age data of every group contained inside, and 
-    outputs Average Age data file for all of them. Afterwards, produces an
-    overall Average Age data file for all contained projects.
-    
-    @param data: Multi-level data dictionary mapping groups to projects to age
-    data dictionaries. It has the following structure:
-      <project group> -> <project> -> <issue type> -> <priority> 
-        -> <status group> -> <AverageAge object>
+    Outputs severity and status trend files and Average Age data files for 
+    every project group, using their rolled up data (the weekly series of their
+    projects summed on the shared extraction-week axis). Afterwards, produces 
+    the same files for all contained projects as a whole.
+    
+    @param group_data: Data dictionary mapping project groups to their rolled up
+    (severity, status, age) data, where age data has the following structure:
+      <issue type> -> <priority> -> <status group> -> <AverageAge object>
+    @param tdc_data: Rolled up (severity, status, age) data of all projects.
     @param *args: Arbitrary list arguments for the function.
     @param *kwargs: Arbitrary keyword arguments for the function.
     """
     
-    # Initializes project group level aging data
-    group_age = OrderedDict([(group, OrderedDict()) for group in data])
-    
-    # Combines data among each project group and produces age data files
-    for group, age_data in data.iteritems():
-      for issue in self.issue_types:
-        group_age[group][issue] = self.calc.combine_age_data(age_data, issue)
-        
-      # Creates age data file for project group
-      save_path_trail = self.base_dir_trail + [GROUP_DIR, group]
-      self._produce_age_file(group_age[group], save_path_trail)
-    
-    # Creates age data file for overall TDC
-    tdc_age = OrderedDict()
-    for issue in self.issue_types:
-      tdc_age[issue] = self.calc.combine_age_data(group_age, issue)
-    save_path_trail = self.base_dir_trail + [GROUP_DIR, TDC_DIR]
-    self._produce_age_file(tdc_age, save_path_trail)
+    # Pairs rolled up data of every project group and overall TDC with save paths
+    rollups = [(group, data, self.base_dir_trail + [GROUP_DIR, group]) 
+               for group, data in group_data.iteritems()]
+    if (tdc_data):
+      rollups.append(('TDC', tdc_data, self.base_dir_trail + [GROUP_DIR, TDC_DIR]))
+    
+    for name, (sev_data, status_data, age_data), save_path_trail in rollups:
+      # Creates severity and status trend files for each issue type
+      for issue_type, sev in sev_data.iteritems():
+        calc = self.calc(name, issue_type)
+        series_names = [(p, p) for p in calc.priority_list]
+        self._produce_chart_file(None, sort_series(sev), issue_type, SEV, series_names,
+                                 prefix=name, save_path_trail=save_path_trail, group=name)
+        self._produce_chart_file(None, sort_series(status_data[issue_type]), issue_type, 
+                                 STATUS, calc.get_status_desc(), prefix=name, 
+                                 save_path_trail=save_path_trail, group=name)
+      
+      # Creates age data files
+      self._produce_age_file(age_data, save_path_trail)
+      if (self.percentiles):
+        self._produce_percentile_file(age_data, save_path_trail)
     
 if (__name__=='__main__'):
   report = JiraGTReport()
@@ -0,0 +1,191 @@
+"""
+This module contains the staged pipeline used to produce reports, which lets
+the querying, calculation and file writing of different projects overlap.
+"""
+
+# Built-in modules
+from Queue import Queue
+from threading import Lock, Thread
+import sys
+
+# User-defined modules
+from tracing import tracer
+
+# Marks the end of the items passed into a stage
+_DONE = object()
+
+class Stage(object):
+  """
+  A single stage of a pipeline. Each of its worker threads takes items from the
+  input queue of the stage, processes them with the stage function, and puts
+  the results into the input queue of the next stage.
+  """
+  
+  def __init__(self, name, func, workers=1):
+    """
+    Initializes the parameters of the stage.
+    
+    @param name: Name of the stage (used to name its worker threads).
+    @param func: Function processing a single item and returning its results.
+    @param workers: Number of worker threads of the stage.
+    """
+    
+    self.name = name
+    self.func = func
+    self.workers = max(workers, 1)
+
+class Pipeline(object):
+  """
+  Runs the items of a producer through a series of stages connected by bounded
+  queues. The producer runs on its own thread, and every stage has its own
+  worker threads. A stage blocks as soon as the queue of the following stage is
+  full (backpressure), so at most queue_size items wait between two stages and
+  memory stays bounded no matter how far ahead the producer could run.
+  """
+  
+  def __init__(self, stages, queue_size=1):
+    """
+    Initializes the stages of the pipeline.
+    
+    @param stages: List of Stage objects, in processing order.
+    @param queue_size: Maximum number of items waiting in front of each stage.
+    """
+    
+    self.stages = stages
+    self.queue_size = max(queue_size, 1)
+    
+    # First error raised by the producer or any stage (as sys.exc_info()), and
+    # whether the results stopped being consumed
+    self.error = None
+    self.stopped = False
+    self.lock = Lock()
+  
+  def _fail(self):
+    """
+    Records the error currently being handled, unless an earlier one was
+    already recorded. Afterward, remaining items are drained without being
+    processed, so that no thread stays blocked on a full queue.
+    """
+    
+    with self.lock:
+      if (not self.error): self.error = sys.exc_info()
+  
+  def _attached(self, parent, func, *args):
+    """
+    Runs the given function of a pipeline thread, nesting the spans started by
+    the thread within the given span.
+    
+    @param parent: Span that was open when the pipeline was run (if any).
+    @param func: Function run by the thread.
+    @param *args: Arbitrary parameters passed into the function.
+    """
+    
+    with tracer.attach(parent):
+      func(*args)
+  
+  def _produce(self, items, out_queue, consumers):
+    """
+    Puts every item of the producer into the first queue, numbered in order.
+    
+    @param items: Iterable producing the items of the pipeline.
+    @param out_queue: Input queue of the first stage.
+    @param consumers: Number of worker threads of the first stage.
+    """
+    
+    try:
+      for index, item in enumerate(items):
+        if (self.error or self.stopped): break
+        out_queue.put((index, item))
+    except Exception:
+      self._fail()
+    for _ in range(consumers): out_queue.put(_DONE)
+  
+  def _work(self, stage, in_queue, out_queue, consumers, remaining):
+    """
+    Processes the items of a stage until it has been told that no items are
+    left. The last worker of the stage to finish passes that on to the next one.
+    
+    @param stage: Stage object whose function is applied.
+    @param in_queue: Input queue of the stage.
+    @param out_queue: Input queue of the next stage.
+    @param consumers: Number of worker threads of the next stage.
+    @param remaining: Single-item list counting the workers of the stage that
+    have not finished yet.
+    """
+    
+    while (True):
+      entry = in_queue.get()
+      if (entry is _DONE): break
+      if (self.error or self.stopped): continue
+      index, item = entry
+      try:
+        out_queue.put((index, stage.func(item)))
+      except Exception:
+        self._fail()
+    
+    with self.lock:
+      remaining[0] -= 1
+      finished = not remaining[0]
+    if (finished):
+      for _ in range(consumers): out_queue.put(_DONE)
+  
+  def run(self, items):
+    """
+    Runs the given items through every stage of the pipeline.
+    
+    @param items: Iterable producing the items of the pipeline (such as a
+    generator querying data), which is consumed on its own thread.
+    @yield: The results of the last stage for every item, in the order that the
+    items were produced (whatever order they finish in). If the results stop
+    being consumed (the consumer raised an error or closed the generator), the
+    producer and stages are stopped, and the generator returns once every 
+    thread has finished (the producer finishing the item it was producing).
+    """
+    
+    # Sets up the queues in front of every stage and after the last one
+    self.stopped = False
+    queues = [Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+    consumers = [stage.workers for stage in self.stages] + [1]
+    
+    # Starts the producer and the worker threads of every stage (nesting their
+    # spans within the span that the pipeline runs in)
+    parent = tracer.current()
+    threads = [Thread(target=self._attached, name='Producer',
+                      args=(parent, self._produce, items, queues[0], consumers[0]))]
+    for i, stage in enumerate(self.stages):
+      remaining = [stage.workers]
+      for worker in range(stage.workers):
+        threads.append(Thread(target=self._attached, name='%s %d' % (stage.name, worker + 1),
+          args=(parent, self._work, stage, queues[i], queues[i + 1], consumers[i + 1], 
+                remaining)))
+    for thread in threads:
+      thread.daemon = True
+      thread.start()
+    
+    # Yields results in production order (holding back those that finish early)
+    finished = { }
+    next_index = 0
+    done = False
+    try:
+      while (True):
+        entry = queues[-1].get()
+        if (entry is _DONE):
+          done = True
+          break
+        index, results = entry
+        finished[index] = results
+        while (next_index in finished and not self.error):
+          yield finished.pop(next_index)
+          next_index += 1
+    finally:
+      # Stops the producer and stages if the results stopped being consumed,
+      # draining the results left until every stage has finished
+      if (not done):
+        self.stopped = True
+        while (queues[-1].get() is not _DONE): pass
+      for thread in threads: thread.join()
+    
+    # Raises the first error that stopped the pipeline
+    if (self.error):
+      error, self.error = self.error, None
+      raise error[0], error[1], error[2]
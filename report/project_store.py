@@ -0,0 +1,89 @@
+"""
+This module contains the project store of a report, which keeps the latest
+queried data and metric data of every project, so that single stages of a
+report (such as recalculating one project from its queried data, or producing
+the Powerpoint presentation) can be performed again without a full run.
+"""
+
+# Built-in modules
+import os
+
+# User-defined modules
+from directories import CACHE_DIR
+from utilities import create_dirpath, has_pickle, load_pickle, save_pickle
+
+# Kinds of entries stored for every project
+DATA = 'Data'
+METRICS = 'Metrics'
+
+class ProjectStore(object):
+  """
+  Persists the entries of every project of a report within the cache
+  directory, with one file per project and kind of entry:
+    - Data: the data last queried for the project
+    - Metrics: the metric data last produced for the project (as rolled up into
+      the group files), along with its artifact graph nodes
+  Entries are replaced as a whole whenever a run produces them again.
+  """
+  
+  def __init__(self, name, subdirs=[CACHE_DIR]):
+    """
+    Initializes the location of the entry files.
+    
+    @param name: Name of the report (used to name its folder in the cache).
+    @param subdirs: List of sub-directories (within the base Files folder)
+    where the store folder is created.
+    """
+    
+    self.subdirs = subdirs + ['%s Projects' % name]
+  
+  def _get_file_path(self, project, kind):
+    """
+    Gets the path of the file of the given entry.
+    
+    @param project: Key of the project.
+    @param kind: Kind of entry (DATA or METRICS).
+    @return: The path of the file.
+    """
+    
+    return os.path.join(create_dirpath(subdirs=self.subdirs),
+                        '%s %s.pickle' % (project, kind))
+  
+  def has(self, project, kind):
+    """
+    Checks whether an entry was stored for the given project.
+    
+    @param project: Key of the project.
+    @param kind: Kind of entry (DATA or METRICS).
+    @return: True if the entry exists, False otherwise.
+    """
+    
+    return has_pickle(self._get_file_path(project, kind))
+  
+  def load(self, project, kind):
+    """
+    Loads the given entry of a project.
+    
+    @param project: Key of the project.
+    @param kind: Kind of entry (DATA or METRICS).
+    @return: The stored entry, or None if no readable entry exists.
+    """
+    
+    file_path = self._get_file_path(project, kind)
+    try:
+      return load_pickle(file_path)
+    except Exception, e:
+      print "Ignoring unreadable project file %s: %s" % (file_path, str(e))
+      return None
+  
+  def save(self, project, kind, entry):
+    """
+    Stores the given entry of a project, replacing the previous one (see 
+    utilities.save_pickle()).
+    
+    @param project: Key of the project.
+    @param kind: Kind of entry (DATA or METRICS).
+    @param entry: Entry being stored.
+    """
+    
+    save_pickle(self._get_file_path(project, kind), entry)
@@ -0,0 +1,85 @@
+"""
+This module contains the rollup engine, which combines the metric data of
+individual projects into project group and overall (TDC) totals.
+"""
+
+# Built-in modules
+from collections import OrderedDict
+
+# User-defined modules
+from utilities import merge_metric
+
+def sort_series(series):
+  """
+  Sorts a rolled up weekly series by date. Merging the series of projects that
+  start on different weeks appends the earlier weeks of later projects after 
+  the weeks already in the total, so rolled up series need to be re-sorted.
+  
+  @param series: Data dictionary mapping dates to the data at that date.
+  @return: Data dictionary with the same items, in date order.
+  """
+  
+  return OrderedDict(sorted(series.iteritems()))
+
+class Rollup(object):
+  """
+  Rolls metric data up the project hierarchy (project -> project group -> TDC)
+  defined by a project map. Project data is merged into its group's total as
+  soon as it is added, and the group totals are merged into the overall total
+  at the end, so every level is computed within one bottom-up pass.
+  
+  Any metric family can be rolled up, as long as it can be merged additively
+  by the merge function (see utilities.merge_metric), such as severity and
+  status series, age accumulators and counts, or tuples of them.
+  """
+  
+  def __init__(self, project_map, merge_func=merge_metric):
+    """
+    Initializes the hierarchy of the rollup.
+    
+    @param project_map: Data dictionary mapping project group names to lists of
+    tuples with project keys and full project names, as used by reports:
+      <project group> -> [(project key, full project name),]
+    @param merge_func: Function merging a metric value into a running total
+    (which is None for the first value) and returning the new total.
+    """
+    
+    self.project_map = project_map
+    self.merge_func = merge_func
+    
+    # Running totals of each project group
+    self.group_totals = OrderedDict()
+  
+  def add(self, group, project, data):
+    """
+    Merges the metric data of a project into the total of the given project
+    group (a project listed in several groups is added once for each of them).
+    
+    @param group: Name of the project group the data is rolled up into.
+    @param project: Key of the project (as found in the project map).
+    @param data: Metric data of the project.
+    """
+    
+    if (project not in [proj for proj, _ in self.project_map.get(group, [])]):
+      raise KeyError('Project %s is not part of project group %s.' % (project, group))
+    self.group_totals[group] = self.merge_func(self.group_totals.get(group), data)
+  
+  def get_totals(self):
+    """
+    Gets the rolled up totals of every project group and of all the projects as
+    a whole.
+    
+    @return: A tuple with two items. The first is a data dictionary mapping
+    project group names (in project map order) to their totals, and the second
+    is the overall total (None if no data was added).
+    """
+    
+    group_totals = OrderedDict([(group, self.group_totals[group])
+                                for group in self.project_map if (group in self.group_totals)])
+    
+    # Merges group totals into the overall total
+    overall_total = None
+    for total in group_totals.values():
+      overall_total = self.merge_func(overall_total, total)
+    
+    return group_totals, overall_total
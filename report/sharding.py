@@ -0,0 +1,218 @@
+"""
+This module contains the sharded mode of the reports, which splits the project
+map of a report between several shards (worker processes, or separate
+machines). Every shard queries its own projects and produces their files, then
+saves their partials (the severity and status series and age data of each
+project, as rolled up by the report). A final merge step rolls the partials of
+every shard up into the project group and TDC files, and builds the Powerpoint
+presentation.
+"""
+
+# Built-in modules
+from collections import OrderedDict
+from datetime import date
+from multiprocessing import Process
+import os
+import socket
+
+# User-defined modules
+from directories import CACHE_DIR, PROJECT_DIR
+from manifest import manifest
+from report import EXTRACT_STAGE, METRICS_STAGE, DECK_STAGE
+from report.project_store import METRICS
+from tracing import span
+from utilities import create_dirpath, load_pickle, save_pickle
+
+def get_shard_projects(project_map, index, shards):
+  """
+  Gets the projects of a single shard. Projects are dealt out to the shards in
+  project map order, so that every machine splits the same project map the
+  same way, and the projects of large project groups are spread out.
+  
+  @param project_map: Project map of the report.
+  @param index: Index of the shard (starting at 0).
+  @param shards: Number of shards.
+  @return: List of the project keys of the shard.
+  """
+  
+  projects = [proj for group_projects in project_map.values() for proj, _ in group_projects]
+  return projects[index::shards]
+
+class ShardPartials(object):
+  """
+  Persists the partials of every shard of a report within the cache directory,
+  with one file per shard (which can be copied from the machine that ran the
+  shard to the one merging them). Each file holds the run date and host of the
+  shard, along with the project store entry (metric data and artifact graph
+  nodes) of every project it produced.
+  """
+  
+  def __init__(self, name, subdirs=[CACHE_DIR]):
+    """
+    Initializes the location of the partial files.
+    
+    @param name: Name of the report (used to name its folder in the cache).
+    @param subdirs: List of sub-directories (within the base Files folder)
+    where the partials folder is created.
+    """
+    
+    self.subdirs = subdirs + ['%s Shards' % name]
+  
+  def _get_file_path(self, index, shards):
+    """
+    Gets the path of the partial file of a shard.
+    
+    @param index: Index of the shard (starting at 0).
+    @param shards: Number of shards.
+    @return: The path of the file.
+    """
+    
+    return os.path.join(create_dirpath(subdirs=self.subdirs),
+                        'Shard %d of %d.pickle' % (index + 1, shards))
+  
+  def load(self, index, shards):
+    """
+    Loads the partials of a shard.
+    
+    @param index: Index of the shard (starting at 0).
+    @param shards: Number of shards.
+    @return: Data dictionary with the 'run_date', 'host' and 'entries' (mapping
+    project keys to their project store entries) of the shard, or None if no
+    readable partials exist.
+    """
+    
+    file_path = self._get_file_path(index, shards)
+    try:
+      return load_pickle(file_path)
+    except Exception, e:
+      print "Ignoring unreadable shard file %s: %s" % (file_path, str(e))
+      return None
+  
+  def save(self, index, shards, entries):
+    """
+    Saves the partials of a shard, replacing its previous ones (see
+    utilities.save_pickle()).
+    
+    @param index: Index of the shard (starting at 0).
+    @param shards: Number of shards.
+    @param entries: Data dictionary mapping the project keys of the shard to
+    their project store entries.
+    """
+    
+    save_pickle(self._get_file_path(index, shards), 
+                { 'run_date' : date.today(), 'host' : socket.gethostname(), 
+                  'entries' : entries })
+  
+  def remove(self, index, shards):
+    """
+    Removes the partials of a shard (if any).
+    
+    @param index: Index of the shard (starting at 0).
+    @param shards: Number of shards.
+    """
+    
+    file_path = self._get_file_path(index, shards)
+    for path in [file_path, file_path + '.bak']:
+      if (os.path.isfile(path)): os.remove(path)
+
+def run_shard(report_class, index, shards, resume=False,
+              stages=[EXTRACT_STAGE, METRICS_STAGE], **kwargs):
+  """
+  Runs a single shard of a report, which produces the project files of its
+  share of the project map, and saves their partials. Every shard has its own
+  checkpoint, artifact and trace files, so shards can run on the same machine
+  (the manifest is shared, but is locked while each shard saves it).
+  
+  @param report_class: Report sub-class being produced (such as JiraGTReport).
+  @param index: Index of the shard (starting at 0).
+  @param shards: Number of shards.
+  @param resume: True if the previous (interrupted) run of the shard should be
+  resumed, False otherwise.
+  @param stages: Stages performed by the shard (the deck stage is left to the
+  merge step).
+  @param **kwargs: Arbitrary keyword parameters passed into the report.
+  @return: List of the project keys of the shard.
+  """
+  
+  report = report_class(**kwargs)
+  report.run_name = '%s Shard %d of %d' % (report.run_name, index + 1, shards)
+  projects = get_shard_projects(report.project_map, index, shards)
+  
+  # Produces the project files (unless the shard has no projects, as an empty
+  # target list would target every project)
+  if (projects):
+    report.produce_report(resume=resume, targets=projects,
+                          stages=[stage for stage in stages if (stage != DECK_STAGE)])
+  
+  entries = OrderedDict([(proj, report.store.load(proj, METRICS)) for proj in projects])
+  ShardPartials(report_class.__name__).save(index, shards, entries)
+  return projects
+
+def merge_shards(report, shards):
+  """
+  Merges the partials of every shard into the project store of the report, then
+  rolls them up into the project group and TDC files and builds the Powerpoint
+  presentation.
+  
+  @param report: Report object whose shards are merged.
+  @param shards: Number of shards.
+  """
+  
+  # Loads the partials of every shard (which all need to exist)
+  partials = ShardPartials(report.__class__.__name__)
+  shard_partials = [partials.load(index, shards) for index in range(shards)]
+  missing = [str(index + 1) for index, partial in enumerate(shard_partials) if (not partial)]
+  if (missing):
+    raise ValueError('No partials for shard(s) %s of %d (they need to be run first).' %
+                     (', '.join(missing), shards))
+  
+  with span('Merging %d shards' % shards, 'run', echo=True):
+    host = socket.gethostname()
+    for index, partial in enumerate(shard_partials):
+      print "Merging shard %d of %d (produced on %s by %s)..." % (index + 1, shards,
+        partial['run_date'], partial['host'])
+      for proj, entry in partial['entries'].iteritems():
+        if (entry is None): continue
+        report.store.save(proj, METRICS, entry)
+        
+        # Indexes the project files copied from the machine of the shard
+        if (partial['host'] != host):
+          manifest.reindex(create_dirpath(subdirs=report.base_dir_trail + [PROJECT_DIR, proj]))
+    
+    # Rolls up the metric data of every project and builds the deck
+    report.produce_report(stages=[DECK_STAGE])
+
+def run_sharded(report_class, shards, resume=False, **kwargs):
+  """
+  Produces a report with the given number of shards, each running in its own
+  process on the current machine (a stand-in for running them on separate
+  machines), then merges them.
+  
+  @param report_class: Report sub-class being produced (such as JiraGTReport).
+  @param shards: Number of shards.
+  @param resume: True if the previous (interrupted) run of every shard should
+  be resumed, False otherwise.
+  @param **kwargs: Arbitrary keyword parameters passed into the report.
+  @return: The report object used for the merge.
+  """
+  
+  # Discards the partials of previous runs, so that a failed shard is never
+  # merged from stale partials
+  partials = ShardPartials(report_class.__name__)
+  for index in range(shards): partials.remove(index, shards)
+  
+  # Runs every shard in its own process
+  processes = [Process(target=run_shard, name='Shard %d' % (index + 1),
+                       args=(report_class, index, shards, resume), kwargs=kwargs)
+               for index in range(shards)]
+  with span('Running %d shards' % shards, 'run', echo=True):
+    for process in processes: process.start()
+    for process in processes: process.join()
+  failed = [str(index + 1) for index, process in enumerate(processes) if (process.exitcode)]
+  if (failed):
+    raise Exception('Shard(s) %s of %d failed.' % (', '.join(failed), shards))
+  
+  # Merges the shards
+  report = report_class(**kwargs)
+  merge_shards(report, shards)
+  return report
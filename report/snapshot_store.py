@@ -0,0 +1,254 @@
+"""
+This module contains the metric snapshot store, which keeps the severity,
+status and age results of every report run in a local SQLite database, so that
+they can be compared week over week without opening the workbooks moved into
+the Previous Data folders.
+"""
+
+# Built-in modules
+from datetime import date, datetime, timedelta
+from threading import Lock
+import os
+import sqlite3
+
+# User-defined modules
+from constants import AGE, SEV, STATUS
+from directories import HISTORY_DIR
+from utilities import create_dirpath
+
+# Number of weeks of runs kept by the store by default (about two years)
+RETENTION_WEEKS = 104
+
+# Table of snapshot values, along with its indexes (the primary key covers the
+# lookups of a single run, and the trend index covers the history of a bucket)
+SCHEMA = [
+  '''CREATE TABLE IF NOT EXISTS snapshots (
+       run_date   TEXT NOT NULL,
+       source     TEXT NOT NULL,
+       project    TEXT NOT NULL,
+       issue_type TEXT NOT NULL,
+       metric     TEXT NOT NULL,
+       category   TEXT NOT NULL,
+       bucket     TEXT NOT NULL,
+       week       TEXT,
+       value      REAL,
+       count      INTEGER,
+       PRIMARY KEY (run_date, source, project, issue_type, metric, category, bucket))''',
+  '''CREATE INDEX IF NOT EXISTS snapshots_trend
+       ON snapshots (source, project, issue_type, metric, category, bucket, run_date)''',
+  '''CREATE INDEX IF NOT EXISTS snapshots_source_date ON snapshots (source, run_date)''',
+]
+
+def _to_date(value):
+  """
+  Converts a date string of the store into a date object.
+  
+  @param value: Date string (YYYY-MM-DD).
+  @return: The date object.
+  """
+  
+  return datetime.strptime(value, '%Y-%m-%d').date()
+
+class SnapshotStore(object):
+  """
+  Persists a snapshot of the metric results of every project (and of every
+  project group and the TDC) for every run, with one row for each value:
+    - Severity: the latest week of the severity series, with the data type
+      (Total, Open or Closed) as category and the priority as bucket
+    - Status: the latest week of the status series, with the status group as
+      bucket
+    - Age: the average age (value) and number of issues (count) of every
+      priority (category) and status group (bucket)
+  Rows are keyed by run date, data source, project, issue type, metric,
+  category and bucket. Running a report again on the same day replaces the
+  snapshots of the projects it produces.
+  """
+  
+  def __init__(self, file_name='Metric Snapshots.sqlite', subdirs=[HISTORY_DIR],
+               retention_weeks=RETENTION_WEEKS):
+    """
+    Initializes the location and retention policy of the store.
+    
+    @param file_name: Name of the SQLite database file.
+    @param subdirs: List of sub-directories (within the base Files folder)
+    where the database file is kept.
+    @param retention_weeks: Number of weeks that runs are kept for (by prune()).
+    If set to None, every run is kept.
+    """
+    
+    self.file_name = file_name
+    self.subdirs = subdirs
+    self.retention_weeks = retention_weeks
+    
+    # Writes are serialized (the report writes projects on several threads)
+    self.lock = Lock()
+    self.initialized = False
+  
+  def _connect(self):
+    """
+    Opens a connection to the database, creating its tables and indexes if
+    needed.
+    
+    @return: The sqlite3 connection object.
+    """
+    
+    connection = sqlite3.connect(os.path.join(create_dirpath(subdirs=self.subdirs),
+                                              self.file_name), timeout=60)
+    if (not self.initialized):
+      with connection:
+        for statement in SCHEMA: connection.execute(statement)
+      self.initialized = True
+    return connection
+  
+  def _get_rows(self, metrics):
+    """
+    Flattens the metric results of a project into the values of its snapshot.
+    
+    @param metrics: List of tuples of an issue type and its severity, status
+    and age data, as calculated for the project:
+      [(issue type, severity, status, age),]
+    @return: List of tuples with the following items: (issue type, metric,
+    category, bucket, week, value, count).
+    """
+    
+    rows = []
+    for issue_type, sev, status, age in metrics:
+      # Takes the latest week of the severity and status series
+      for metric, series in [(SEV, sev), (STATUS, status)]:
+        if (not series): continue
+        week = max(series)
+        for category, buckets in series[week].iteritems():
+          for bucket, count in buckets.iteritems():
+            rows.append((issue_type, metric, category, bucket, week.isoformat(), count, count))
+      
+      # Takes the average age and number of issues of every bucket
+      for priority, groups in (age if (age) else { }).iteritems():
+        for group, average_age in groups.iteritems():
+          rows.append((issue_type, AGE, priority, group, None, float(average_age),
+                       average_age.num))
+    return rows
+  
+  def save(self, run_date, source, project, metrics):
+    """
+    Stores the snapshot of a project for the given run, replacing the snapshot
+    it may already have for that run.
+    
+    @param run_date: Date of the run (a date object).
+    @param source: Name of the data source of the report.
+    @param project: Key of the project (or name of the project group).
+    @param metrics: List of tuples of an issue type and its severity, status
+    and age data (see _get_rows()).
+    """
+    
+    key = (run_date.isoformat(), source, project)
+    rows = [key + row for row in self._get_rows(metrics)]
+    with self.lock:
+      connection = self._connect()
+      try:
+        with connection:
+          connection.execute('DELETE FROM snapshots WHERE run_date = ? AND source = ? '
+                             'AND project = ?', key)
+          connection.executemany('INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                 rows)
+      finally:
+        connection.close()
+  
+  def get_run_dates(self, source):
+    """
+    Gets the dates of every run stored for the given data source.
+    
+    @param source: Name of the data source.
+    @return: List of date objects, in date order.
+    """
+    
+    connection = self._connect()
+    try:
+      return [_to_date(row[0]) for row in connection.execute(
+        'SELECT DISTINCT run_date FROM snapshots WHERE source = ? ORDER BY run_date',
+        (source,))]
+    finally:
+      connection.close()
+  
+  def get_trend(self, source, project, issue_type, metric, category, bucket, since=None):
+    """
+    Gets the history of a single value across runs.
+    
+    @param source: Name of the data source.
+    @param project: Key of the project (or name of the project group).
+    @param issue_type: Issue type.
+    @param metric: SEV, STATUS or AGE.
+    @param category: Data type (SEV), TOTAL (STATUS) or priority (AGE).
+    @param bucket: Priority (SEV) or status group (STATUS and AGE).
+    @param since: Date of the earliest run included. If left blank, every run
+    is included.
+    @return: List of tuples with the run date, value and count, in date order.
+    """
+    
+    connection = self._connect()
+    try:
+      rows = connection.execute(
+        'SELECT run_date, value, count FROM snapshots WHERE source = ? AND project = ? '
+        'AND issue_type = ? AND metric = ? AND category = ? AND bucket = ? AND run_date >= ? '
+        'ORDER BY run_date', (source, project, issue_type, metric, category, bucket,
+                              since.isoformat() if (since) else ''))
+      return [(_to_date(run_date), value, count) for run_date, value, count in rows]
+    finally:
+      connection.close()
+  
+  def get_diff(self, source, run_date, previous_date=None):
+    """
+    Gets the values that changed between two runs of a data source.
+    
+    @param source: Name of the data source.
+    @param run_date: Date of the run being compared.
+    @param previous_date: Date of the run it is compared with. If left blank,
+    the latest run before it is used.
+    @return: List of tuples with the following items, for every value that is
+    new, changed or gone (in which case its value is None): (project, issue
+    type, metric, category, bucket, previous value, value).
+    """
+    
+    connection = self._connect()
+    try:
+      if (not previous_date):
+        row = connection.execute('SELECT MAX(run_date) FROM snapshots WHERE source = ? '
+                                 'AND run_date < ?', (source, run_date.isoformat())).fetchone()
+        if (not row[0]): return []
+        previous_date = _to_date(row[0])
+      
+      # Joins both runs on their keys in both directions (SQLite has no full
+      # outer join)
+      query = ('SELECT a.project, a.issue_type, a.metric, a.category, a.bucket, %s '
+               'FROM snapshots a LEFT JOIN snapshots b ON b.run_date = ? AND '
+               'b.source = a.source AND b.project = a.project AND '
+               'b.issue_type = a.issue_type AND b.metric = a.metric AND '
+               'b.category = a.category AND b.bucket = a.bucket '
+               'WHERE a.run_date = ? AND a.source = ? AND %s')
+      dates = (previous_date.isoformat(), run_date.isoformat())
+      changed = connection.execute(query % ('b.value, a.value', 'b.value IS NOT a.value'),
+                                   dates + (source,)).fetchall()
+      gone = connection.execute(query % ('a.value, NULL', 'b.run_date IS NULL'),
+                                dates[::-1] + (source,)).fetchall()
+      return sorted(changed + gone)
+    finally:
+      connection.close()
+  
+  def prune(self, today=None):
+    """
+    Deletes the runs older than the retention period of the store.
+    
+    @param today: Date the retention period is counted back from (the current
+    date by default).
+    @return: Number of rows deleted.
+    """
+    
+    if (self.retention_weeks is None): return 0
+    cutoff = (today if (today) else date.today()) - timedelta(weeks=self.retention_weeks)
+    with self.lock:
+      connection = self._connect()
+      try:
+        with connection:
+          return connection.execute('DELETE FROM snapshots WHERE run_date < ?',
+                                    (cutoff.isoformat(),)).rowcount
+      finally:
+        connection.close()
@@ -0,0 +1,101 @@
+"""
+This module runs the State of Quality reports from the command line, either as
+a full run or as a selective regeneration of some projects, project groups and
+stages (reusing the stored data and existing files of everything else). Runs
+can also be sharded, either locally (one process per shard), or across several
+machines (one shard per machine, followed by a merge of their partials on the
+machine producing the deck, once the partial files and project folders of the
+other machines have been copied over to it).
+
+Examples:
+  python report_run.py jira
+  python report_run.py jira --checkpoint
+  python report_run.py jira --resume
+  python report_run.py jira --targets SEPTA --stages extract
+  python report_run.py jira --targets SEPTA --stages metrics deck
+  python report_run.py clearquest --stages deck
+  python report_run.py jira --shards 4
+  python report_run.py jira --shards 4 --shard 2
+  python report_run.py jira --shards 4 --merge
+"""
+
+# Built-in modules
+from argparse import ArgumentParser
+from collections import OrderedDict
+
+# User-defined modules
+from report import STAGES
+from report.clearquest_report import ClearQuestReport
+from report.jira_gt_report import JiraGTReport
+from report.sharding import run_shard, merge_shards, run_sharded
+
+# Maps data source names to their report classes
+REPORTS = OrderedDict([('jira', JiraGTReport), ('clearquest', ClearQuestReport)])
+
+def get_parser():
+  """
+  Gets the parser of the command line arguments.
+  
+  @return: ArgumentParser object.
+  """
+  
+  parser = ArgumentParser(description='Produces (or regenerates parts of) the State of '
+                                      'Quality report of a data source.')
+  parser.add_argument('source', choices=REPORTS.keys(), help='Data source of the report.')
+  parser.add_argument('--targets', nargs='*', metavar='NAME',
+                      help='Project keys and project group names to regenerate (all '
+                           'projects by default).')
+  parser.add_argument('--stages', nargs='*', choices=STAGES, default=STAGES,
+                      help='Stages to perform: extract (query data into the store), metrics '
+                           '(produce project files), deck (produce group files and '
+                           'Powerpoint). All of them by default.')
+  parser.add_argument('--checkpoint', action='store_true',
+                      help='Checkpoint the progress of the run, so that it can be resumed '
+                           'if it is interrupted, and resume the weekly counts of the '
+                           'calculations from the last week already counted.')
+  parser.add_argument('--resume', action='store_true',
+                      help='Resume the previous (interrupted, and checkpointed) run.')
+  parser.add_argument('--rebuild', action='store_true',
+                      help='Produce every file again, even if its inputs are unchanged.')
+  parser.add_argument('--processes', type=int, default=None,
+                      help='Worker processes used for calculations.')
+  parser.add_argument('--cache', action='store_true',
+                      help='Reuse calculation results for unchanged data.')
+  parser.add_argument('--trace', action='store_true', help='Save a trace file of the run.')
+  parser.add_argument('--shards', type=int, default=None,
+                      help='Number of shards the projects are split between (each one is '
+                           'run on its own process, unless --shard or --merge is given).')
+  parser.add_argument('--shard', type=int, default=None, metavar='NUMBER',
+                      help='Only run the given shard (from 1 to --shards), such as on one '
+                           'of several machines.')
+  parser.add_argument('--merge', action='store_true',
+                      help='Only merge the partials of every shard and produce the deck.')
+  return parser
+
+# Only runs script when it is being directly executed
+if (__name__ == '__main__'):
+  parser = get_parser()
+  args = parser.parse_args()
+  if ((args.shard or args.merge) and not args.shards):
+    parser.error('--shard and --merge need the number of --shards.')
+  if (args.shard and not 1 <= args.shard <= args.shards):
+    parser.error('--shard needs to be between 1 and %d.' % args.shards)
+  if (args.shards and args.targets):
+    parser.error('--targets cannot be used with --shards.')
+  
+  # Parameters of the report (skipping the files whose inputs have not changed)
+  report_class = REPORTS[args.source]
+  kwargs = { 'processes' : args.processes, 'use_cache' : args.cache,
+             'skip_unchanged' : not args.rebuild, 'checkpoints' : args.checkpoint,
+             'trace' : args.trace }
+  
+  # Produces the report (or a single shard of it, or the merge of its shards)
+  if (args.shard):
+    run_shard(report_class, args.shard - 1, args.shards, args.resume, args.stages, **kwargs)
+  elif (args.merge):
+    merge_shards(report_class(**kwargs), args.shards)
+  elif (args.shards):
+    run_sharded(report_class, args.shards, args.resume, **kwargs)
+  else:
+    report = report_class(**kwargs)
+    report.produce_report(resume=args.resume, targets=args.targets, stages=args.stages)
@@ -18,11 +18,11 @@ MAIN = 'Main Data'
 CHANGE = 'Change History'
 
 # Only runs script when it is being directly executed
-def create_raw_reports(project_list):
+def create_raw_reports(project_list, db=None):
   project_data = OrderedDict()
   
-  # Connects to JIRA
-  generator = JiraGT()
+  # Connects to JIRA (unless a connection was given, such as by a batch run)
+  generator = db if (db) else JiraGT()
   generator.connect()
   
   # Iterates through each project and queries for its data
@@ -45,7 +45,7 @@ def create_raw_reports(project_list):
     for key, params in project_data[proj].iteritems():
       curr_params = [key]
       for k, v in params.iteritems():
-        if (k != HIST): curr_params.append(v)
+        if (k not in DERIVED_FIELDS): curr_params.append(v)
       raw_data[MAIN].append(curr_params)
       
       # Gets historical data if it exists
@@ -58,8 +58,8 @@ def create_raw_reports(project_list):
     
     print "%s raw data produced" % proj
 
-  # Disconnects from JIRA
-  generator.disconnect()
+  # Disconnects from JIRA (leaving a given connection open)
+  if (not db): generator.disconnect()
 
 # Only runs script when it is being directly executed
 if (__name__ == '__main__'):
@@ -22,13 +22,22 @@ CHANGE = 'Change History'
 # Constant for weekday when next date should be omitted
 SUNDAY = 6
 
-# Only runs script when it is being directly executed
-if (__name__ == '__main__'):
-  # Grabs SEPTA data
-  generator = JiraGT()
-  generator.connect()
-  data = generator.get_issue_data('SEPTA')
-  generator.disconnect()
+def run_septa(db=None):
+  """
+  Produces the SEPTA raw data file and its severity and status workbooks.
+  
+  @param db: Connected JiraGT object to query with (such as one shared by a
+  batch run). If it is left blank, a connection is opened for the query.
+  """
+  
+  # Grabs SEPTA data (opening a connection unless one was given)
+  if (db):
+    data = db.get_issue_data('SEPTA')
+  else:
+    generator = JiraGT()
+    generator.connect()
+    data = generator.get_issue_data('SEPTA')
+    generator.disconnect()
   
   # Save path for raw SEPTA data
   raw_save_path = create_dirpath(subdirs=[PROJECT_DIR, 'SEPTA', RAW_DATA_DIR])
@@ -44,7 +53,7 @@ if (__name__ == '__main__'):
   for key, params in data.iteritems():
     curr_params = [key]
     for k, v in params.iteritems():
-      if (k != HIST): curr_params.append(v)
+      if (k not in DERIVED_FIELDS): curr_params.append(v)
     raw_data[MAIN].append(curr_params)
     
     # Gets historical data if it exists
@@ -146,4 +155,8 @@ if (__name__ == '__main__'):
       
   # Performs export
   exporter = ExportDataWriter(filename, save_path, series_names)
-  exporter.produce_workbook(status, sheet_data=sheet_data)
\ No newline at end of file
+  exporter.produce_workbook(status, sheet_data=sheet_data)
+
+# Only runs script when it is being directly executed
+if (__name__ == '__main__'):
+  run_septa()
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""
+This module contains the time axes that calculated metrics are measured along.
+A time axis determines the boundary dates (days, extraction days of each week, 
+or ends of months) at which snapshots of the data are taken.
+"""
+
+# Built-in modules
+from calendar import monthrange
+from datetime import datetime, timedelta
+
+# User-defined modules
+from constants import DAILY, WEEKLY, MONTHLY
+
+# Names of the days of the week (Mon=0, Tue=1, Wed=2, etc)
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+class TimeAxis(object):
+  """
+  Represents a series of boundary dates separated by a given granularity. Each
+  boundary date marks the end of a period (day, week or month), so the data 
+  associated with a boundary includes everything up to and including that day.
+  """
+  
+  def __init__(self, granularity=WEEKLY, extraction_day=4):
+    """
+    Initializes the granularity of the time axis.
+    
+    @param granularity: Size of each step of the axis (DAILY, WEEKLY, MONTHLY).
+    @param extraction_day: Day of the week that weekly boundaries take place on,
+    represented by an integer where Mon=0, Tue=1, Wed=2, etc. It is ignored by
+    daily and monthly axes.
+    """
+    
+    if (granularity not in [DAILY, WEEKLY, MONTHLY]):
+      raise ValueError('Granularity %s not recognized.' % granularity)
+    
+    self.granularity = granularity
+    self.extraction_day = extraction_day if (granularity == WEEKLY) else None
+    
+  @property
+  def name(self):
+    """
+    Textual name of the time axis (such as "Weekly (Fri)").
+    """
+    
+    if (self.granularity == WEEKLY):
+      return '%s (%s)' % (self.granularity, WEEKDAYS[self.extraction_day])
+    return self.granularity
+  
+  def __repr__(self):
+    return 'TimeAxis(%s)' % self.name
+  
+  def __eq__(self, other):
+    return (isinstance(other, TimeAxis) and self.granularity == other.granularity
+            and self.extraction_day == other.extraction_day)
+  
+  def __ne__(self, other):
+    return not self.__eq__(other)
+  
+  def __hash__(self):
+    return hash((self.granularity, self.extraction_day))
+  
+  def get_boundary(self, date):
+    """
+    Gets the lowest boundary date greater than or equal to the given date.
+    
+    @param date: The datetime for which the next boundary is being obtained.
+    @return: A datetime (with no time information) representing the end of the
+    period that the given date is part of.
+    """
+    
+    # Formats date to remove time
+    date = date.replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    if (self.granularity == WEEKLY):
+      # The # of days between the given date and the next extraction date
+      return date + timedelta(days=(self.extraction_day - date.weekday()) % 7)
+    elif (self.granularity == MONTHLY):
+      # Last day of the given date's month
+      return date.replace(day=monthrange(date.year, date.month)[1])
+    else:
+      return date
+    
+  def get_next(self, boundary):
+    """
+    Gets the boundary date following the given boundary date.
+    
+    @param boundary: A boundary datetime of the current time axis.
+    @return: The following boundary datetime.
+    """
+    
+    if (self.granularity == WEEKLY):
+      return boundary + timedelta(days=7)
+    elif (self.granularity == MONTHLY):
+      return self.get_boundary(boundary + timedelta(days=1))
+    else:
+      return boundary + timedelta(days=1)
+    
+  def get_dates(self, earliest, latest=None, hastime=False):
+    """
+    Gets the list of every boundary date from the one associated with the 
+    earliest date up to (and including) the one associated with the latest date.
+    The list is built iteratively, so very long histories pose no problem.
+    
+    @param earliest: A datetime object representing the earliest possible date 
+    from the data set.
+    @param latest: A datetime object representing the latest date to include.
+    Defaults to the current date.
+    @param hastime: True if list is to contain datetime objects, False if the
+    list should contain simple date objects with no time information.
+    @return: A list of boundary dates, in ascending order. It always contains
+    at least the boundary associated with the latest date.
+    """
+    
+    # Gets the first and final boundaries
+    final = self.get_boundary(latest if (latest) else datetime.today())
+    date = min(self.get_boundary(earliest), final)
+    
+    # Steps through each boundary up to the final boundary
+    dates = []
+    while (date <= final):
+      dates.append(date if (hastime) else date.date())
+      date = self.get_next(date)
+      
+    return dates
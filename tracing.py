@@ -0,0 +1,302 @@
+"""
+This module contains the tracing subsystem, which records nested spans of work
+(such as a report run, the stages of each project, and individual queries or
+workbooks) along with their attributes, and exports them as Chrome trace-event
+JSON files that can be opened in a trace viewer (such as chrome://tracing).
+"""
+
+# Built-in modules
+from contextlib import contextmanager
+from itertools import count
+import json
+import os
+from threading import Lock, current_thread, local
+from time import strftime, time
+
+# User-defined modules
+from directories import TRACE_DIR
+from utilities import create_dirpath
+
+class Span(object):
+  """
+  A single timed span of work. Spans are nested within the span that was open
+  on the same thread when they started (or within the span attached to the
+  thread, see Tracer.attach()).
+  """
+  
+  def __init__(self, span_id, name, category, parent, attrs, recorded=False):
+    """
+    Starts the span.
+    
+    @param span_id: Unique integer ID of the span.
+    @param name: Textual description of the work being performed.
+    @param category: Category of the span (such as 'run', 'query', 'calculate'
+    or 'write').
+    @param parent: Span that the span is nested within (None for a root span).
+    @param attrs: Data dictionary of attributes of the span.
+    @param recorded: True if the span is kept by the tracer once it is finished
+    (so that it can be exported), False if it is only timed.
+    """
+    
+    self.id = span_id
+    self.name = name
+    self.category = category
+    self.parent = parent
+    self.attrs = attrs
+    self.recorded = recorded
+    
+    # Thread that the span runs on
+    thread = current_thread()
+    self.thread_id = thread.ident
+    self.thread_name = thread.name
+    
+    # Start and end times (in seconds since the epoch)
+    self.start = time()
+    self.end = None
+  
+  @property
+  def duration(self):
+    """
+    Number of seconds the span ran for (or has been running for so far).
+    """
+    
+    return (self.end if (self.end is not None) else time()) - self.start
+  
+  def set(self, **attrs):
+    """
+    Sets attributes of the span (such as row counts or file sizes).
+    
+    @param **attrs: Attribute names mapped to their values.
+    """
+    
+    self.attrs.update(attrs)
+  
+  def is_within(self, span):
+    """
+    Checks whether the span is nested within the given span (at any depth).
+    
+    @param span: Span being checked against.
+    @return: True if the span is the given span or is nested within it, False
+    otherwise.
+    """
+    
+    curr = self
+    while (curr is not None):
+      if (curr is span): return True
+      curr = curr.parent
+    return False
+
+class Tracer(object):
+  """
+  Records the spans of the current process. Every thread has its own stack of
+  open spans, so spans started on worker threads are nested correctly as long
+  as the threads are attached to the span they work for.
+  
+  Only the spans of runs that are exported are recorded (see start()), and
+  they should be cleared once they are exported (see clear()), so that spans
+  do not pile up within long-lived processes.
+  """
+  
+  def __init__(self):
+    """
+    Initializes the finished spans and the stacks of open spans.
+    """
+    
+    self.spans = []
+    self.ids = count(1)
+    self.lock = Lock()
+    self.local = local()
+  
+  def _get_stack(self):
+    """
+    Gets the stack of open spans of the current thread.
+    
+    @return: List of open spans, with the innermost one last.
+    """
+    
+    if (not hasattr(self.local, 'stack')): self.local.stack = []
+    return self.local.stack
+  
+  def current(self):
+    """
+    Gets the innermost open span of the current thread.
+    
+    @return: The span, or None if no span is open.
+    """
+    
+    stack = self._get_stack()
+    return stack[-1] if (stack) else None
+  
+  def start(self, name, category='report', record=None, **attrs):
+    """
+    Starts a span nested within the current span of the thread. Every span
+    started must be finished with finish() on the same thread.
+    
+    @param name: Textual description of the work being performed.
+    @param category: Category of the span.
+    @param record: True if the span and the spans nested within it should be
+    recorded (such as the root span of a run whose trace is saved), False if
+    they should only be timed. If left blank, the span is recorded if the span
+    it is nested within is (root spans are not recorded).
+    @param **attrs: Attributes of the span.
+    @return: The span that was started.
+    """
+    
+    with self.lock:
+      span_id = next(self.ids)
+    parent = self.current()
+    if (record is None): record = bool(parent and parent.recorded)
+    span = Span(span_id, name, category, parent, attrs, record)
+    self._get_stack().append(span)
+    return span
+  
+  def finish(self, span, echo=False):
+    """
+    Finishes the given span (and any span still open within it on the thread),
+    keeping it if it is recorded.
+    
+    @param span: Span being finished.
+    @param echo: True if the execution time of the span should be printed.
+    """
+    
+    stack = self._get_stack()
+    while (stack and span in stack):
+      curr = stack.pop()
+      curr.end = time()
+      if (curr.recorded):
+        with self.lock:
+          self.spans.append(curr)
+      if (curr is span): break
+    
+    if (echo):
+      print "\n>>>> %s ran in %f seconds. <<<<\n" % (span.name, span.duration)
+  
+  @contextmanager
+  def span(self, name, category='report', echo=False, **attrs):
+    """
+    Context manager running its block within a new span. The span is finished
+    (and recorded, if the span it is nested within is) even if the block raises
+    an error, in which case the error is added to its attributes.
+    
+    @param name: Textual description of the work being performed.
+    @param category: Category of the span.
+    @param echo: True if the execution time of the span should be printed once
+    it is finished.
+    @param **attrs: Attributes of the span.
+    @yield: The span, so that attributes can be set within the block.
+    """
+    
+    span = self.start(name, category, **attrs)
+    try:
+      yield span
+    except Exception, e:
+      span.set(error=repr(e))
+      raise
+    finally:
+      self.finish(span, echo)
+  
+  @contextmanager
+  def attach(self, span):
+    """
+    Context manager that nests the spans started by its block (on the current
+    thread) within the given span, which is usually open on another thread
+    (such as the span of a report run, for the threads of its pipeline).
+    
+    @param span: Span being attached to (nothing is attached if it is None).
+    """
+    
+    stack = self._get_stack()
+    if (span is not None): stack.append(span)
+    try:
+      yield
+    finally:
+      if (span is not None and span in stack): stack.remove(span)
+  
+  def get_events(self, root=None):
+    """
+    Converts the finished spans into Chrome trace events.
+    
+    @param root: Span whose nested spans (including itself) are converted. If
+    it is left blank, every finished span is converted.
+    @return: List of trace event dictionaries, with a complete ('X') event for
+    every span and a metadata ('M') event naming every thread.
+    """
+    
+    pid = os.getpid()
+    with self.lock:
+      spans = [span for span in self.spans if (root is None or span.is_within(root))]
+    
+    events = []
+    threads = { }
+    for span in sorted(spans, key=lambda span: span.start):
+      args = dict(span.attrs)
+      args['id'] = span.id
+      if (span.parent is not None): args['parent'] = span.parent.id
+      events.append({
+        'name' : span.name, 'cat' : span.category, 'ph' : 'X', 'pid' : pid,
+        'tid' : span.thread_id, 'ts' : int(span.start * 1e6),
+        'dur' : int((span.end - span.start) * 1e6), 'args' : args
+      })
+      threads[span.thread_id] = span.thread_name
+    
+    events.extend([{'name' : 'thread_name', 'ph' : 'M', 'pid' : pid, 'tid' : tid,
+                    'args' : {'name' : name}} for tid, name in threads.iteritems()])
+    return events
+  
+  def export(self, file_path, root=None):
+    """
+    Writes the finished spans into a Chrome trace-event JSON file.
+    
+    @param file_path: Path of the JSON file.
+    @param root: Span whose nested spans (including itself) are exported. If it
+    is left blank, every finished span is exported.
+    @return: The given file path.
+    """
+    
+    with open(file_path, 'w') as f:
+      json.dump({'traceEvents' : self.get_events(root), 'displayTimeUnit' : 'ms'}, f,
+                default=str)
+    return file_path
+  
+  def clear(self, root=None):
+    """
+    Discards finished spans.
+    
+    @param root: Span whose nested spans (including itself) are discarded. If
+    it is left blank, every finished span is discarded.
+    """
+    
+    with self.lock:
+      self.spans = [span for span in self.spans
+                    if (root is not None and not span.is_within(root))]
+
+# Tracer shared by the whole process
+tracer = Tracer()
+
+def span(name, category='report', echo=False, **attrs):
+  """
+  Runs a block within a new span of the shared tracer (see Tracer.span()).
+  
+  @param name: Textual description of the work being performed.
+  @param category: Category of the span.
+  @param echo: True if the execution time of the span should be printed.
+  @param **attrs: Attributes of the span.
+  @return: Context manager yielding the span.
+  """
+  
+  return tracer.span(name, category, echo, **attrs)
+
+def save_trace(name, root=None):
+  """
+  Exports the spans of the shared tracer into a timestamped Chrome trace-event
+  JSON file within the Traces folder.
+  
+  @param name: Name of the traced run (used to name the file).
+  @param root: Span whose nested spans are exported (every span if left blank).
+  @return: File path of the trace file.
+  """
+  
+  file_name = '%s Trace %s.json' % (name, strftime('%Y-%m-%d %H-%M-%S'))
+  file_path = os.path.join(create_dirpath(subdirs=[TRACE_DIR]), file_name)
+  print 'Saving trace to %s...' % file_path
+  return tracer.export(file_path, root)
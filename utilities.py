@@ -3,14 +3,19 @@ This module contains functions that perform general purpose functions.
 """
 
 # Built-in modules
+from collections import OrderedDict
 from datetime import datetime, timedelta
+import cPickle
+import math
 import os
 import re
 import shutil
 import time
 
 # User-defined modules
+from constants import WEEKLY
 from directories import FILES_DIR
+from time_axis import TimeAxis
 
 def  get_title(html):
   """
@@ -32,10 +37,41 @@ def get_top_level_path():
 
   return os.path.dirname(os.path.abspath(__file__))
 
+# Maps the directory trails (base directory followed by sub-directories) that
+# were already created to their absolute paths
+_dirpaths = { }
+
+def reset_dirpaths():
+  """
+  Forgets the directories resolved by create_dirpath(), so that they are checked
+  (and created) again when they are next used. It should be called at the start
+  of every run, in case directories were removed in the meantime.
+  """
+
+  _dirpaths.clear()
+
+def remove_dirpath(basedir=FILES_DIR, subdirs=[]):
+  """
+  Removes the directory at the lowest level of the given sub directories (along
+  with its contents), forgetting it and the directories within it, so that
+  create_dirpath() creates them again.
+
+  @param basedir: The lowest level directory of the directory being removed.
+  @param subdirs: The list of subdirectories leading to the directory being
+  removed (see create_dirpath()).
+  """
+
+  trail = tuple([basedir] + list(subdirs))
+  shutil.rmtree(create_dirpath(basedir, subdirs), ignore_errors=True)
+  for dir_trail in _dirpaths.keys():
+    if (dir_trail[:len(trail)] == trail): _dirpaths.pop(dir_trail, None)
+
 def create_dirpath(basedir=FILES_DIR, subdirs=[]):
   """
   Creates the directory and its following series of sub directories.
   Returns the absolute path of the resulting directory at the lowest level.
+  Directories are only checked (and created) the first time they are used, and
+  their paths are resolved from memory afterwards (see reset_dirpaths()).
 
   @param basedir: The lowest level directory which is always created (if it
   doesn't already exist), from which the sub-directories are created as well.
@@ -47,23 +83,28 @@ def create_dirpath(basedir=FILES_DIR, subdirs=[]):
   @return: The absolute path of the resulting directory at the lowest level.
   """
 
+  # Takes the path from memory if the directory was already created
+  trail = tuple([basedir] + list(subdirs))
+  if (trail in _dirpaths): return _dirpaths[trail]
+
   # Sets cursor for directory
   currdir = get_top_level_path()
   if (currdir[-4:] == '.exe'):
     currdir = os.path.abspath(os.path.join(currdir, os.pardir))
   currdir = '%s\\%s' % (currdir, basedir)
 
-  # Checks whether base directory exists
-  if (not os.path.isdir(currdir)):
-    os.mkdir(currdir)
-
-  # Creates the series of sub-directories
-  for directory in subdirs:
-    currdir += '\\%s' % directory
+  # Creates base directory and the series of sub-directories (tolerating ones
+  # created in the meantime by another thread), skipping those already created
+  for index, directory in enumerate([None] + list(subdirs)):
+    if (directory): currdir += '\\%s' % directory
+    if (trail[:index + 1] in _dirpaths): continue
     if (not os.path.isdir(currdir)):
-      os.mkdir(currdir)
+      try: os.mkdir(currdir)
+      except OSError:
+        if (not os.path.isdir(currdir)): raise
+    _dirpaths[trail[:index + 1]] = os.path.abspath(currdir)
 
-  return os.path.abspath(currdir)
+  return _dirpaths[trail]
 
 def save_file(filename, content, ext, basedir=FILES_DIR, subdirs=[], append=False):
   """
@@ -105,6 +146,57 @@ def save_file(filename, content, ext, basedir=FILES_DIR, subdirs=[], append=Fals
 
   return filepath
 
+def save_pickle(file_path, value):
+  """
+  Pickles the given value into a file, replacing the file's previous content
+  only once the new content is completely written. The value is written into a
+  temporary file first, and the previous file is kept (as a backup) until the
+  temporary file has been renamed into its place, so an interrupted write
+  always leaves one complete version of the file (see load_pickle()).
+
+  @param file_path: Path of the file.
+  @param value: Value being pickled.
+  """
+
+  temp_path, backup_path = file_path + '.tmp', file_path + '.bak'
+  with open(temp_path, 'wb') as f:
+    cPickle.dump(value, f, cPickle.HIGHEST_PROTOCOL)
+
+  # Moves the previous file out of the way (renaming over an existing file is
+  # not supported on Windows), then drops it once the new file is in place
+  if (os.path.isfile(file_path)):
+    if (os.path.isfile(backup_path)): os.remove(backup_path)
+    os.rename(file_path, backup_path)
+  os.rename(temp_path, file_path)
+  if (os.path.isfile(backup_path)): os.remove(backup_path)
+
+def has_pickle(file_path):
+  """
+  Checks whether a file saved by save_pickle() exists, restoring its previous
+  version if it was left as a backup by an interrupted write.
+
+  @param file_path: Path of the file.
+  @return: True if the file exists, False otherwise.
+  """
+
+  backup_path = file_path + '.bak'
+  if (not os.path.isfile(file_path) and os.path.isfile(backup_path)):
+    os.rename(backup_path, file_path)
+  return os.path.isfile(file_path)
+
+def load_pickle(file_path, default=None):
+  """
+  Unpickles the value of a file saved by save_pickle() (see has_pickle()).
+
+  @param file_path: Path of the file.
+  @param default: Value returned if the file does not exist.
+  @return: The unpickled value, or the default value.
+  """
+
+  if (not has_pickle(file_path)): return default
+  with open(file_path, 'rb') as f:
+    return cPickle.load(f)
+
 def create_file_log(filename, data):
   """
   Creates a log file within the Logs folder in order to record data for
@@ -121,7 +213,8 @@ def create_file_log(filename, data):
 def move_old_files(strlist, subdirs):
   """
   Moves all the old files with a string from the given list into the
-  given folder.
+  given folder. The files are looked up within the manifest (see manifest.py)
+  rather than by listing the folder.
 
   NOTE: The 'Files' folder is implicitly determined to be the base directory
   of all the subdirectories, and should not be included within the subdirs
@@ -143,13 +236,15 @@ def move_old_files(strlist, subdirs):
   directory = create_dirpath(subdirs=subdirs[:-1])
   subdir = create_dirpath(subdirs=subdirs)
 
-  # Traverses through list of files in the directory for folder transferral
-  for filename in os.listdir(directory):
+  # Imported here, since the manifest module depends on this one
+  from manifest import manifest
+
+  # Traverses through the files recorded in the directory for folder transferral
+  for entry in manifest.find(directory):
+    filename = entry['name']
     for filestr in strlist:
       if (filestr in filename and 'xlsx' in filename and date not in filename):
-        src = '%s/%s' % (directory, filename)
-        dst = '%s/%s' % (subdir, filename)
-        shutil.move(src, dst)
+        manifest.move(entry['path'], subdir)
         break
       
 def get_past_year(ascending=True):
@@ -206,36 +301,13 @@ def get_extraction_date(date, extractionday):
 
   return date
         
-def _append_historical_date(earliestdate, currdate):
-  """
-  Recursively appends dates to list so that they are in order, and the dates
-  are listed in increments of 7 days. The very first date on the list will
-  always be greater than or equal to the earliest date, because the data
-  associated with the first date will include any metrics associated with the
-  earliest date.
-
-  @param earliestdate: A datetime object representing the earliest
-  possible date from the data set.
-  @param currdate: A datetime object representing the current date being
-  appended to the list of dates during the recursion process.
-  @return: A list of dates separated by 7 day intervals leading up to the
-  given current date from the earliest date.
-  """
-
-  # Day of previous week
-  prevdate = currdate - timedelta(days=7)
-  if (prevdate.date() < earliestdate.date()):
-    return [currdate]
-  else:
-    # Recursive call to obtain list for previous dates
-    datelist = _append_historical_date(earliestdate, prevdate)
-    datelist.append(currdate)
-    return datelist
-
 def get_historical_dates(earliest, extractionday=4, hastime=True):
   """
   Gets a list of every date to get data for, given the earliest date given.
-  Each date is separated by weekly intervals.
+  Each date is separated by weekly intervals. The very first date on the list 
+  will always be greater than or equal to the earliest date, because the data
+  associated with the first date will include any metrics associated with the
+  earliest date.
 
   @param earliest: A datetime object representing the earliest possible
   date from the data set.
@@ -247,14 +319,7 @@ def get_historical_dates(earliest, extractionday=4, hastime=True):
   when data is supposed to be measured.
   """
 
-  # Gets the data extraction day of the current week
-  date = get_extraction_date(datetime.today(), extractionday)
-
-  # Populates list of dates to collect data, up to the current date
-  dates = _append_historical_date(earliest, date)
-  
-  # Determines whether a list of datetime or date objects are returned
-  return dates if (hastime) else [date.date() for date in dates]
+  return TimeAxis(WEEKLY, extractionday).get_dates(earliest, hastime=hastime)
 
 def get_str_date(string, regex='.+(\d{4})-(\d{2})-(\d{2}).+'):
   """
@@ -274,26 +339,78 @@ def get_str_date(string, regex='.+(\d{4})-(\d{2})-(\d{2}).+'):
     return datetime(*[int(date_pattern.group(x)) for x in [1, 2, 3]])
   else: None
 
+def get_link_set(links):
+  """
+  Splits the given linked issues into a set of issue keys.
+  
+  @param links: Comma-separated string (or list) of linked issue keys.
+  @return: Frozen set of the linked issue keys (empty if there are none).
+  """
+  
+  if (not links): return frozenset()
+  if (isinstance(links, basestring)): links = links.split(',')
+  return frozenset([link.strip() for link in links if (link and link.strip())])
+
+def merge_metric(total, value):
+  """
+  Additively merges the given metric data into a running total. Data
+  dictionaries are merged key by key, lists and tuples item by item, numbers 
+  are summed and accumulator objects (such as AverageAge) are combined. The 
+  given value itself is never modified or shared with the total.
+  
+  @param total: Running total that the value is merged into (or None if there 
+  is nothing to merge into yet).
+  @param value: Metric data being merged into the total.
+  @return: The merged total.
+  """
+  
+  if (value is None): return total
+  
+  # Merges data dictionaries key by key (in order of appearance)
+  if (isinstance(value, dict)):
+    if (total is None): total = OrderedDict()
+    for key, sub_value in value.iteritems():
+      total[key] = merge_metric(total.get(key), sub_value)
+    return total
+  
+  # Merges lists and tuples item by item
+  if (isinstance(value, (list, tuple))):
+    if (total is None): total = [None] * len(value)
+    return type(value)([merge_metric(t, v) for t, v in zip(total, value)])
+  
+  # Combines accumulator objects into a new accumulator
+  if (hasattr(value, 'combine')):
+    if (total is None): total = type(value)()
+    total.combine(value)
+    return total
+  
+  # Sums numbers
+  return value if (total is None) else total + value
+
 class AverageAge(object):
   """
   Special class used to calculate an average age (in number of days), based on
   the parameters passed. It stores both the sum (as a timedelta object) and 
   number of items involved, in addition to the calculated average. The purpose
   of this class is to save the age_sum and item_num information in the 
-  situation that it will be recalculated using additional items.
+  situation that it will be recalculated using additional items. It can also
+  carry a QuantileSketch of the ages, so that percentiles can be estimated.
   """
   
-  def __init__(self, age_sum=timedelta(days=0), item_num=0):
+  def __init__(self, age_sum=timedelta(days=0), item_num=0, sketch=None):
     """
     Initializes age_sum, item_num, and calculates initial average.
     
     @param age_sum: The sum of ages, stored as a timedelta object.
     @param item_num: The number of items involved.
+    @param sketch: QuantileSketch object containing the ages (in days) of the
+    items involved, if percentiles are needed.
     """
     
     # Sets the initial values
     self.sum = age_sum
     self.num = item_num
+    self.sketch = sketch
     
     # Calculates and sets the average
     self.calculate_average()
@@ -360,6 +477,7 @@ class AverageAge(object):
     
     self.sum += value
     self.num += 1
+    if (self.sketch is not None): self.sketch.add(value.total_seconds() / 86400)
     if (update_avg): self.calculate_average()
       
   def combine(self, average_obj, update_avg=True):
@@ -377,4 +495,158 @@ class AverageAge(object):
     
     self.sum += average_obj.sum
     self.num += average_obj.num
-    if (update_avg): self.calculate_average()
\ No newline at end of file
+    if (average_obj.sketch is not None):
+      if (self.sketch is None): self.sketch = average_obj.sketch.copy()
+      else:                     self.sketch.merge(average_obj.sketch)
+    if (update_avg): self.calculate_average()
+    
+  def get_percentile(self, percentile):
+    """
+    Estimates the given percentile of the ages (in number of days), using the
+    object's quantile sketch.
+    
+    @param percentile: Percentile being estimated (between 0 and 100).
+    @return: The estimated percentile, rounded to the nearest tenth, or None if
+    the object has no quantile sketch.
+    """
+    
+    if (self.sketch is None): return None
+    return round(self.sketch.get_quantile(percentile / 100.0), 1)
+    
+class OpenAge(object):
+  """
+  Special class used to accumulate ages that are still running (that end at the
+  current date). Rather than the ages themselves, it stores the number of items
+  and the sum of their start dates (as a timedelta from a fixed epoch), so that
+  the sum of their ages can be determined for any current date without 
+  revisiting the items themselves. If percentiles are needed, the individual 
+  start dates are kept as well.
+  """
+  
+  # Fixed date from which start dates are measured
+  EPOCH = datetime(1970, 1, 1)
+  
+  def __init__(self, start_sum=timedelta(days=0), item_num=0, starts=None):
+    """
+    Initializes start_sum and item_num.
+    
+    @param start_sum: The sum of start dates, stored as a timedelta object
+    measured from the epoch.
+    @param item_num: The number of items involved.
+    @param starts: List of the individual start dates (if they should be kept).
+    """
+    
+    self.start_sum = start_sum
+    self.num = item_num
+    self.starts = starts
+    
+  def update(self, start_date):
+    """
+    Adds an item whose age started at the given date.
+    
+    @param start_date: Datetime object marking the start of the item's age.
+    """
+    
+    self.start_sum += start_date - self.EPOCH
+    self.num += 1
+    if (self.starts is not None): self.starts.append(start_date)
+    
+  def get_age_sum(self, current_date):
+    """
+    Determines the sum of the ages of every item, as of the given date.
+    
+    @param current_date: Datetime object marking the end of every item's age.
+    @return: The sum of ages, stored as a timedelta object.
+    """
+    
+    return (current_date - self.EPOCH) * self.num - self.start_sum
+    
+class QuantileSketch(object):
+  """
+  Mergeable sketch used to estimate quantiles of a set of non-negative values
+  with bounded memory. Values are counted within logarithmically sized buckets
+  (as in a DDSketch), so every estimated quantile is within the given relative
+  accuracy of the true value, while the number of buckets only grows with the 
+  logarithm of the range of values. Two sketches with the same accuracy can be
+  merged by adding their bucket counts.
+  """
+  
+  def __init__(self, accuracy=0.01, min_value=0.01):
+    """
+    Initializes an empty sketch.
+    
+    @param accuracy: Relative accuracy of the estimated quantiles.
+    @param min_value: Values less than or equal to this value are counted as 0.
+    """
+    
+    self.accuracy = accuracy
+    self.min_value = min_value
+    self.gamma = (1 + accuracy) / (1 - accuracy)
+    self.log_gamma = math.log(self.gamma)
+    
+    # Maps bucket index to count (bucket i contains (gamma^(i-1), gamma^i])
+    self.buckets = { }
+    self.zero_count = 0
+    self.count = 0
+    
+  def add(self, value, count=1):
+    """
+    Adds the given value to the sketch.
+    
+    @param value: Value being added.
+    @param count: Number of times the value is added.
+    """
+    
+    if (value <= self.min_value):
+      self.zero_count += count
+    else:
+      index = int(math.ceil(math.log(value) / self.log_gamma))
+      self.buckets[index] = self.buckets.get(index, 0) + count
+    self.count += count
+    
+  def merge(self, sketch):
+    """
+    Adds the counts of the given sketch to the current sketch.
+    
+    @param sketch: Another QuantileSketch object with the same accuracy.
+    """
+    
+    if (sketch.gamma != self.gamma):
+      raise ValueError('Sketches with different accuracies cannot be merged.')
+    
+    for index, count in sketch.buckets.iteritems():
+      self.buckets[index] = self.buckets.get(index, 0) + count
+    self.zero_count += sketch.zero_count
+    self.count += sketch.count
+    
+  def copy(self):
+    """
+    Creates a copy of the current sketch.
+    
+    @return: New QuantileSketch object with the same counts.
+    """
+    
+    sketch = QuantileSketch(self.accuracy, self.min_value)
+    sketch.merge(self)
+    return sketch
+    
+  def get_quantile(self, quantile):
+    """
+    Estimates the given quantile of the values added to the sketch.
+    
+    @param quantile: Quantile being estimated (between 0 and 1).
+    @return: The estimated quantile (0 if the sketch is empty).
+    """
+    
+    if (self.count == 0): return 0
+    
+    # Finds the bucket containing the rank of the quantile
+    rank = quantile * (self.count - 1)
+    seen = self.zero_count
+    if (rank < seen): return 0
+    for index in sorted(self.buckets):
+      seen += self.buckets[index]
+      if (rank < seen): break
+      
+    # Uses the value in the bucket with the lowest relative error
+    return 2 * self.gamma ** index / (self.gamma + 1)
\ No newline at end of file
@@ -3,27 +3,34 @@ Contains code for producing various kinds of Excel writers.
 """
 
 # Built-in modules
+import os
 from time import strftime
 
 # Third-party modules
-from utilities import create_dirpath
 from xlsxwriter import Workbook
 
+# User-defined modules
+from manifest import record_file
+from tracing import span
+from utilities import create_dirpath
+
 class XLWriter(object):
   """
   Abstract class for producing a generic Excel sheet from scratch. It should be
   implemented by sub-classes that use xlsxwriter to produce Excel sheets.
   """
   
-  def __init__(self, filename='Data', savepath=create_dirpath()):
+  def __init__(self, filename='Data', savepath=None):
     """
     Initializes basic Excel parameters.
     
     @param filename: Name of the file (without file extension).
-    @param savepath: File path where Excel sheet will be saved at.
+    @param savepath: File path where Excel sheet will be saved at (the base
+    Files folder by default).
     """
     
     # Initializes the workbook of the Excel file
+    if (savepath is None): savepath = create_dirpath()
     self.filepath = '%s\\%s %s.xlsx' % (savepath, filename, strftime("%Y-%m-%d"))
     self.wb = Workbook(self.filepath)
     
@@ -60,11 +67,17 @@ class XLWriter(object):
     @return: The file path of the Excel workbook that was created.
     """
     
-    # Sets the data, writes it to the file, and closes it
+    # Sets the data, writes it to the file, and closes it (recording the size of
+    # the file within the trace, and the file within the manifest)
     print '%s data being exported to a workbook...' % self.data_type
-    self._set_data(data)
-    self._write_data(**kwargs)
-    self.wb.close()
+    with span('Writing %s' % self.filepath.split('\\')[-1], 'workbook', 
+              data_type=self.data_type) as workbook_span:
+      self._set_data(data)
+      self._write_data(**kwargs)
+      self.wb.close()
+      if (os.path.isfile(self.filepath)):
+        workbook_span.set(bytes=os.path.getsize(self.filepath))
+        record_file(self.filepath)
     
     return self.filepath
     
@@ -9,7 +9,6 @@ from datetime import timedelta
 
 # User-defined modules
 from constants import TOTAL
-from utilities import create_dirpath
 from xl_writer import XLWriter
 
 class ExportDataWriter(XLWriter):
@@ -17,13 +16,14 @@ class ExportDataWriter(XLWriter):
   This class generates Excel metrics charts for a given type of data.
   """
   
-  def __init__(self, filename='Export Data', save_path=create_dirpath(), series_names=[]):
+  def __init__(self, filename='Export Data', save_path=None, series_names=[]):
     """
     Initializes the Excel file containing raw data, which will be saved at the 
     given path with the given file name.
     
     @param filename: Name of the file (without file extension).
-    @param save_path: File path where Excel sheet will be saved at.
+    @param save_path: File path where Excel sheet will be saved at (the base
+    Files folder by default).
     @param series_names: List of tuples that will be used for the series on the
     charts. Each tuple contains the series name and a second string describing
     the series: (series name, series description).
@@ -9,7 +9,6 @@ from collections import OrderedDict
 import datetime
 
 # User-defined modules
-from utilities import create_dirpath
 from xl_writer import XLWriter
 
 class RawDataWriter(XLWriter):
@@ -18,7 +17,7 @@ class RawDataWriter(XLWriter):
   contains all that information.
   """
   
-  def __init__(self, sheet_names, header_lists, filename='Raw Data', save_path=create_dirpath()):
+  def __init__(self, sheet_names, header_lists, filename='Raw Data', save_path=None):
     """
     Initializes the Excel file containing raw data, which will be saved at
     the given path with the given file name.
@@ -28,7 +27,8 @@ class RawDataWriter(XLWriter):
     corresponding with a different sheet. It has  the following format: 
       [[(header, column_width)], [(header, column_width)]]
     @param filename: Name of the file (without file extension).
-    @param save_path: File path where Excel sheet will be saved at.
+    @param save_path: File path where Excel sheet will be saved at (the base
+    Files folder by default).
     """
     
     super(RawDataWriter, self).__init__(filename, save_path)
@@ -7,7 +7,6 @@ with data tables based on the passed data.
 from collections import OrderedDict
 
 # User-built modules
-from utilities import create_dirpath
 from xl_writer import XLWriter
 
 class TableDataWriter(XLWriter):
@@ -16,14 +15,15 @@ class TableDataWriter(XLWriter):
   charts associated with them.
   """
   
-  def __init__(self, filename, save_path=create_dirpath(), chart_title='<Title>', 
+  def __init__(self, filename, save_path=None, chart_title='<Title>', 
                side_header='<Row Header>', top_header='<Column Header>'):
     """
     Initializes a workbook with the sheets from the given sheet list,
     as well as each of the items from the item list to be counted.
     
     @param filename: Name of the workbook to be saved.
-    @param save_path: Location where the file will be saved.
+    @param save_path: Location where the file will be saved (the base Files
+    folder by default).
     @param chart_title: The title of the charts within the tables.
     @param side_header: The name of the header for the side list.
     @param top_header: The name of the header for the top list.